@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    Client overhead benchmark
+    =========================
+
+    Drive the full client with a FixtureTransport, without network, to measure the
+    time spent in the client itself per call.
+
+        python benchmarks/client_overhead.py --calls 1000000
+
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from blitzr import BlitzrClient, FixtureTransport, TTLCache  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=200000)
+    args = parser.parse_args()
+
+    transport = FixtureTransport()
+    transport.add('/artist/', body={'uuid': 'AR1', 'name': 'Mock', 'tags': ['rock', 'pop']})
+
+    for name, client in (('no cache', BlitzrClient('benchmark', transport=transport)),
+                         ('cache', BlitzrClient('benchmark', transport=transport,
+                                                cache=TTLCache()))):
+        started = time.time()
+        for position in range(args.calls):
+            client.get_artist(uuid='AR%d' % (position % 1000))
+        elapsed = time.time() - started
+        print('%-10s %10.0f calls/s  %6.2f us/call' % (name, args.calls / elapsed,
+                                                      elapsed / args.calls * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    Transport benchmark
+    ===================
+
+    Compare the default requests transport with HTTP2Transport against a local mock of
+    the API: concurrent get_artist calls, reporting latencies and the number of TCP
+    connections the server saw.
+
+    Needs hypercorn to serve the mock over HTTP/1.1 and HTTP/2 (h2c):
+
+        pip install hypercorn httpx[http2]
+        python benchmarks/transports.py --calls 2000 --concurrency 50 --latency 0.02
+
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from hypercorn.asyncio import serve
+from hypercorn.config import Config
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from blitzr import BlitzrClient, HTTP2Transport  # noqa: E402
+from blitzr.transports import RequestsTransport  # noqa: E402
+
+
+class MockAPI(object):
+    """ASGI mock of the API recording the client connections."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.connections = set()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return
+        self.connections.add(tuple(scope['client']))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        body = json.dumps({'uuid': 'AR1', 'name': 'Mock'}).encode('utf-8')
+        await send({
+            'type'    : 'http.response.start',
+            'status'  : 200,
+            'headers' : [(b'content-type', b'application/json'),
+                         (b'content-length', str(len(body)).encode('ascii'))]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+
+def start_server(app, port):
+    config = Config()
+    config.bind = ['127.0.0.1:%d' % port]
+    config.accesslog = None
+    loop = asyncio.new_event_loop()
+    stop = asyncio.Event()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(serve(app, config, shutdown_trigger=stop.wait))
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    time.sleep(0.5)
+    return lambda: loop.call_soon_threadsafe(stop.set)
+
+
+def run(name, transport, app, port, calls, concurrency):
+    client = BlitzrClient('benchmark', max_workers=concurrency, transport=transport)
+    client.BASE_URL = 'http://127.0.0.1:%d%%s' % port
+    app.connections.clear()
+    latencies = []
+
+    def call(_):
+        started = time.time()
+        client.get_artist(uuid='AR1')
+        latencies.append(time.time() - started)
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(call, range(calls)))
+    elapsed = time.time() - started
+    transport.close()
+
+    latencies.sort()
+    print('%-10s %8.0f calls/s  p50 %6.1f ms  p95 %6.1f ms  %4d connections' % (
+        name, calls / elapsed, latencies[len(latencies) // 2] * 1000,
+        latencies[int(len(latencies) * 0.95)] * 1000, len(app.connections)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.01, help='Mock latency in seconds')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    app = MockAPI(args.latency)
+    stop = start_server(app, args.port)
+    try:
+        run('http/1.1', RequestsTransport(), app, args.port, args.calls, args.concurrency)
+        run('http/2', HTTP2Transport(max_connections=2, http1=False), app, args.port,
+            args.calls, args.concurrency)
+    finally:
+        stop()
+
+
+if __name__ == '__main__':
+    main()
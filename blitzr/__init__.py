@@ -1 +1,21 @@
-from .client import BlitzrClient
\ No newline at end of file
+from .client import BlitzrClient
+from .cache import TTLCache, StaleWhileRevalidate
+from .shop import ShopPoller, OfferSnapshotStore, OfferDiff
+from .autocomplete import Autocompleter
+from .sync import DiscographySync
+from .index import LocalIndex
+from .entities import Artist, Label, Release, Track
+from .batch import BatchPlanner, LazyResult
+from .transports import (Transport, RequestsTransport, PooledTransport, HTTP2Transport,
+                         FixtureTransport)
+from .cassette import RecordingTransport, ReplayTransport
+from .crawler import ProcessCrawler
+from .pipeline import Pipeline
+from .events import EventStore, EventSync
+from .tags import TagIndex
+from .labels import LabelMirror
+from .sources import SourceResolver
+from .biographies import BiographyStore
+from .breaker import CircuitBreakers
+from .deadline import Deadline
+from .warmer import CacheWarmer
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Asynchronous client
+    ===================
+
+    AsyncBlitzrClient has the get_* and search_* methods of BlitzrClient, returning
+    awaitables, and sends its requests through an asynchronous transport, including
+    get_shop_products, search_local and search_federated. Generators (iter_* methods),
+    lazy entities and batch are only available on BlitzrClient.
+
+    :Example:
+
+    >>> from blitzr.aio import AsyncBlitzrClient
+    >>> blitzr = AsyncBlitzrClient(your_api_key)
+    >>> eminem, label = await asyncio.gather(blitzr.get_artist(slug='eminem'),
+    >>>                                      blitzr.get_label(slug='shady-records'))
+
+"""
+
+import asyncio
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+from .breaker import watch
+from .client import BlitzrClient, FederatedSearch
+from .exceptions import ConfigurationException, NetworkException, TimeoutException
+from .transports import FixtureTransport, check_status
+
+
+class AsyncTransport(object):
+    """Base class of the asynchronous transports, see blitzr.transports.Transport."""
+
+    async def get(self, url, params, headers, timeout=None):
+        """Send a GET request, see Transport.get."""
+        raise NotImplementedError()
+
+    def wire_bytes(self, response):
+        """Size of the response body as received, before decoding, None if unknown."""
+        return None
+
+    async def close(self):
+        """Release the connections of the transport."""
+
+
+class AsyncHTTPXTransport(AsyncTransport):
+    """Asynchronous transport using httpx, over HTTP/2 by default.
+
+    :param max_connections: Maximum number of open connections
+    :param http2: Negotiate HTTP/2
+    :type max_connections: int
+    :type http2: bool
+
+    """
+
+    def __init__(self, max_connections=4, http2=True):
+        if httpx is None:
+            raise ConfigurationException('AsyncHTTPXTransport requires httpx: '
+                                         'pip install blitzr[http2]')
+        self.client = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(max_connections=max_connections),
+            timeout=None
+        )
+
+    async def get(self, url, params, headers, timeout=None):
+        params = dict((name, value) for name, value in params.items() if value is not None)
+        try:
+            response = await self.client.get(url, params=params, headers=headers, timeout=timeout)
+        except httpx.TimeoutException as exception:
+            raise TimeoutException(str(exception))
+        except httpx.TransportError as exception:
+            raise NetworkException(str(exception))
+        check_status(response.status_code, response)
+        return response
+
+    def wire_bytes(self, response):
+        return response.num_bytes_downloaded
+
+    async def close(self):
+        await self.client.aclose()
+
+
+class AsyncFixtureTransport(AsyncTransport):
+    """Asynchronous version of FixtureTransport.
+
+    :param fixtures: Recorded responses, or a FixtureTransport
+    :type fixtures: list | FixtureTransport
+
+    """
+
+    def __init__(self, fixtures=None):
+        if isinstance(fixtures, FixtureTransport):
+            self.fixtures = fixtures
+        else:
+            self.fixtures = FixtureTransport(fixtures)
+
+    def add(self, method, params=None, body=None, status=200):
+        """Record a response, see FixtureTransport.add."""
+        self.fixtures.add(method, params, body, status)
+
+    async def get(self, url, params, headers, timeout=None):
+        return self.fixtures.get(url, params, headers, timeout)
+
+    def wire_bytes(self, response):
+        return self.fixtures.wire_bytes(response)
+
+
+class AsyncBlitzrClient(BlitzrClient):
+    """Asynchronous BlitzrClient.
+
+    :param api_key: Your Blitzr API key
+    :param transport: Asynchronous transport, an AsyncHTTPXTransport by default
+    :type api_key: string
+    :type transport: AsyncTransport
+
+    Other parameters are the ones of BlitzrClient.
+
+    """
+
+    def __init__(self, api_key, transport=None, **kwargs):
+        super(AsyncBlitzrClient, self).__init__(
+            api_key, transport=transport or AsyncHTTPXTransport(), **kwargs)
+
+    async def _request(self, method, params={}, fields=None):
+        key, cached = self._cached(method, params, fields)
+        if cached is not None:
+            return cached
+        stale = self._revalidate(method, params, fields, key)
+        if stale is not None:
+            return stale
+        return await self._fetch(method, params, fields, key)
+
+    def _refresh(self, method, params, fields, key):
+        # The refresh is a task of the running loop, rather than a revalidation thread.
+        self.revalidation.refresh_on_loop(asyncio.get_running_loop(), method, key,
+                                          lambda: self._fetch(method, dict(params), fields, key))
+
+    async def _fetch(self, method, params, fields, key):
+        timeout = self._timeout()
+        breaker, stale = self._admit(method, key)
+        if stale is not None:
+            return stale
+        params['key'] = self.api_key
+        with watch(breaker):
+            req = await self.transport.get(self.BASE_URL % method, params,
+                                           {'Accept-Encoding': self.ACCEPT_ENCODING},
+                                           timeout=timeout)
+        return self._decode(method, req, fields, key)
+
+    async def get_shop_products(self, entity, uuid=None, slug=None, product_types=None,
+                                ttl=60):
+        """Get an Artist's, Label's or Release's products, see BlitzrClient.get_shop_products."""
+        product_types, key, cached = self._cached_shop_products(entity, uuid, slug,
+                                                                product_types, ttl)
+        if cached is not None:
+            return cached
+        fetch = getattr(self, 'get_shop_%s' % entity)
+        answers = await asyncio.gather(*[fetch(product_type, uuid, slug)
+                                         for product_type in product_types],
+                                       return_exceptions=True)
+        return self._merge_shop_products(product_types, [_outcome(answer) for answer in answers],
+                                         key, ttl)
+
+    async def search_local(self, entity, query=None, filters={}, start=0, limit=10,
+                           fallback=True):
+        """Search the entities already fetched, see BlitzrClient.search_local."""
+        answer = self._search_index(entity, query, filters, start, limit)
+        if answer['total'] or not fallback:
+            return answer
+        return await getattr(self, 'search_%s' % entity)(query, filters, False, start, limit)
+
+    async def search_federated(self, query=None, types=None, autocomplete=False, start=0,
+                               limit=10):
+        """Search several entity types concurrently, see BlitzrClient.search_federated.
+
+        :return: Results of every type, all of them already received
+        :rtype: FederatedSearch
+
+        """
+        calls = self._federated_calls(query, types, autocomplete, start, limit)
+        names = list(calls)
+        answers = await asyncio.gather(*[calls[name]() for name in names],
+                                       return_exceptions=True)
+        return FederatedSearch(dict((name, _answered(answer))
+                                    for name, answer in zip(names, answers)), self.max_workers)
+
+    def batch(self, window=0.005):
+        """Not available, gather the coroutines of the get_* methods instead."""
+        raise ConfigurationException('batch is only available on BlitzrClient, '
+                                     'use asyncio.gather with AsyncBlitzrClient.')
+
+    def artist(self, uuid=None, slug=None):
+        """Not available, lazy entities are only available on BlitzrClient."""
+        raise ConfigurationException(_NO_LAZY_ENTITIES)
+
+    def label(self, uuid=None, slug=None):
+        """Not available, lazy entities are only available on BlitzrClient."""
+        raise ConfigurationException(_NO_LAZY_ENTITIES)
+
+    def release(self, uuid=None, slug=None):
+        """Not available, lazy entities are only available on BlitzrClient."""
+        raise ConfigurationException(_NO_LAZY_ENTITIES)
+
+    def track(self, uuid=None):
+        """Not available, lazy entities are only available on BlitzrClient."""
+        raise ConfigurationException(_NO_LAZY_ENTITIES)
+
+    async def close(self):
+        """Wait for the refreshes running on the loop, and release the connections of the
+        transport."""
+        if self.revalidation is not None:
+            await asyncio.gather(*self.revalidation.refreshing_on(asyncio.get_running_loop()),
+                                 return_exceptions=True)
+        await self.transport.close()
+
+
+_NO_LAZY_ENTITIES = ('Lazy entities are only available on BlitzrClient, '
+                     'await the get_* methods of AsyncBlitzrClient instead.')
+
+_NO_GENERATORS = ('Generators are only available on BlitzrClient, '
+                  'await the get_* and search_* methods of AsyncBlitzrClient instead.')
+
+
+def _unavailable(name):
+    # Override of a BlitzrClient method that relies on a synchronous _request.
+    def method(self, *args, **kwargs):
+        raise ConfigurationException(_NO_GENERATORS)
+    method.__name__ = name
+    method.__doc__ = 'Not available, generators are only available on BlitzrClient.'
+    return method
+
+
+# The iter_* methods, and the pages and raw responses they and the crawlers fetch, would
+# call the API synchronously.
+for _name in dir(BlitzrClient):
+    if _name.startswith('iter_') or _name in ('_paginate', '_request_raw'):
+        setattr(AsyncBlitzrClient, _name, _unavailable(_name))
+del _name
+
+
+def _outcome(answer):
+    # (result, exception) pair of an answer gathered with return_exceptions.
+    if isinstance(answer, BaseException):
+        return None, answer
+    return answer, None
+
+
+def _answered(answer):
+    # Call returning, or raising, an answer gathered with return_exceptions.
+    def call():
+        if isinstance(answer, BaseException):
+            raise answer
+        return answer
+    return call
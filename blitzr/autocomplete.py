@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Autocomplete
+    ============
+
+    Client side prefix cache for search boxes built on the predictive search.
+
+    Results are cached in a trie keyed by the typed prefix. When a shorter prefix
+    already returned its complete result set, longer prefixes are answered by
+    filtering it locally instead of calling the API.
+
+    :Example:
+
+    >>> from blitzr import BlitzrClient, Autocompleter
+    >>> blitzr = BlitzrClient(your_api_key)
+    >>> autocomplete = Autocompleter(blitzr, 'artist')
+    >>> autocomplete.complete('emi')
+    >>> autocomplete.complete('emin')   # answered from cache when 'emi' was complete
+    >>> print autocomplete.hit_rate
+
+"""
+
+import re
+import threading
+import unicodedata
+
+from concurrent.futures import CancelledError, Future
+
+from .exceptions import ConfigurationException
+
+
+def _normalize(text):
+    return ' '.join((text or '').lower().split())
+
+
+def _fold(text):
+    # Case, accents, punctuation and spacing differences don't prevent a match.
+    text = unicodedata.normalize('NFKD', u'%s' % (text or ''))
+    text = u''.join(char for char in text if not unicodedata.combining(char))
+    return u' '.join(re.sub(r'[^\w]+', u' ', text.lower(), flags=re.UNICODE).split())
+
+
+def matches_prefix(name, prefix):
+    """Whether the predictive search returns name for prefix.
+
+    The prefix must start the name or one of its words, after folding case, accents
+    and punctuation: 'emin' and 'shady' match 'Slim Shady (Eminem)', 'nem' doesn't.
+
+    """
+    name, prefix = _fold(name), _fold(prefix)
+    return name.startswith(prefix) or (u' ' + name).find(u' ' + prefix) != -1
+
+
+class _TrieNode(object):
+    __slots__ = ('children', 'entry')
+
+    def __init__(self):
+        self.children = {}
+        self.entry = None
+
+
+class Autocompleter(object):
+    """Autocomplete helper on top of search_artist, search_label or search_release.
+
+    :param client: The BlitzrClient used to search
+    :param entity: The searched entity (artist|label|release)
+    :param filters: Filters sent with every search
+    :param limit: Number of results requested for a prefix
+    :param debounce: Delay in seconds before submit() calls the API, a newer submit()
+        during this delay replaces the pending one
+    :type client: BlitzrClient
+    :type entity: string
+    :type filters: dict
+    :type limit: int
+    :type debounce: float
+
+    """
+
+    ENTITIES = ('artist', 'label', 'release')
+
+    def __init__(self, client, entity='artist', filters={}, limit=10, debounce=0.15):
+        if entity not in self.ENTITIES:
+            raise ConfigurationException('Autocomplete is not available for %s.' % entity)
+        self.client = client
+        self.entity = entity
+        self.filters = filters
+        self.limit = limit
+        self.debounce = debounce
+        self.lookups = 0
+        self.hits = 0
+        self.filtered_hits = 0
+        self.cancelled = 0
+        self._root = _TrieNode()
+        self._lock = threading.Lock()
+        self._pending = None
+        self._generation = 0
+
+    @property
+    def hit_rate(self):
+        """Share of lookups answered without calling the API."""
+        if not self.lookups:
+            return 0.0
+        return float(self.hits + self.filtered_hits) / self.lookups
+
+    def stats(self):
+        """Cache statistics.
+
+        :return: lookups, hits, filtered_hits, misses, cancelled and hit_rate
+        :rtype: dictionary
+
+        """
+        return {
+            'lookups'       : self.lookups,
+            'hits'          : self.hits,
+            'filtered_hits' : self.filtered_hits,
+            'misses'        : self.lookups - self.hits - self.filtered_hits,
+            'cancelled'     : self.cancelled,
+            'hit_rate'      : self.hit_rate
+        }
+
+    def complete(self, prefix):
+        """Get the results for a prefix, from the cache when possible.
+
+        :param prefix: The typed text
+        :type prefix: string
+        :return: Results
+        :rtype: list
+
+        """
+        prefix = _normalize(prefix)
+        with self._lock:
+            self.lookups += 1
+            results = self._lookup(prefix)
+        if results is not None:
+            return results
+        return self._fetch(prefix)
+
+    def submit(self, prefix):
+        """Get the results for a prefix asynchronously, with debounce.
+
+        Cached prefixes are answered immediately. Otherwise the API is called after the
+        debounce delay, and the future of a previous submit() still waiting or running
+        is cancelled: its result() raises CancelledError.
+
+        :param prefix: The typed text
+        :type prefix: string
+        :return: Results
+        :rtype: Future
+
+        """
+        prefix = _normalize(prefix)
+        future = Future()
+        with self._lock:
+            self.lookups += 1
+            self._generation += 1
+            generation = self._generation
+            if self._pending is not None and self._pending.cancel():
+                self.cancelled += 1
+            self._pending = None
+            results = self._lookup(prefix)
+            if results is None:
+                self._pending = future
+        if results is not None:
+            future.set_result(results)
+            return future
+
+        def run():
+            if generation != self._generation or not future.set_running_or_notify_cancel():
+                return
+            try:
+                results = self._fetch(prefix)
+            except Exception as exception:
+                future.set_exception(exception)
+                return
+            with self._lock:
+                superseded = generation != self._generation
+                if superseded:
+                    self.cancelled += 1
+            if superseded:
+                future.set_exception(CancelledError())
+            else:
+                future.set_result(results)
+
+        timer = threading.Timer(self.debounce, run)
+        timer.daemon = True
+        timer.start()
+        return future
+
+    def clear(self):
+        """Empty the prefix cache."""
+        with self._lock:
+            self._root = _TrieNode()
+
+    def _lookup(self, prefix):
+        node = self._root
+        complete = None
+        for char in prefix:
+            if node.entry is not None and node.entry[1]:
+                complete = node.entry
+            node = node.children.get(char)
+            if node is None:
+                break
+        else:
+            if node.entry is not None:
+                self.hits += 1
+                return node.entry[0]
+        if complete is not None:
+            self.filtered_hits += 1
+            return [result for result in complete[0]
+                    if matches_prefix(result.get('name'), prefix)][:self.limit]
+        return None
+
+    def _fetch(self, prefix):
+        search = getattr(self.client, 'search_%s' % self.entity)
+        answer = search(prefix, self.filters, True, 0, self.limit)
+        if isinstance(answer, dict):
+            results, total = answer.get('results') or [], answer.get('total')
+        else:
+            results, total = answer or [], None
+        complete = total is not None and total <= len(results)
+        with self._lock:
+            node = self._root
+            for char in prefix:
+                node = node.children.setdefault(char, _TrieNode())
+            node.entry = (results, complete)
+        return results
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Batching
+    ========
+
+    Collect lookups issued in a loop and run them concurrently.
+
+    Inside a ``with client.batch():`` block, the calls made on the client from the
+    thread running the block are not sent one by one: each API call is queued and
+    returns a LazyResult at once, so an N+1 loop runs its lookups concurrently without
+    being rewritten. A LazyResult behaves as the dictionary or list it stands for, and
+    using it (item access, iteration, len, comparison...) waits for it. Cached calls
+    are answered from the cache directly.
+
+    Lookups are queued, identical ones are deduplicated, and the queue is dispatched
+    concurrently when the collection window elapses, when a result is used, or at the
+    end of the with block. The planner also exposes the get_* and search_* methods of
+    the client, returning futures, to batch lookups explicitly.
+
+    :Example:
+
+    >>> from blitzr import BlitzrClient
+    >>> blitzr = BlitzrClient(your_api_key)
+    >>> with blitzr.batch():
+    >>>     releases = [blitzr.get_release(release['uuid'])
+    >>>                 for release in blitzr.iter_artist_releases(slug='eminem')]
+    >>> print releases[0]['name']
+    >>>
+    >>> with blitzr.batch() as batch:
+    >>>     futures = [batch.get_release(uuid) for uuid in release_uuids]
+    >>> releases = [future.result() for future in futures]
+
+"""
+
+import threading
+
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .exceptions import ConfigurationException
+
+_active = threading.local()
+
+
+def active_planner(client):
+    """Planner of the innermost batch block of client running in this thread, or None."""
+    for planner in reversed(getattr(_active, 'planners', [])):
+        if planner.client is client:
+            return planner
+    return None
+
+
+class BatchFuture(Future):
+    """Future of a batched lookup, waiting for it dispatches the pending lookups."""
+
+    def __init__(self, planner):
+        super(BatchFuture, self).__init__()
+        self._planner = planner
+
+    def result(self, timeout=None):
+        self._planner.flush()
+        return super(BatchFuture, self).result(timeout)
+
+    def exception(self, timeout=None):
+        self._planner.flush()
+        return super(BatchFuture, self).exception(timeout)
+
+
+class LazyResult(object):
+    """Result of an API call queued by a batch block, waiting for it when used.
+
+    It supports the operations of the dictionary or list it stands for: item access,
+    iteration, len, membership, comparison and attributes such as get. **result()**
+    returns the actual value, e.g. to test it against None or to serialize it.
+
+    """
+
+    def __init__(self, future):
+        self._future = future
+
+    def result(self, timeout=None):
+        """The result of the call, raising its exception if it failed."""
+        return self._future.result(timeout)
+
+    def __getattr__(self, name):
+        if name == '_future':
+            raise AttributeError(name)
+        return getattr(self.result(), name)
+
+    def __getitem__(self, key):
+        return self.result()[key]
+
+    def __iter__(self):
+        return iter(self.result())
+
+    def __len__(self):
+        return len(self.result())
+
+    def __contains__(self, item):
+        return item in self.result()
+
+    def __eq__(self, other):
+        return self.result() == (other.result() if isinstance(other, LazyResult) else other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __bool__(self):
+        return bool(self.result())
+
+    __nonzero__ = __bool__
+
+    def __repr__(self):
+        return repr(self.result())
+
+
+class BatchPlanner(object):
+    """Queue, deduplicate and concurrently dispatch client lookups.
+
+    :param client: The BlitzrClient running the lookups
+    :param window: Seconds to collect lookups before dispatching them, None to only
+        dispatch when a result is needed or when the batch is closed
+    :param max_workers: Number of concurrent lookups, the client's max_workers by default
+    :type client: BlitzrClient
+    :type window: float
+    :type max_workers: int
+
+    """
+
+    def __init__(self, client, window=0.005, max_workers=None):
+        self.client = client
+        self.window = window
+        self.submitted = 0
+        self.deduplicated = 0
+        self._futures = {}
+        self._queue = []
+        self._timer = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or client.max_workers)
+
+    def __getattr__(self, name):
+        if not name.startswith(('get_', 'search_')) or not hasattr(self.client, name):
+            raise AttributeError(name)
+
+        def lookup(*args, **kwargs):
+            return self.submit(name, *args, **kwargs)
+        lookup.__name__ = name
+        lookup.__doc__ = getattr(self.client, name).__doc__
+        return lookup
+
+    def submit(self, name, *args, **kwargs):
+        """Queue a lookup.
+
+        :param name: The client method, e.g. 'get_release'
+        :type name: string
+        :return: The lookup result
+        :rtype: BatchFuture
+
+        """
+        key = (name, repr(args), repr(sorted(kwargs.items())))
+        return self._queue_call(key, getattr(self.client, name), args, kwargs)
+
+    def defer(self, key, method, *args):
+        """Queue a call of the client made inside the batch block, see active_planner.
+
+        :param key: Identifies the call, identical calls are run once
+        :param method: The client method
+        :type key: string
+        :type method: callable
+        :return: The call result
+        :rtype: LazyResult
+
+        """
+        return LazyResult(self._queue_call(('call', key), method, args, {}))
+
+    def _queue_call(self, key, method, args, kwargs):
+        with self._lock:
+            if self._executor is None:
+                raise ConfigurationException('The batch is closed.')
+            self.submitted += 1
+            future = self._futures.get(key)
+            if future is not None:
+                self.deduplicated += 1
+                return future
+            future = BatchFuture(self)
+            self._futures[key] = future
+            self._queue.append((future, method, args, kwargs))
+            if self.window is not None and self._timer is None:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        return future
+
+    def flush(self):
+        """Dispatch the queued lookups now."""
+        with self._lock:
+            queue, self._queue = self._queue, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            executor = self._executor
+        for future, method, args, kwargs in queue:
+            if executor is None or not future.set_running_or_notify_cancel():
+                continue
+            executor.submit(_run, future, method, args, kwargs)
+
+    def close(self):
+        """Dispatch the queued lookups and wait for every lookup of the batch."""
+        self.flush()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def __enter__(self):
+        if not hasattr(_active, 'planners'):
+            _active.planners = []
+        _active.planners.append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        _active.planners.remove(self)
+        self.close()
+
+
+def _run(future, method, args, kwargs):
+    try:
+        result = method(*args, **kwargs)
+    except Exception as exception:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
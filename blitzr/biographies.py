@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Biographies
+    ===========
+
+    Artist biographies in several languages, fetched concurrently and stored once.
+
+    Biographies are fetched in HTML, and their texts are compressed and stored by the
+    hash of their whitespace-normalized content, so the identical texts returned for
+    several languages (e.g. when a translation is missing) are stored once, even when
+    the rest of the responses differ. Plain text is derived from the stored HTML.
+
+    :Example:
+
+    >>> from blitzr import BlitzrClient, BiographyStore
+    >>> biographies = BiographyStore(BlitzrClient(your_api_key), 'biographies.db')
+    >>> biographies.fetch(slug='eminem', langs=['en', 'fr'])
+    >>> biographies.get('slug:eminem', 'fr', html_format=False)
+
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import zlib
+
+from functools import partial
+
+try:
+    from html.parser import HTMLParser
+except ImportError:
+    from HTMLParser import HTMLParser
+
+from .parallel import run_parallel
+
+TEXT_FIELDS = ('biography', 'text', 'content', 'summary')
+
+
+class _TextExtractor(HTMLParser):
+
+    BREAKS = ('br', 'p', 'div', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+    def __init__(self):
+        HTMLParser.__init__(self)
+        self.parts = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.BREAKS:
+            self.parts.append('\n')
+
+    def handle_data(self, data):
+        self.parts.append(data)
+
+
+def html_to_text(html):
+    """Plain text of an HTML fragment, with line breaks for paragraphs and breaks."""
+    extractor = _TextExtractor()
+    extractor.feed(html)
+    extractor.close()
+    text = re.sub(r'[ \t]+', ' ', ''.join(extractor.parts))
+    return re.sub(r'\s*\n\s*', '\n', text).strip()
+
+
+def plain_biography(biography):
+    """Copy of a biography response with its HTML texts converted to plain text."""
+    if isinstance(biography, list):
+        return [plain_biography(item) for item in biography]
+    if not isinstance(biography, dict):
+        return biography
+    return dict((name, html_to_text(value) if name in TEXT_FIELDS and value
+                 else value) for name, value in biography.items())
+
+
+def split_biography(biography):
+    """Texts and metadata of a biography response.
+
+    :return: The text fields, and the other fields (None if the response is not a
+        dictionary, in which case it is all text)
+    :rtype: tuple
+
+    """
+    if not isinstance(biography, dict):
+        return biography, None
+    texts = dict((name, value) for name, value in biography.items() if name in TEXT_FIELDS)
+    metadata = dict((name, value) for name, value in biography.items()
+                    if name not in TEXT_FIELDS)
+    return texts, metadata
+
+
+def normalize_space(data):
+    """Copy of texts with their runs of whitespace collapsed to single spaces."""
+    if isinstance(data, dict):
+        return dict((name, normalize_space(value)) for name, value in data.items())
+    if isinstance(data, list):
+        return [normalize_space(value) for value in data]
+    return ' '.join(data.split()) if hasattr(data, 'split') else data
+
+
+def text_digest(texts):
+    """Digest of biography texts, ignoring differences of whitespace."""
+    content = json.dumps(normalize_space(texts), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+class BiographyStore(object):
+    """Multi-language artist biographies, fetched concurrently and deduplicated.
+
+    :param client: The BlitzrClient fetching biographies
+    :param path: SQLite database file, in memory by default
+    :param license: Biography license (if available) (cc0|cc-by-sa)
+    :param source: Biography source (if available) (discogs|wikipedia)
+    :param url_scheme: Urlencoded links format
+    :param max_workers: Number of concurrent calls, the client's max_workers by default
+    :type client: BlitzrClient
+    :type path: string
+    :type license: string
+    :type source: string
+    :type url_scheme: string
+    :type max_workers: int
+
+    """
+
+    def __init__(self, client, path=':memory:', license=None, source=None, url_scheme=None,
+                 max_workers=None):
+        self.client = client
+        self.license = license
+        self.source = source
+        self.url_scheme = url_scheme
+        self.max_workers = max_workers or client.max_workers
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._connection.executescript(
+                'CREATE TABLE IF NOT EXISTS contents (digest TEXT PRIMARY KEY, data BLOB NOT NULL);'
+                'CREATE TABLE IF NOT EXISTS biographies ('
+                '  artist TEXT NOT NULL, lang TEXT NOT NULL, digest TEXT NOT NULL,'
+                '  metadata TEXT, PRIMARY KEY (artist, lang));'
+            )
+            self._connection.commit()
+
+    def fetch(self, uuid=None, slug=None, langs=('en',)):
+        """Fetch and store the biographies of an artist in several languages, concurrently.
+
+        :param uuid: The Artist UUID
+        :param slug: The Artist Slug
+        :param langs: Biography languages (fr|en)
+        :type uuid: string
+        :type slug: string
+        :type langs: list
+        :return: HTML biographies by language, failed languages are missing
+        :rtype: dict
+
+        """
+        artist = uuid or 'slug:%s' % slug
+        langs = list(langs)
+        outcomes = run_parallel([
+            partial(self.client.get_artist_biography, uuid, slug, lang, self.license,
+                    self.source, True, self.url_scheme)
+            for lang in langs
+        ], self.max_workers)
+        biographies = dict((lang, biography) for lang, (biography, exception)
+                           in zip(langs, outcomes) if exception is None)
+        for lang, biography in biographies.items():
+            self.put(artist, lang, biography)
+        return biographies
+
+    def put(self, artist, lang, biography):
+        """Store an HTML biography.
+
+        Its texts are stored once for every biography with the same texts, and its
+        other fields (e.g. the language) are kept for this artist and language.
+
+        :return: Digest of its texts
+        :rtype: string
+
+        """
+        texts, metadata = split_biography(biography)
+        digest = text_digest(texts)
+        content = json.dumps(texts, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        if metadata is not None:
+            metadata = json.dumps(metadata, sort_keys=True, separators=(',', ':'))
+        with self._lock:
+            previous = self._connection.execute(
+                'SELECT digest FROM biographies WHERE artist = ? AND lang = ?', (artist, lang)
+            ).fetchone()
+            self._connection.execute('INSERT OR IGNORE INTO contents VALUES (?, ?)',
+                                     (digest, sqlite3.Binary(zlib.compress(content, 9))))
+            self._connection.execute('INSERT OR REPLACE INTO biographies VALUES (?, ?, ?, ?)',
+                                     (artist, lang, digest, metadata))
+            if previous and previous[0] != digest:
+                self._connection.execute(
+                    'DELETE FROM contents WHERE digest = ? AND NOT EXISTS '
+                    '(SELECT 1 FROM biographies WHERE digest = ?)', (previous[0], previous[0]))
+            self._connection.commit()
+        return digest
+
+    def get(self, artist, lang, html_format=True):
+        """Stored biography of an artist.
+
+        :param artist: The artist UUID, or 'slug:<slug>'
+        :param lang: Biography language
+        :param html_format: True for HTML markup, False for plain text
+        :type artist: string
+        :type lang: string
+        :type html_format: bool
+        :return: Biography, None if not stored
+        :rtype: dictionary
+
+        """
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT data, metadata FROM contents JOIN biographies USING (digest) '
+                'WHERE artist = ? AND lang = ?', (artist, lang)).fetchone()
+        if row is None:
+            return None
+        biography = json.loads(zlib.decompress(bytes(row[0])).decode('utf-8'))
+        if row[1] is not None:
+            biography.update(json.loads(row[1]))
+        return biography if html_format else plain_biography(biography)
+
+    def langs(self, artist):
+        """Languages stored for an artist."""
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT lang FROM biographies WHERE artist = ? ORDER BY lang', (artist,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def stats(self):
+        """Number of stored biographies and contents, and compressed size in bytes."""
+        with self._lock:
+            biographies = self._connection.execute('SELECT COUNT(*) FROM biographies').fetchone()[0]
+            contents, size = self._connection.execute(
+                'SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM contents').fetchone()
+        return {'biographies': biographies, 'contents': contents, 'stored_bytes': size}
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Circuit breakers
+    ================
+
+    Fail fast on the parts of the API that keep failing.
+
+    Endpoints are grouped in families by the first segment of their path (/radio/,
+    /buy/, /search/...). A family's breaker opens after failure_threshold consecutive
+    failed calls, network or server errors. While it is open, calls to the family raise
+    CircuitOpenException at once, or get a stale cached response, instead of waiting
+    on a degraded service. After reset_timeout seconds one trial call is let through
+    (half-open): its success closes the breaker, its failure opens it again.
+
+    :Example:
+
+    >>> from blitzr import BlitzrClient, CircuitBreakers, TTLCache
+    >>> blitzr = BlitzrClient(your_api_key, cache=TTLCache(),
+    >>>                       breakers=CircuitBreakers(failure_threshold=3, reset_timeout=60))
+
+"""
+
+import threading
+import time
+
+from contextlib import contextmanager
+
+from .exceptions import ClientException
+
+
+class CircuitBreaker(object):
+    """Breaker of one endpoint family.
+
+    :param failure_threshold: Consecutive failures opening the breaker
+    :param reset_timeout: Seconds before a trial call is let through an open breaker
+    :type failure_threshold: int
+    :type reset_timeout: int | float
+
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        """closed, open or half-open."""
+        with self._lock:
+            return self._state()
+
+    def allow(self):
+        """Whether a call may be sent now, the first call after the cool-down is the trial."""
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def success(self):
+        """Record a successful call, closing the breaker."""
+        with self._lock:
+            self.failures = 0
+            self._opened = None
+            self._trial = False
+
+    def failure(self):
+        """Record a failed call, opening the breaker at the threshold or after a failed trial."""
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                self._opened = time.time()
+            self._trial = False
+
+    def abandon(self):
+        """Record a call interrupted before its outcome was known, e.g. a cancelled task.
+
+        It counts neither as a success nor as a failure, but a trial call frees its slot
+        for the next call.
+
+        """
+        with self._lock:
+            self._trial = False
+
+    def _state(self):
+        if self._opened is None:
+            return self.CLOSED
+        if time.time() - self._opened >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+
+class CircuitBreakers(object):
+    """Circuit breakers of the endpoint families, created on first use.
+
+    :param failure_threshold: Consecutive failures opening a breaker
+    :param reset_timeout: Seconds before a trial call is let through an open breaker
+    :type failure_threshold: int
+    :type reset_timeout: int | float
+
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def family(method):
+        """Family of an API method, e.g. 'radio' for '/radio/artist/'."""
+        return method.strip('/').split('/')[0]
+
+    def get(self, method):
+        """Breaker of the family of an API method.
+
+        :param method: The API method, e.g. '/radio/artist/'
+        :type method: string
+        :rtype: CircuitBreaker
+
+        """
+        family = self.family(method)
+        with self._lock:
+            breaker = self._breakers.get(family)
+            if breaker is None:
+                breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+                self._breakers[family] = breaker
+            return breaker
+
+    def states(self):
+        """State of every family's breaker."""
+        with self._lock:
+            breakers = dict(self._breakers)
+        return dict((family, breaker.state) for family, breaker in breakers.items())
+
+
+@contextmanager
+def watch(breaker):
+    """Record the outcome of the call made in the block on a breaker, if any.
+
+    Client errors mean the service answers, every other error counts as a failure.
+    Interruptions (BaseException, e.g. a cancelled asyncio task or KeyboardInterrupt)
+    are not outcomes, the call is abandoned.
+
+    """
+    try:
+        yield
+    except ClientException:
+        if breaker is not None:
+            breaker.success()
+        raise
+    except Exception:
+        if breaker is not None:
+            breaker.failure()
+        raise
+    except BaseException:
+        if breaker is not None:
+            breaker.abandon()
+        raise
+    if breaker is not None:
+        breaker.success()
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Response caching
+    ================
+
+    Small in-memory caches used by the client to avoid repeating identical API calls.
+
+"""
+
+import threading
+import time
+import weakref
+
+from concurrent.futures import ThreadPoolExecutor
+
+from .metrics import StaleStats
+
+try:
+    from urllib import urlencode
+except ImportError:
+    from urllib.parse import urlencode
+
+
+def cache_key(method, params):
+    """Build a stable cache key for an API call.
+
+    The API key and unset parameters are ignored, so two calls that would hit the same
+    URL share the same key.
+
+    :param method: The API method, e.g. '/artist/'
+    :param params: The call parameters
+    :type method: string
+    :type params: dict
+    :return: Cache key
+    :rtype: string
+
+    """
+    items = sorted((name, value) for name, value in (params or {}).items()
+                   if name != 'key' and value is not None)
+    return '%s?%s' % (method, urlencode(items))
+
+
+class TTLCache(object):
+    """Thread-safe in-memory cache whose entries expire after a time to live.
+
+    :param ttl: Default time to live of an entry, in seconds
+    :param max_size: Maximum number of entries, the oldest ones are evicted first
+    :type ttl: int | float
+    :type max_size: int
+
+    :Example:
+
+    >>> from blitzr import BlitzrClient, TTLCache
+    >>> blitzr = BlitzrClient(your_api_key, cache=TTLCache(ttl=600))
+
+    """
+
+    def __init__(self, ttl=300, max_size=None):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Get a fresh value from the cache, or default if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.time():
+                self.misses += 1
+                return default
+            self.hits += 1
+            return entry[1]
+
+    def get_stale(self, key, default=None, max_stale=None):
+        """Get a value even if expired, or default if missing.
+
+        :param max_stale: Seconds a value may be served after its expiry, None for no limit
+        :type max_stale: int | float
+
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if max_stale is not None and entry[0] + max_stale <= time.time():
+                return default
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        """Store a value for ttl seconds (the cache default if not given)."""
+        expires = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (expires, value)
+            if self.max_size is not None:
+                self._evict()
+
+    def delete(self, key):
+        """Remove a value from the cache."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove every value from the cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def _evict(self):
+        # Expired entries are kept until the cache is full, they can be served stale.
+        if len(self._entries) <= self.max_size:
+            return
+        now = time.time()
+        for key in [k for k, (expires, _) in self._entries.items() if expires <= now]:
+            del self._entries[key]
+        while len(self._entries) > self.max_size:
+            oldest = min(self._entries, key=lambda k: self._entries[k][0])
+            del self._entries[oldest]
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] > time.time()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class StaleWhileRevalidate(object):
+    """Serve expired cached responses at once and refresh them in the background.
+
+    A response expired for less than the max staleness of its endpoint is returned
+    immediately, and one background call refreshes it, however many callers got the
+    stale copy meanwhile. Endpoints without max staleness are not affected.
+
+    The refreshes of BlitzrClient run on a pool of threads, the ones of
+    AsyncBlitzrClient are tasks of the event loop serving the stale copy.
+
+    :param max_staleness: Seconds an expired response may be served, by API method
+        (e.g. {'/artist/summary/': 300}), or for every method
+    :param max_workers: Number of concurrent background refreshes
+    :type max_staleness: dict | int | float
+    :type max_workers: int
+
+    :Example:
+
+    >>> from blitzr import BlitzrClient, StaleWhileRevalidate, TTLCache
+    >>> blitzr = BlitzrClient(your_api_key, cache=TTLCache(ttl=60),
+    >>>                       revalidation=StaleWhileRevalidate({'/label/': 3600}))
+
+    """
+
+    def __init__(self, max_staleness, max_workers=2):
+        if isinstance(max_staleness, dict):
+            self.max_staleness = dict(('/%s/' % method.strip('/'), seconds)
+                                      for method, seconds in max_staleness.items())
+        else:
+            self.max_staleness = max_staleness
+        self.stats = StaleStats()
+        self._refreshing = set()
+        self._loop_refreshing = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def max_stale(self, method):
+        """Max staleness of an API method in seconds, None if it is not served stale."""
+        if isinstance(self.max_staleness, dict):
+            return self.max_staleness.get('/%s/' % method.strip('/'))
+        return self.max_staleness
+
+    def refresh(self, method, key, call):
+        """Run call in the background unless the refresh of key is already running.
+
+        :param method: The API method
+        :param key: The cache key of the response
+        :param call: Callable refreshing the cached response
+        :type method: string
+        :type key: string
+        :type call: callable
+        :return: Whether a refresh was started, no refresh is started once closed
+        :rtype: bool
+
+        """
+        with self._lock:
+            if self._executor is None:
+                return False
+            if key in self._refreshing:
+                self.stats.record(method, 'coalesced')
+                return False
+            self._refreshing.add(key)
+            self._executor.submit(self._run, method, key, call)
+        return True
+
+    def refresh_on_loop(self, loop, method, key, call):
+        """Run call() as a task of an asyncio loop unless the refresh of key is already
+        running on that loop.
+
+        :param loop: The running event loop
+        :param method: The API method
+        :param key: The cache key of the response
+        :param call: Callable returning the coroutine refreshing the cached response
+        :type loop: asyncio.AbstractEventLoop
+        :type method: string
+        :type key: string
+        :type call: callable
+        :return: Whether a refresh was started, no refresh is started once closed
+        :rtype: bool
+
+        """
+        with self._lock:
+            if self._executor is None:
+                return False
+            refreshing = self._loop_refreshing.setdefault(loop, {})
+            if key in refreshing:
+                self.stats.record(method, 'coalesced')
+                return False
+            task = refreshing[key] = loop.create_task(call())
+        task.add_done_callback(lambda task: self._done(method, key, refreshing, task))
+        return True
+
+    def refreshing_on(self, loop):
+        """Refresh tasks running on an asyncio loop."""
+        with self._lock:
+            return list(self._loop_refreshing.get(loop, {}).values())
+
+    def close(self):
+        """Wait for the refreshes running on threads, and stop starting new ones."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _run(self, method, key, call):
+        try:
+            call()
+            self.stats.record(method, 'refreshed')
+        except Exception:
+            self.stats.record(method, 'failed')
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _done(self, method, key, refreshing, task):
+        if task.cancelled() or task.exception() is not None:
+            self.stats.record(method, 'failed')
+        else:
+            self.stats.record(method, 'refreshed')
+        with self._lock:
+            refreshing.pop(key, None)
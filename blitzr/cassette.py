@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Record and replay
+    =================
+
+    RecordingTransport wraps a transport and writes every exchange (method, normalized
+    params, status, body and timing) to a gzipped JSON lines cassette. ReplayTransport
+    serves a cassette without network, optionally with the recorded latency, to
+    benchmark crawlers and caches reproducibly.
+
+    :Example:
+
+    >>> from blitzr import BlitzrClient, RecordingTransport, ReplayTransport
+    >>> transport = RecordingTransport(RequestsTransport(), 'traffic.jsonl.gz')
+    >>> crawl(BlitzrClient(your_api_key, transport=transport))
+    >>> transport.close()
+    >>>
+    >>> replay = ReplayTransport('traffic.jsonl.gz', latency_scale=1.0)
+    >>> crawl(BlitzrClient(your_api_key, transport=replay))
+
+"""
+
+import gzip
+import json
+import threading
+import time
+
+from .cache import cache_key
+from .exceptions import ClientException, ServerException, TimeoutException
+from .transports import FixtureResponse, Transport, check_status
+
+try:
+    from urllib.parse import urlsplit
+except ImportError:
+    from urlparse import urlsplit
+
+
+def normalize_params(params):
+    """Call parameters without the API key and unset parameters."""
+    return dict((name, value) for name, value in (params or {}).items()
+                if name != 'key' and value is not None)
+
+
+def read_cassette(path):
+    """Read the exchanges of a cassette.
+
+    :param path: The cassette file
+    :type path: string
+    :return: Exchanges: method, params, status, body and elapsed
+    :rtype: generator
+
+    """
+    with gzip.open(path, 'rb') as cassette:
+        for line in cassette:
+            if line.strip():
+                yield json.loads(line.decode('utf-8'))
+
+
+class RecordingTransport(Transport):
+    """Transport recording every exchange of another transport to a cassette.
+
+    :param transport: The transport sending the requests
+    :param path: The cassette file, overwritten
+    :type transport: Transport
+    :type path: string
+
+    """
+
+    def __init__(self, transport, path):
+        self.transport = transport
+        self.path = path
+        self.recorded = 0
+        self._lock = threading.Lock()
+        self._file = gzip.open(path, 'wb')
+
+    def get(self, url, params, headers, timeout=None):
+        started = time.time()
+        try:
+            response = self.transport.get(url, params, headers, timeout)
+        except (ClientException, ServerException) as exception:
+            status = exception.status_code
+            if status is None:
+                status = 400 if isinstance(exception, ClientException) else 500
+            self._record(url, params, status, exception.body, started)
+            raise
+        self._record(url, params, response.status_code, response.json(), started)
+        return response
+
+    def wire_bytes(self, response):
+        return self.transport.wire_bytes(response)
+
+    def close(self):
+        """Finish the cassette and close the wrapped transport."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        self.transport.close()
+
+    def _record(self, url, params, status, body, started):
+        exchange = {
+            'method'  : '/%s/' % urlsplit(url).path.strip('/'),
+            'params'  : normalize_params(params),
+            'status'  : status,
+            'body'    : body,
+            'elapsed' : round(time.time() - started, 6)
+        }
+        line = json.dumps(exchange, separators=(',', ':'), sort_keys=True) + '\n'
+        with self._lock:
+            self._file.write(line.encode('utf-8'))
+            self.recorded += 1
+
+
+class ReplayTransport(Transport):
+    """Transport serving the exchanges of a cassette.
+
+    Calls are matched on method and normalized params. When a call was recorded several
+    times, its responses are served in the recorded order, the last one being repeated.
+    Unknown calls get a 404 response.
+
+    :param path: The cassette file
+    :param latency_scale: None to answer immediately, 1.0 to wait the recorded latency,
+        or any factor applied to it
+    :type path: string
+    :type latency_scale: float
+
+    """
+
+    def __init__(self, path, latency_scale=None):
+        self.latency_scale = latency_scale
+        self.calls = 0
+        self.misses = 0
+        self._exchanges = {}
+        self._positions = {}
+        self._lock = threading.Lock()
+        for exchange in read_cassette(path):
+            content = json.dumps(exchange['body'], separators=(',', ':')).encode('utf-8')
+            response = FixtureResponse(exchange['status'], content, {
+                'Content-Type'   : 'application/json',
+                'Content-Length' : str(len(content))
+            })
+            key = cache_key(exchange['method'], exchange['params'])
+            self._exchanges.setdefault(key, []).append((response, exchange.get('elapsed', 0)))
+
+    def get(self, url, params, headers, timeout=None):
+        key = cache_key('/%s/' % urlsplit(url).path.strip('/'), params)
+        with self._lock:
+            self.calls += 1
+            exchanges = self._exchanges.get(key)
+            if exchanges is None:
+                self.misses += 1
+            else:
+                position = self._positions.get(key, 0)
+                self._positions[key] = min(position + 1, len(exchanges) - 1)
+        if exchanges is None:
+            response, elapsed = FixtureResponse(404, json.dumps({
+                'message': 'No recorded exchange for %s' % key
+            }).encode('utf-8')), 0
+        else:
+            response, elapsed = exchanges[position]
+        if self.latency_scale:
+            delay = elapsed * self.latency_scale
+            if timeout is not None and delay > timeout:
+                time.sleep(timeout)
+                raise TimeoutException('No response for %s after %ss' % (key, timeout))
+            time.sleep(delay)
+        check_status(response.status_code, response)
+        return response
+
+    def wire_bytes(self, response):
+        return len(response.content)
+
+    def rewind(self):
+        """Serve every call from its first recorded response again."""
+        with self._lock:
+            self._positions.clear()
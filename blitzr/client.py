@@ -86,8 +86,23 @@
 
 """
 
-import requests
-from .exceptions import (ConfigurationException, ServerException, ClientException, NetworkException)
+import copy
+import time
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .batch import BatchPlanner, active_planner
+from .breaker import watch
+from .cache import TTLCache, cache_key
+from .deadline import Deadline
+from .entities import Artist, Label, Release, Track
+from .exceptions import CircuitOpenException, ConfigurationException, TimeoutException
+from .fields import project, search_extras, select_extras
+from .metrics import TransferStats
+from .paging import AdaptivePager
+from .parallel import run_parallel
+from .shop import offer_key
+from .transports import ACCEPT_ENCODING, RequestsTransport
+
 
 class BlitzrClient(object):
     """BlitzrClient
@@ -98,29 +113,236 @@ class BlitzrClient(object):
 
     BASE_URL = "https://api.blitzr.com%s"
 
-    def __init__(self, api_key):
-        """Construct the BlitzrClient with your API key."""
+    ACCEPT_ENCODING = ACCEPT_ENCODING
+
+    MAX_PAGE_SIZE = 100
+
+    # Number of merged shop products kept by get_shop_products.
+    SHOP_CACHE_SIZE = 1000
+
+    ARTIST_EXTRAS = ['aliases', 'websites', 'relations']
+
+    LABEL_EXTRAS = ['biography', 'websites', 'relations']
+
+    SHOP_PRODUCT_TYPES = {
+        'artist'  : ['cd', 'lp', 'mp3', 'merch'],
+        'label'   : ['cd', 'lp', 'merch'],
+        'release' : ['cd', 'lp', 'mp3']
+    }
+
+    def __init__(self, api_key, cache=None, max_workers=8, index=None, transport=None,
+                 adaptive_paging=False, breakers=None, timeout=None, revalidation=None):
+        """Construct the BlitzrClient with your API key.
+
+        :param api_key: Your Blitzr API key
+        :param cache: Optional response cache, e.g. a TTLCache
+        :param max_workers: Maximum number of concurrent calls made by bulk methods
+        :param index: Optional LocalIndex fed with every response, see search_local
+        :param transport: Transport sending the requests, a RequestsTransport by default
+        :param adaptive_paging: Let paginating generators tune their page size: they start
+            with small pages and grow them up to MAX_PAGE_SIZE while the API answers fast
+        :param breakers: Optional CircuitBreakers failing fast on failing endpoint families,
+            stale cached responses are served while a breaker is open
+        :param timeout: Seconds to wait for each response, None to wait forever
+        :param revalidation: Optional StaleWhileRevalidate policy serving expired cached
+            responses while they are refreshed in the background
+        :type api_key: string
+        :type cache: TTLCache
+        :type max_workers: int
+        :type index: LocalIndex
+        :type transport: Transport
+        :type adaptive_paging: bool
+        :type breakers: CircuitBreakers
+        :type timeout: float
+        :type revalidation: StaleWhileRevalidate
+
+        """
         if api_key:
             self.api_key = api_key
         else:
             raise ConfigurationException('api_key is missing.')
+        self.cache = cache
+        self.max_workers = max_workers
+        self.index = index
+        self.transfer_stats = TransferStats()
+        self.transport = transport or RequestsTransport()
+        self.adaptive_paging = adaptive_paging
+        self.breakers = breakers
+        self.timeout = timeout
+        self.deadline = None
+        self.revalidation = revalidation
+        self._shop_cache = TTLCache(ttl=60, max_size=self.SHOP_CACHE_SIZE)
+
+    def _request(self, method, params={}, fields=None):
+        """Base method to call the API with given params.
+
+        When fields are given, the response is reduced to these fields before being
+        cached and returned.
+
+        """
+        key, cached = self._cached(method, params, fields)
+        if cached is not None:
+            return cached
+        planner = active_planner(self)
+        if planner is not None:
+            # Inside a batch block: queue the call, it runs on a thread of the planner.
+            return planner.defer(self._call_key(method, params, fields), self._request,
+                                 method, dict(params), fields)
+        stale = self._revalidate(method, params, fields, key)
+        if stale is not None:
+            return stale
+        return self._fetch(method, params, fields, key)
+
+    def _fetch(self, method, params, fields, key):
+        """Call the API, bypassing the response cache lookup."""
+        # Before taking a half-open trial, which an expired deadline would never settle.
+        timeout = self._timeout()
+        breaker, stale = self._admit(method, key)
+        if stale is not None:
+            return stale
+        params['key'] = self.api_key
+        with watch(breaker):
+            req = self.transport.get(self.BASE_URL % method, params,
+                                     {'Accept-Encoding': self.ACCEPT_ENCODING}, timeout=timeout)
+        return self._decode(method, req, fields, key)
+
+    def _paginate(self, fetch, start, limit):
+        """Walk the pages returned by fetch(start, limit), see adaptive_paging."""
+        pager = AdaptivePager(limit, self.MAX_PAGE_SIZE) if self.adaptive_paging else None
+        if pager is not None:
+            limit = pager.limit
+        while True:
+            requested = time.time()
+            items = fetch(start, limit)
+            fetched = time.time()
+            for item in items:
+                yield item
+            start += limit
+            if len(items) < limit:
+                break
+            if pager is not None:
+                limit = pager.next_limit(fetched - requested, time.time() - fetched)
+
+    def _request_raw(self, method, params={}):
+        """Call the API and return the response body without decoding it.
+
+        The response cache and the local index are not used.
 
-    def _request(self, method, params={}):
-        """Base method to call the API with given params."""
+        """
+        timeout = self._timeout()
+        breaker, _ = self._admit(method, None)
         params['key'] = self.api_key
-        try:
-            req = requests.get(url=self.BASE_URL % method, params=params)
-            req.raise_for_status()
-            return req.json()
-        except requests.exceptions.HTTPError:
-            if req.status_code >= 500:
-                raise ServerException(
-                    'An error occured on the Blitzr side. HTTP code: ' + str(req.status_code)
-                    )
-            elif req.status_code >= 400:
-                raise ClientException(req.json())
-        except requests.exceptions.ConnectionError as exception:
-            raise NetworkException(str(exception))
+        with watch(breaker):
+            req = self.transport.get(self.BASE_URL % method, params,
+                                     {'Accept-Encoding': self.ACCEPT_ENCODING}, timeout=timeout)
+        self._record_transfer(method, req)
+        return req.content
+
+    def close(self):
+        """Release the connections of the transport."""
+        self.transport.close()
+
+    def within(self, seconds=None, deadline=None):
+        """Client bound to a deadline, sharing the cache, transport and stats of this one.
+
+        Every call of the bound client, including the pages of its generators and the
+        calls of its bulk methods, fails with TimeoutException once the deadline expired
+        and with CancelledException once it is cancelled.
+
+        :param seconds: Seconds from now
+        :param deadline: A Deadline, e.g. to cancel the calls from another thread
+        :type seconds: float
+        :type deadline: Deadline
+        :return: The bound client
+        :rtype: BlitzrClient
+
+        """
+        bound = copy.copy(self)
+        bound.deadline = deadline or Deadline(seconds)
+        return bound
+
+    def _timeout(self):
+        """Check the deadline and return the timeout of the next call."""
+        if self.deadline is None:
+            return self.timeout
+        self.deadline.check()
+        remaining = self.deadline.remaining()
+        if remaining is None:
+            return self.timeout
+        if remaining <= 0:
+            # The deadline expired since check(), and the transports reject a zero timeout.
+            raise TimeoutException('The deadline of the calls expired.')
+        return remaining if self.timeout is None else min(self.timeout, remaining)
+
+    def _cached(self, method, params, fields):
+        """Look a call up in the response cache, returns its cache key and cached value."""
+        if self.cache is None:
+            return None, None
+        key = self._call_key(method, params, fields)
+        return key, self.cache.get(key)
+
+    def _call_key(self, method, params, fields):
+        """Key identifying an API call, for the cache and the batches."""
+        return cache_key(method, dict(params, _fields=','.join(sorted(fields))
+                                      if fields is not None else None))
+
+    def _revalidate(self, method, params, fields, key):
+        """Return a stale cached value and refresh it in the background, see revalidation."""
+        if self.revalidation is None or key is None:
+            return None
+        max_stale = self.revalidation.max_stale(method)
+        if max_stale is None:
+            return None
+        stale = self.cache.get_stale(key, max_stale=max_stale)
+        if stale is not None:
+            self.revalidation.stats.record(method, 'served')
+            self._refresh(method, params, fields, key)
+        return stale
+
+    def _refresh(self, method, params, fields, key):
+        """Start the background refresh of a cached call."""
+        self.revalidation.refresh(method, key,
+                                  lambda: self._fetch(method, dict(params), fields, key))
+
+    def _admit(self, method, key):
+        """Check the circuit breaker of a method.
+
+        Returns the breaker, and a stale cached value to serve instead of calling the
+        API when the breaker is open. Raises CircuitOpenException when it is open and
+        there is no such value.
+
+        """
+        if self.breakers is None:
+            return None, None
+        breaker = self.breakers.get(method)
+        if breaker.allow():
+            return breaker, None
+        stale = self.cache.get_stale(key) if key is not None else None
+        if stale is None:
+            raise CircuitOpenException('Calls to /%s/ are suspended after repeated failures.'
+                                       % self.breakers.family(method))
+        return breaker, stale
+
+    def _decode(self, method, req, fields, key):
+        """Decode a response, index it, project it on fields and cache it."""
+        self._record_transfer(method, req)
+        data = req.json()
+        if self.index is not None:
+            self.index.add_response(method, data)
+        data = project(data, fields, search=method.strip('/').startswith('search'))
+        if key is not None:
+            self.cache.set(key, data)
+        return data
+
+    def _record_transfer(self, method, req):
+        """Count the compressed and decoded sizes of a response."""
+        encoding = req.headers.get('Content-Encoding')
+        body_bytes = len(req.content)
+        wire_bytes = self.transport.wire_bytes(req)
+        if wire_bytes is None:
+            length = req.headers.get('Content-Length')
+            wire_bytes = int(length) if length and encoding else body_bytes
+        self.transfer_stats.record(method, wire_bytes, body_bytes, encoding)
 
 
 ###############################
@@ -128,25 +350,30 @@ class BlitzrClient(object):
 ###############################
 
 
-    def get_artist(self, uuid=None, slug=None, extras=[], extras_limit=None):
+    def get_artist(self, uuid=None, slug=None, extras=[], extras_limit=None, fields=None):
         """Get an Artist
 
         :param uuid: The Artist UUID
         :param slug: The Artist Slug
         :param extras: Artist extras : aliases, websites, relations
+        :param fields: Only return these fields (dotted names for nested fields). Extras
+            are deduced from the fields when not given
         :type uuid: string
         :type slug: string
         :type extras: array
+        :type fields: array
         :return: Artist
         :rtype: dictionary
 
         """
+        if fields is not None and not extras:
+            extras = select_extras(fields, self.ARTIST_EXTRAS)
         return self._request('/artist/', {
             'uuid'         : uuid,
             'slug'         : slug,
             'extras'       : ','.join(extras) if extras else None,
             'extras_limit' : extras_limit
-        })
+        }, fields)
 
     def get_artist_aliases(self, uuid=None, slug=None):
         """Get aliases for an Artist
@@ -215,13 +442,9 @@ class BlitzrClient(object):
         :rtype: generator
 
         """
-        while True:
-            bands = self.get_artist_bands(uuid, slug, start, limit)
-            for band in bands:
-                yield band
-            start += limit
-            if len(bands) < limit:
-                break
+        return self._paginate(
+            lambda start, limit: self.get_artist_bands(uuid, slug, start, limit),
+            start, limit)
 
     def get_artist_biography(self, uuid=None, slug=None, lang=None, license=None, source=None, html_format=False,
                              url_scheme=None):
@@ -292,13 +515,9 @@ class BlitzrClient(object):
         :rtype: generator
 
         """
-        while True:
-            events = self.get_artist_events(uuid, slug, start, limit)
-            for event in events:
-                yield event
-            start += limit
-            if len(events) < limit:
-                break
+        return self._paginate(
+            lambda start, limit: self.get_artist_events(uuid, slug, start, limit),
+            start, limit)
 
     def get_artist_harmonia(self, uuid=None, slug=None):
         """Get an Artist's identifiers in other databases.
@@ -353,13 +572,9 @@ class BlitzrClient(object):
         :rtype: generator
 
         """
-        while True:
-            members = self.get_artist_members(uuid, slug, start, limit)
-            for member in members:
-                yield member
-            start += limit
-            if len(members) < limit:
-                break
+        return self._paginate(
+            lambda start, limit: self.get_artist_members(uuid, slug, start, limit),
+            start, limit)
 
     def get_artist_related(self, uuid=None, slug=None, start=0, limit=10):
         """Get related Artists
@@ -398,13 +613,9 @@ class BlitzrClient(object):
         :rtype: generator
 
         """
-        while True:
-            related = self.get_artist_related(uuid, slug, start, limit)
-            for artist in related:
-                yield artist
-            start += limit
-            if len(related) < limit:
-                break
+        return self._paginate(
+            lambda start, limit: self.get_artist_related(uuid, slug, start, limit),
+            start, limit)
 
     def get_artist_releases(self, uuid=None, slug=None, start=0, limit=10, release_type=None,
                             release_format=None, credited=False):
@@ -460,14 +671,10 @@ class BlitzrClient(object):
         :rtype: generator
 
         """
-        while True:
-            releases = self.get_artist_releases(uuid, slug, start, limit, release_type,
-                                                release_format, credited)
-            for release in releases:
-                yield release
-            start += limit
-            if len(releases) < limit:
-                break
+        return self._paginate(
+            lambda start, limit: self.get_artist_releases(uuid, slug, start, limit, release_type,
+                                                          release_format, credited),
+            start, limit)
 
     def get_artist_similar(self, uuid=None, slug=None, filters={}, start=0, limit=10):
         """Get similar Artists
@@ -515,13 +722,9 @@ class BlitzrClient(object):
         :rtype: generator
 
         """
-        while True:
-            similar = self.get_artist_similar(uuid, slug, filters, start, limit)
-            for artist in similar:
-                yield artist
-            start += limit
-            if len(similar) < limit:
-                break
+        return self._paginate(
+            lambda start, limit: self.get_artist_similar(uuid, slug, filters, start, limit),
+            start, limit)
 
     def get_artist_summary(self, uuid=None, slug=None):
         """Get an Artist's summary
@@ -590,17 +793,20 @@ class BlitzrClient(object):
             'slug'  : slug,
         })
 
-    def search_event(self, query=None, filters={}, start=0, limit=10):
+    def search_event(self, query=None, filters={}, start=0, limit=10, fields=None):
         """Search Artist by query and filters.
 
         :param query: Your query
         :param filters: Filter results. Available filters : artist, country_code, city, venue, date_start, date_end, latitude, longitude, radius
         :param start: Offset for pagination
         :param limit: Limit for pagination
+        :param fields: Only return these fields of the results, add 'total' to get the
+            total count of results
         :type query: string
         :type filters: dict
         :type start: int
         :type limit: int
+        :type fields: array
         :return: Artists
         :rtype: list
 
@@ -609,25 +815,28 @@ class BlitzrClient(object):
             'query'         : query,
             'start'         : start,
             'limit'         : limit,
-            'extras'        : 'true'
+            'extras'        : search_extras(fields)
         }
 
         for f_name in filters:
             params['filters[%s]' % (f_name)] = filters[f_name]
 
-        return self._request('/search/event/', params)
+        return self._request('/search/event/', params, fields)
 
-    def iter_search_event(self, query=None, filters={}, start=0, limit=10):
+    def iter_search_event(self, query=None, filters={}, start=0, limit=10, fields=None):
         """Search Artist by query and filters.
 
         :param query: Your query
         :param filters: Filter results. Available filters : artist, country_code, city, venue, date_start, date_end, latitude, longitude, radius
         :param start: Offset for pagination
         :param limit: Size of generator batc
+        :param fields: Only return these fields of the results, add 'total' to get the
+            total count of results
         :type query: string
         :type filters: dict
         :type start: int
         :type limit: int
+        :type fields: array
         :return: Artists
         :rtype: SearchGenerator
 
@@ -636,13 +845,13 @@ class BlitzrClient(object):
             'query'         : query,
             'start'         : start,
             'limit'         : limit,
-            'extras'        : 'true'
+            'extras'        : search_extras(fields)
         }
 
         for f_name in filters:
             params['filters[%s]' % (f_name)] = filters[f_name]
 
-        return SearchGenerator(self, 'search/event/', params)
+        return SearchGenerator(self, '/search/event/', params, fields)
 
 
 ###############################
@@ -746,25 +955,30 @@ class BlitzrClient(object):
 ##          Labels           ##
 ###############################
 
-    def get_label(self, uuid=None, slug=None, extras=[], extras_limit=None):
+    def get_label(self, uuid=None, slug=None, extras=[], extras_limit=None, fields=None):
         """Get a Label
 
         :param uuid: The Label UUID
         :param slug: The Label Slug
         :param extras: Label extras : biography, websites, relations
+        :param fields: Only return these fields (dotted names for nested fields). Extras
+            are deduced from the fields when not given
         :type uuid: string
         :type slug: string
         :type extras: array
+        :type fields: array
         :return: Label
         :rtype: dictionary
 
         """
+        if fields is not None and not extras:
+            extras = select_extras(fields, self.LABEL_EXTRAS)
         return self._request('/label/', {
             'uuid'         : uuid,
             'slug'         : slug,
             'extras'       : ','.join(extras) if extras else None,
             'extras_limit' : extras_limit
-        })
+        }, fields)
 
     def get_label_artists(self, uuid=None, slug=None, start=0, limit=10):
         """Get a Label's artists
@@ -803,13 +1017,9 @@ class BlitzrClient(object):
         :rtype: generator
 
         """
-        while True:
-            artists = self.get_label_artists(uuid, slug, start, limit)
-            for artist in artists:
-                yield artist
-            start += limit
-            if len(artists) < limit:
-                break
+        return self._paginate(
+            lambda start, limit: self.get_label_artists(uuid, slug, start, limit),
+            start, limit)
 
     def get_label_biography(self, uuid=None, slug=None, html_format=False, url_scheme=None):
         """Get a Label's biography
@@ -891,13 +1101,9 @@ class BlitzrClient(object):
         :rtype: generator
 
         """
-        while True:
-            releases = self.get_label_releases(uuid, slug, release_format, start, limit)
-            for release in releases:
-                yield release
-            start += limit
-            if len(releases) < limit:
-                break
+        return self._paginate(
+            lambda start, limit: self.get_label_releases(uuid, slug, release_format, start, limit),
+            start, limit)
 
     def get_label_similar(self, uuid=None, slug=None, filters={}, start=0, limit=10):
         """Get similar Labels
@@ -945,13 +1151,9 @@ class BlitzrClient(object):
         :rtype: generator
 
         """
-        while True:
-            labels = self.get_label_similar(uuid, slug, filters, start, limit)
-            for label in labels:
-                yield label
-            start += limit
-            if len(labels) < limit:
-                break
+        return self._paginate(
+            lambda start, limit: self.get_label_similar(uuid, slug, filters, start, limit),
+            start, limit)
 
     def get_label_websites(self, uuid=None, slug=None):
         """Get Label's websites
@@ -1211,7 +1413,8 @@ class BlitzrClient(object):
 ##          Search           ##
 ###############################
 
-    def iter_search(self, query=None, types=[], autocomplete=False, start=0, limit=10):
+    def iter_search(self, query=None, types=[], autocomplete=False, start=0,
+                    limit=10, fields=None):
         """Search multiple entities.
 
         :param query: Your query
@@ -1219,26 +1422,30 @@ class BlitzrClient(object):
         :param autocomplete: Enable predictive search
         :param start: Offset for pagination
         :param limit: Size of generator batch
+        :param fields: Only return these fields of the results, add 'total' to get the
+            total count of results
         :type query: string
         :type filters: dict
         :type autocomplete: bool
         :type start: int
         :type limit: int
+        :type fields: array
         :return: Labels
         :rtype: SearchGenerator
 
         """
 
-        return SearchGenerator(self, 'search/', {
+        return SearchGenerator(self, '/search/', {
             'query'         : query,
             'type'          : ','.join(types) if types else None,
             'autocomplete'  : 'true' if autocomplete else 'false',
             'start'         : start,
             'limit'         : limit,
-            'extras'        : 'true'
-        })
+            'extras'        : search_extras(fields)
+        }, fields)
 
-    def search_artist(self, query=None, filters={}, autocomplete=False, start=0, limit=10):
+    def search_artist(self, query=None, filters={}, autocomplete=False, start=0,
+                      limit=10, fields=None):
         """Search Artist by query and filters.
 
         :param query: Your query
@@ -1246,11 +1453,14 @@ class BlitzrClient(object):
         :param autocomplete: Enable predictive search
         :param start: Offset for pagination
         :param limit: Limit for pagination
+        :param fields: Only return these fields of the results, add 'total' to get the
+            total count of results
         :type query: string
         :type filters: dict
         :type autocomplete: bool
         :type start: int
         :type limit: int
+        :type fields: array
         :return: Artists
         :rtype: list
 
@@ -1260,15 +1470,16 @@ class BlitzrClient(object):
             'autocomplete'  : 'true' if autocomplete else 'false',
             'start'         : start,
             'limit'         : limit,
-            'extras'        : 'true'
+            'extras'        : search_extras(fields)
         }
 
         for f_name in filters:
             params['filters[%s]' % (f_name)] = filters[f_name]
 
-        return self._request('/search/artist/', params)
+        return self._request('/search/artist/', params, fields)
 
-    def iter_search_artist(self, query=None, filters={}, autocomplete=False, start=0, limit=10):
+    def iter_search_artist(self, query=None, filters={}, autocomplete=False, start=0,
+                           limit=10, fields=None):
         """Search Artist by query and filters.
 
         :param query: Your query
@@ -1276,11 +1487,14 @@ class BlitzrClient(object):
         :param autocomplete: Enable predictive search
         :param start: Offset for pagination
         :param limit: Size of generator batch
+        :param fields: Only return these fields of the results, add 'total' to get the
+            total count of results
         :type query: string
         :type filters: dict
         :type autocomplete: bool
         :type start: int
         :type limit: int
+        :type fields: array
         :return: Artists
         :rtype: SearchGenerator
 
@@ -1290,15 +1504,16 @@ class BlitzrClient(object):
             'autocomplete'  : 'true' if autocomplete else 'false',
             'start'         : start,
             'limit'         : limit,
-            'extras'        : 'true'
+            'extras'        : search_extras(fields)
         }
 
         for f_name in filters:
             params['filters[%s]' % (f_name)] = filters[f_name]
 
-        return SearchGenerator(self, 'search/artist/', params)
+        return SearchGenerator(self, '/search/artist/', params, fields)
 
-    def search_label(self, query=None, filters={}, autocomplete=False, start=0, limit=10):
+    def search_label(self, query=None, filters={}, autocomplete=False, start=0,
+                     limit=10, fields=None):
         """Search Label by query and filters.
 
         :param query: Your query
@@ -1306,11 +1521,14 @@ class BlitzrClient(object):
         :param autocomplete: Enable predictive search
         :param start: Offset for pagination
         :param limit: Limit for pagination
+        :param fields: Only return these fields of the results, add 'total' to get the
+            total count of results
         :type query: string
         :type filters: dict
         :type autocomplete: bool
         :type start: int
         :type limit: int
+        :type fields: array
         :return: Labels
         :rtype: list
 
@@ -1320,15 +1538,16 @@ class BlitzrClient(object):
             'autocomplete'  : 'true' if autocomplete else 'false',
             'start'         : start,
             'limit'         : limit,
-            'extras'        : 'true'
+            'extras'        : search_extras(fields)
         }
 
         for f_name in filters:
             params['filters[%s]' % (f_name)] = filters[f_name]
 
-        return self._request('/search/label/', params)
+        return self._request('/search/label/', params, fields)
 
-    def iter_search_label(self, query=None, filters={}, autocomplete=False, start=0, limit=10):
+    def iter_search_label(self, query=None, filters={}, autocomplete=False, start=0,
+                          limit=10, fields=None):
         """Search Label by query and filters.
 
         :param query: Your query
@@ -1336,11 +1555,14 @@ class BlitzrClient(object):
         :param autocomplete: Enable predictive search
         :param start: Offset for pagination
         :param limit: Size of generator batch
+        :param fields: Only return these fields of the results, add 'total' to get the
+            total count of results
         :type query: string
         :type filters: dict
         :type autocomplete: bool
         :type start: int
         :type limit: int
+        :type fields: array
         :return: Labels
         :rtype: SearchGenerator
 
@@ -1350,16 +1572,16 @@ class BlitzrClient(object):
             'autocomplete'  : 'true' if autocomplete else 'false',
             'start'         : start,
             'limit'         : limit,
-            'extras'        : 'true'
+            'extras'        : search_extras(fields)
         }
 
         for f_name in filters:
             params['filters[%s]' % (f_name)] = filters[f_name]
 
-        return SearchGenerator(self, 'search/label/', params)
+        return SearchGenerator(self, '/search/label/', params, fields)
 
     def search_release(self, query=None, filters={}, autocomplete=False, start=0,
-                       limit=10):
+                       limit=10, fields=None):
         """Search Release by query and filters.
 
         :param query: Your query
@@ -1368,11 +1590,14 @@ class BlitzrClient(object):
         :param autocomplete: Enable predictive search
         :param start: Offset for pagination
         :param limit: Limit for pagination
+        :param fields: Only return these fields of the results, add 'total' to get the
+            total count of results
         :type query: string
         :type filters: dict
         :type autocomplete: bool
         :type start: int
         :type limit: int
+        :type fields: array
         :return: Releases
         :rtype: list
 
@@ -1382,16 +1607,16 @@ class BlitzrClient(object):
             'autocomplete'  : 'true' if autocomplete else 'false',
             'start'         : start,
             'limit'         : limit,
-            'extras'        : 'true'
+            'extras'        : search_extras(fields)
         }
 
         for f_name in filters:
             params['filters[%s]' % (f_name)] = filters[f_name]
 
-        return self._request('/search/release/', params)
+        return self._request('/search/release/', params, fields)
 
     def iter_search_release(self, query=None, filters={}, autocomplete=False, start=0,
-                            limit=10):
+                            limit=10, fields=None):
         """Search Release by query and filters.
 
         :param query: Your query
@@ -1400,11 +1625,14 @@ class BlitzrClient(object):
         :param autocomplete: Enable predictive search
         :param start: Offset for pagination
         :param limit: Size of generator batch
+        :param fields: Only return these fields of the results, add 'total' to get the
+            total count of results
         :type query: string
         :type filters: dict
         :type autocomplete: bool
         :type start: int
         :type limit: int
+        :type fields: array
         :return: Releases
         :rtype: SearchGenerator
 
@@ -1414,15 +1642,15 @@ class BlitzrClient(object):
             'autocomplete'  : 'true' if autocomplete else 'false',
             'start'         : start,
             'limit'         : limit,
-            'extras'        : 'true'
+            'extras'        : search_extras(fields)
         }
 
         for f_name in filters:
             params['filters[%s]' % (f_name)] = filters[f_name]
 
-        return SearchGenerator(self, 'search/release/', params)
+        return SearchGenerator(self, '/search/release/', params, fields)
 
-    def search_track(self, query=None, filters={}, start=0, limit=10):
+    def search_track(self, query=None, filters={}, start=0, limit=10, fields=None):
         """Search Track by query and filters.
 
         :param query: Your query
@@ -1430,10 +1658,13 @@ class BlitzrClient(object):
             year, location
         :param start: Offset for pagination
         :param limit: Limit for pagination
+        :param fields: Only return these fields of the results, add 'total' to get the
+            total count of results
         :type query: string
         :type filters: dict
         :type start: int
         :type limit: int
+        :type fields: array
         :return: Tracks
         :rtype: list
 
@@ -1442,15 +1673,15 @@ class BlitzrClient(object):
             'query'         : query,
             'start'         : start,
             'limit'         : limit,
-            'extras'        : 'true'
+            'extras'        : search_extras(fields)
         }
 
         for f_name in filters:
             params['filters[%s]' % (f_name)] = filters[f_name]
 
-        return self._request('/search/track/', params)
+        return self._request('/search/track/', params, fields)
 
-    def iter_search_track(self, query=None, filters={}, start=0, limit=10):
+    def iter_search_track(self, query=None, filters={}, start=0, limit=10, fields=None):
         """Search Track by query and filters.
 
         :param query: Your query
@@ -1458,10 +1689,13 @@ class BlitzrClient(object):
             year, location
         :param start: Offset for pagination
         :param limit: Size of generator batch
+        :param fields: Only return these fields of the results, add 'total' to get the
+            total count of results
         :type query: string
         :type filters: dict
         :type start: int
         :type limit: int
+        :type fields: array
         :return: Tracks
         :rtype: SearchGenerator
 
@@ -1470,13 +1704,88 @@ class BlitzrClient(object):
             'query'         : query,
             'start'         : start,
             'limit'         : limit,
-            'extras'        : 'true'
+            'extras'        : search_extras(fields)
         }
 
         for f_name in filters:
             params['filters[%s]' % (f_name)] = filters[f_name]
 
-        return SearchGenerator(self, 'search/track/', params)
+        return SearchGenerator(self, '/search/track/', params, fields)
+
+    def search_local(self, entity, query=None, filters={}, start=0, limit=10, fallback=True):
+        """Search the entities already fetched, using the client's LocalIndex.
+
+        :param entity: The searched entity (artist|label|release)
+        :param query: Your query
+        :param filters: Filter results, same filters as search_artist, search_label and
+            search_release
+        :param start: Offset for pagination
+        :param limit: Limit for pagination
+        :param fallback: Call the API search when nothing matches locally
+        :type entity: string
+        :type query: string
+        :type filters: dict
+        :type start: int
+        :type limit: int
+        :type fallback: bool
+        :return: results and total
+        :rtype: dictionary
+
+        """
+        answer = self._search_index(entity, query, filters, start, limit)
+        if answer['total'] or not fallback:
+            return answer
+        return getattr(self, 'search_%s' % entity)(query, filters, False, start, limit)
+
+    def _search_index(self, entity, query, filters, start, limit):
+        """Search the client's LocalIndex, see search_local."""
+        if entity not in ('artist', 'label', 'release'):
+            raise ConfigurationException('Local search is not available for %s.' % entity)
+        if self.index is None:
+            raise ConfigurationException('The client has no local index.')
+        return self.index.search(entity, query, filters, start, limit)
+
+    def search_federated(self, query=None, types=None, autocomplete=False, start=0, limit=10):
+        """Search several entity types concurrently, each one with its own filters.
+
+        :param query: Your query
+        :param types: Filters by searched type. Available types : artist, label, release,
+            track, event. All types without filters by default
+        :param autocomplete: Enable predictive search (artist, label and release only)
+        :param start: Offset for pagination of every type
+        :param limit: Limit for pagination of every type
+        :type query: string
+        :type types: dict
+        :type autocomplete: bool
+        :type start: int
+        :type limit: int
+        :return: Results of every type
+        :rtype: FederatedSearch
+
+        """
+        return FederatedSearch(self._federated_calls(query, types, autocomplete, start, limit),
+                               self.max_workers)
+
+    def _federated_calls(self, query, types, autocomplete, start, limit):
+        """Calls of the typed searches of search_federated, by type."""
+        if types is None:
+            types = dict((name, {}) for name in FederatedSearch.TYPES)
+        elif not isinstance(types, dict):
+            types = dict((name, {}) for name in types)
+        for name in types:
+            if name not in FederatedSearch.TYPES:
+                raise ConfigurationException('Unknown search type: %s' % name)
+
+        calls = {}
+        for name, filters in types.items():
+            search = getattr(self, 'search_%s' % name)
+            if name in ('track', 'event'):
+                calls[name] = (lambda search, filters: lambda: search(
+                    query, filters or {}, start, limit))(search, filters)
+            else:
+                calls[name] = (lambda search, filters: lambda: search(
+                    query, filters or {}, autocomplete, start, limit))(search, filters)
+        return calls
 
 ###############################
 ##           Shop            ##
@@ -1609,6 +1918,72 @@ class BlitzrClient(object):
         for product in self.get_shop_track(uuid):
             yield product
 
+    def get_shop_products(self, entity, uuid=None, slug=None, product_types=None, ttl=60):
+        """Get an Artist's, Label's or Release's products for several types in one call.
+
+        Every product type is fetched concurrently, offers listed under several types are
+        merged, and the result is cached for ttl seconds.
+
+        :param entity: The entity type (artist|label|release)
+        :param uuid: The entity UUID
+        :param slug: The entity Slug
+        :param product_types: The product's types, all the types of the entity by default
+        :param ttl: Cache duration of the result in seconds, 0 to bypass the cache
+        :type entity: string
+        :type uuid: string
+        :type slug: string
+        :type product_types: array
+        :type ttl: int
+        :return: Products: 'offers' holds the deduplicated offers, each with its
+            'product_types', 'product_types' maps every type to its offers and 'errors'
+            maps the types that failed to their error
+        :rtype: dictionary
+
+        """
+        product_types, key, cached = self._cached_shop_products(entity, uuid, slug,
+                                                                product_types, ttl)
+        if cached is not None:
+            return cached
+
+        fetch = getattr(self, 'get_shop_%s' % entity)
+        outcomes = run_parallel([
+            (lambda product_type: lambda: fetch(product_type, uuid, slug))(product_type)
+            for product_type in product_types
+        ], self.max_workers)
+        return self._merge_shop_products(product_types, outcomes, key, ttl)
+
+    def _cached_shop_products(self, entity, uuid, slug, product_types, ttl):
+        """Product types of a get_shop_products call, its cache key and cached result."""
+        if entity not in self.SHOP_PRODUCT_TYPES:
+            raise ConfigurationException('Unknown shop entity: %s' % entity)
+        product_types = list(product_types or self.SHOP_PRODUCT_TYPES[entity])
+        key = cache_key('/buy/%s/' % entity, {
+            'uuid'  : uuid,
+            'slug'  : slug,
+            'types' : ','.join(sorted(product_types))
+        })
+        return product_types, key, self._shop_cache.get(key) if ttl else None
+
+    def _merge_shop_products(self, product_types, outcomes, key, ttl):
+        """Merge the (offers, exception) outcomes of every product type, and cache them."""
+        products = {'offers': [], 'product_types': {}, 'errors': {}}
+        merged = {}
+        for product_type, (offers, exception) in zip(product_types, outcomes):
+            if exception is not None:
+                products['errors'][product_type] = exception
+                continue
+            products['product_types'][product_type] = offers or []
+            for offer in offers or []:
+                identifier = offer_key(offer)
+                if identifier not in merged:
+                    merged[identifier] = dict(offer, product_types=[])
+                    products['offers'].append(merged[identifier])
+                merged[identifier]['product_types'].append(product_type)
+
+        if ttl and not products['errors']:
+            self._shop_cache.set(key, products, ttl)
+        return products
+
 ###############################
 ##            Tag            ##
 ###############################
@@ -1658,13 +2033,9 @@ class BlitzrClient(object):
         :rtype: generator
 
         """
-        while True:
-            artists = self.get_tag_artists(slug, start, limit)
-            for artist in artists:
-                yield artist
-            start += limit
-            if len(artists) < limit:
-                break
+        return self._paginate(
+            lambda start, limit: self.get_tag_artists(slug, start, limit),
+            start, limit)
 
     def get_tag_releases(self, slug=None, start=0, limit=10):
         """Get Releases from a Tag
@@ -1698,13 +2069,9 @@ class BlitzrClient(object):
         :rtype: generator
 
         """
-        while True:
-            releases = self.get_tag_releases(slug, start, limit)
-            for release in releases:
-                yield release
-            start += limit
-            if len(releases) < limit:
-                break
+        return self._paginate(
+            lambda start, limit: self.get_tag_releases(slug, start, limit),
+            start, limit)
 
 ###############################
 ##           Track           ##
@@ -1748,11 +2115,156 @@ class BlitzrClient(object):
         for source in self.get_track_sources(uuid):
             yield source
 
+###############################
+##          Batching         ##
+###############################
+
+    def batch(self, window=0.005):
+        """Collect lookups and run them concurrently.
+
+        Inside the with block, the API calls of the client made from this thread are
+        queued and return LazyResult values, so N+1 loops run concurrently unchanged.
+        The planner also exposes the get_* and search_* methods of the client, which
+        return futures. Identical lookups are only run once, see blitzr.batch.
+
+        :param window: Seconds to collect lookups before dispatching them, None to only
+            dispatch when a result is needed or at the end of the with block
+        :type window: float
+        :return: Batch planner, to use as a context manager
+        :rtype: BatchPlanner
+
+        """
+        return BatchPlanner(self, window)
+
+###############################
+##          Entities         ##
+###############################
+
+    def artist(self, uuid=None, slug=None):
+        """Get a lazy Artist, fetched on first access.
+
+        :param uuid: The Artist UUID
+        :param slug: The Artist Slug
+        :type uuid: string
+        :type slug: string
+        :return: Artist
+        :rtype: Artist
+
+        """
+        return Artist(self, uuid, slug)
+
+    def label(self, uuid=None, slug=None):
+        """Get a lazy Label, fetched on first access.
+
+        :param uuid: The Label UUID
+        :param slug: The Label Slug
+        :type uuid: string
+        :type slug: string
+        :return: Label
+        :rtype: Label
+
+        """
+        return Label(self, uuid, slug)
+
+    def release(self, uuid=None, slug=None):
+        """Get a lazy Release, fetched on first access.
+
+        :param uuid: The Release UUID
+        :param slug: The Release Slug
+        :type uuid: string
+        :type slug: string
+        :return: Release
+        :rtype: Release
+
+        """
+        return Release(self, uuid, slug)
+
+    def track(self, uuid=None):
+        """Get a lazy Track, fetched on first access.
+
+        :param uuid: The Track UUID
+        :type uuid: string
+        :return: Track
+        :rtype: Track
+
+        """
+        return Track(self, uuid)
+
 
 ###############################
 ##     Search Generators     ##
 ###############################
 
+class FederatedSearch(object):
+    """Results of a search_federated call.
+
+    The typed searches are started concurrently. Iterating yields (type, result) pairs
+    as soon as each type responds, **ranked()** waits for every type and merges the
+    results by score. **totals** holds the total of every type that responded and
+    **errors** the exception of every type that failed.
+
+    :Example:
+
+    >>> search = blitzr.search_federated('eminem', {'artist': {}, 'release': {'year': 2013}})
+    >>> for entity_type, result in search:
+    >>>     print entity_type, result.get('name')
+    >>> print search.totals
+    {'artist': 12, 'release': 3}
+
+    """
+
+    TYPES = ('artist', 'label', 'release', 'track', 'event')
+
+    def __init__(self, calls, max_workers=8):
+        self.totals = {}
+        self.errors = {}
+        self._results = {}
+        self._executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(calls))))
+        self._futures = dict((self._executor.submit(call), name) for name, call in calls.items())
+        self._executor.shutdown(wait=False)
+
+    def __iter__(self):
+        for future in as_completed(list(self._futures)):
+            name = self._futures[future]
+            for result in self._collect(name, future):
+                yield name, result
+
+    def ranked(self):
+        """Wait for every type and merge the results by decreasing score.
+
+        :return: (type, result) pairs
+        :rtype: list
+
+        """
+        merged = []
+        for future, name in self._futures.items():
+            merged.extend((name, result) for result in self._collect(name, future))
+        return sorted(merged, key=lambda pair: _score(pair[1]), reverse=True)
+
+    def __len__(self):
+        "This method returns the total number of elements of every type"
+        for future, name in self._futures.items():
+            self._collect(name, future)
+        return sum(self.totals.values())
+
+    def _collect(self, name, future):
+        if name not in self._results:
+            exception = future.exception()
+            if exception is not None:
+                self.errors[name] = exception
+                self._results[name] = []
+            else:
+                answer = future.result() or {}
+                self._results[name] = answer.get('results') or []
+                self.totals[name] = answer.get('total') or 0
+        return self._results[name]
+
+
+def _score(result):
+    score = result.get('score', result.get('_score')) if isinstance(result, dict) else None
+    return score or 0
+
+
 class SearchGenerator(object):
     """Custom Generator for Search requests, provides length compatibility.
 
@@ -1786,13 +2298,20 @@ class SearchGenerator(object):
     ...
 
     """
-    def __init__(self, client=None, endpoint=None, params={}):
+    def __init__(self, client=None, endpoint=None, params={}, fields=None):
         self.client = client
         self.endpoint = endpoint
         self.params = params
+        self.fields = fields
         self.cursor = -1
         self.results = None
         self._length = None
+        self._pager = None
+        if getattr(client, 'adaptive_paging', False):
+            self._pager = AdaptivePager(params.get('limit'), client.MAX_PAGE_SIZE)
+            params['limit'] = self._pager.limit
+        self._page_limit = params.get('limit')
+        self._fetched = None
 
     def __iter__(self):
         return self
@@ -1803,7 +2322,7 @@ class SearchGenerator(object):
     def next(self):
         """Get next result."""
         self.cursor += 1
-        if self.results is None or self.cursor == self.params.get('limit'):
+        if self.results is None or self.cursor == self._page_limit:
             self._request()
             self.cursor = 0
 
@@ -1813,8 +2332,15 @@ class SearchGenerator(object):
             raise StopIteration()
 
     def _request(self):
-        answer = self.client._request(self.endpoint, self.params)
-        self.params['start'] += self.params.get('limit')
+        if self._pager is not None and self._fetched is not None:
+            self.params['limit'] = self._pager.next_limit(self._latency,
+                                                          time.time() - self._fetched)
+        self._page_limit = self.params.get('limit')
+        requested = time.time()
+        answer = self.client._request(self.endpoint, self.params, self.fields)
+        self._fetched = time.time()
+        self._latency = self._fetched - requested
+        self.params['start'] += self._page_limit
         if self.params.get('extras') == 'true':
             self.results = answer.get('results')
             self._length = answer.get('total')
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Process crawler
+    ===============
+
+    Crawl paginated endpoints with I/O threads fetching pages and a process pool
+    decoding and transforming them, so CPU heavy post-processing is not serialized by
+    the GIL.
+
+    Raw pages are handed to the processes through shared memory (Python 3.8+) instead
+    of being pickled, and the number of pages fetched ahead of the consumer is bounded.
+    Without a transform, pages are decoded by the I/O threads: sending the decoded
+    items back from a process would cost as much as decoding them.
+
+    :Example:
+
+    >>> from blitzr import BlitzrClient, ProcessCrawler
+    >>>
+    >>> def summarize(release):   # must be a module level function
+    >>>     return release['uuid'], len(release.get('tracks', []))
+    >>>
+    >>> with ProcessCrawler(BlitzrClient(your_api_key), summarize) as crawler:
+    >>>     for uuid, tracks in crawler.crawl_tag_releases('rock'):
+    >>>         print uuid, tracks
+
+"""
+
+import json
+import multiprocessing
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+
+def _process_pool(processes):
+    # Forking while the I/O threads hold locks can leave the children deadlocked: spawn
+    # them instead, where the start method can be chosen (Python 3.7+).
+    try:
+        return ProcessPoolExecutor(max_workers=processes,
+                                   mp_context=multiprocessing.get_context('spawn'))
+    except (AttributeError, TypeError):
+        return ProcessPoolExecutor(max_workers=processes)
+
+
+def _short_page(future, limit):
+    # A fetched page with fewer items than requested marks the end of the results.
+    return (future.done() and not future.cancelled() and future.exception() is None and
+            future.result()[0] < limit)
+
+
+def decode_page(page, transform=None):
+    """Decode a page of results and transform its items.
+
+    :param page: The raw response body, or (shared memory name, size)
+    :param transform: Module level function applied to every item, None to keep them
+    :type page: bytes | tuple
+    :type transform: callable
+    :return: The number of items of the page and the transformed items
+    :rtype: tuple
+
+    """
+    if isinstance(page, tuple):
+        memory = shared_memory.SharedMemory(name=page[0])
+        try:
+            content = bytes(memory.buf[:page[1]])
+        finally:
+            memory.close()
+    else:
+        content = page
+    answer = json.loads(content.decode('utf-8'))
+    if isinstance(answer, dict):
+        items = answer.get('results') or []
+    else:
+        items = answer or []
+    if transform is not None:
+        items = [transform(item) for item in items]
+    return len(items), items
+
+
+class ProcessCrawler(object):
+    """Crawl paginated endpoints, decoding pages in a process pool.
+
+    :param client: The BlitzrClient fetching the pages
+    :param transform: Module level function applied to every item in the processes, its
+        module must be importable by them. None to decode the pages in the I/O threads
+        without using the processes
+    :param io_workers: Number of threads fetching pages
+    :param processes: Number of processes decoding pages, the number of CPUs by default
+    :param max_pending: Maximum number of pages fetched ahead of the consumer
+    :type client: BlitzrClient
+    :type transform: callable
+    :type io_workers: int
+    :type processes: int
+    :type max_pending: int
+
+    """
+
+    def __init__(self, client, transform=None, io_workers=4, processes=None, max_pending=8):
+        self.client = client
+        self.transform = transform
+        self.io_workers = io_workers
+        self.max_pending = max(max_pending, 1)
+        self._processes = _process_pool(processes)
+        self._threads = ThreadPoolExecutor(max_workers=io_workers)
+
+    def crawl(self, method, params, start=0, limit=100):
+        """Crawl a paginated endpoint.
+
+        :param method: The API method, e.g. '/tag/releases/'
+        :param params: The call parameters, without start and limit
+        :param start: Offset of the first item
+        :param limit: Size of the pages
+        :type method: string
+        :type params: dict
+        :type start: int
+        :type limit: int
+        :return: Transformed items, in order
+        :rtype: generator
+
+        """
+        pending = deque()
+        end = None
+        try:
+            while True:
+                # Pages fetched ahead may already show where the results end.
+                short = [page_start for page_start, future in pending
+                         if _short_page(future, limit)]
+                if short:
+                    end = min(short + ([end] if end is not None else []))
+                while end is None and len(pending) < self.max_pending:
+                    pending.append((start, self._threads.submit(self._page, method, params,
+                                                                start, limit)))
+                    start += limit
+                if not pending:
+                    return
+                page_start, future = pending.popleft()
+                count, items = future.result()
+                for item in items:
+                    yield item
+                if count < limit:
+                    end = page_start
+                while pending and end is not None and pending[-1][0] > end:
+                    pending.pop()[1].cancel()
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    def crawl_tag_releases(self, slug=None, start=0, limit=100):
+        """Crawl the Releases of a Tag, see BlitzrClient.iter_tag_releases.
+
+        :param slug: The Tag Slug
+        :param start: Offset for pagination
+        :param limit: Size of the pages
+        :type slug: string
+        :type start: int
+        :type limit: int
+        :return: Transformed Releases
+        :rtype: generator
+
+        """
+        return self.crawl('/tag/releases/', {'slug': slug}, start, limit)
+
+    def crawl_search_release(self, query=None, filters={}, autocomplete=False, start=0,
+                             limit=100):
+        """Crawl a Release search, see BlitzrClient.iter_search_release.
+
+        :param query: Your query
+        :param filters: Filter results, see BlitzrClient.search_release
+        :param autocomplete: Enable predictive search
+        :param start: Offset for pagination
+        :param limit: Size of the pages
+        :type query: string
+        :type filters: dict
+        :type autocomplete: bool
+        :type start: int
+        :type limit: int
+        :return: Transformed Releases
+        :rtype: generator
+
+        """
+        params = {
+            'query'         : query,
+            'autocomplete'  : 'true' if autocomplete else 'false',
+            'extras'        : 'true'
+        }
+
+        for f_name in filters:
+            params['filters[%s]' % (f_name)] = filters[f_name]
+
+        return self.crawl('/search/release/', params, start, limit)
+
+    def close(self):
+        """Stop the threads and processes."""
+        self._threads.shutdown(wait=True)
+        self._processes.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _page(self, method, params, start, limit):
+        content = self.client._request_raw(method, dict(params, start=start, limit=limit))
+        if self.transform is None:
+            return decode_page(content)
+        if shared_memory is None or not content:
+            return self._processes.submit(decode_page, content, self.transform).result()
+        memory = shared_memory.SharedMemory(create=True, size=len(content))
+        try:
+            memory.buf[:len(content)] = content
+            return self._processes.submit(decode_page, (memory.name, len(content)),
+                                          self.transform).result()
+        finally:
+            memory.close()
+            memory.unlink()
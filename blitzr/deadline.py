@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Deadlines
+    =========
+
+    Bound the time spent by a group of calls, and cancel them.
+
+    A client bound to a deadline (see BlitzrClient.within) checks it before every API
+    call, and never waits on a response longer than the time left. Generators and bulk
+    methods of the bound client make all their calls through it, so the deadline covers
+    every page of a walk and every call of a bulk operation.
+
+    :Example:
+
+    >>> from blitzr import BlitzrClient
+    >>> blitzr = BlitzrClient(your_api_key, timeout=5)
+    >>> releases = list(blitzr.within(30).iter_artist_releases(slug='eminem'))
+
+"""
+
+import threading
+import time
+
+from .exceptions import CancelledException, TimeoutException
+
+
+class Deadline(object):
+    """Point in time after which calls fail with TimeoutException.
+
+    Cancelling a deadline makes the next calls fail with CancelledException, the calls
+    in flight are not interrupted.
+
+    :param seconds: Seconds from now, None for no time limit
+    :type seconds: float
+
+    """
+
+    def __init__(self, seconds=None):
+        self.expires = None if seconds is None else time.time() + seconds
+        self._cancelled = threading.Event()
+
+    def remaining(self):
+        """Seconds left, None without time limit."""
+        if self.expires is None:
+            return None
+        return max(0.0, self.expires - time.time())
+
+    @property
+    def expired(self):
+        return self.expires is not None and time.time() >= self.expires
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Cancel the calls bound to the deadline, from any thread."""
+        self._cancelled.set()
+
+    def check(self):
+        """Raise CancelledException or TimeoutException if no call may start anymore."""
+        if self.cancelled:
+            raise CancelledException('The calls were cancelled.')
+        if self.expired:
+            raise TimeoutException('The deadline of the calls expired.')
@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Lazy entities
+    =============
+
+    Object facades over artists, labels, releases and tracks. Fields and relations are
+    fetched on first access and memoized, and a relation accessed on one entity of a
+    list is loaded concurrently for every entity of that list, instead of one request
+    per entity in a loop.
+
+    :Example:
+
+    >>> from blitzr import BlitzrClient
+    >>> blitzr = BlitzrClient(your_api_key)
+    >>> eminem = blitzr.artist(slug='eminem')
+    >>> print eminem.real_name
+    Marshall Bruce Mathers III
+    >>> for release in eminem.releases:
+    >>>     print release.name, len(release.tracks)   # tracks loaded for every release at once
+
+"""
+
+from .parallel import run_parallel
+
+
+PAGE_SIZE = 50
+
+
+class Entity(object):
+    """Base class of the lazy entities.
+
+    Fields of the entity are read as attributes or items. Relations are attributes
+    listed in **relations**.
+
+    """
+
+    kind = None
+    relations = ()
+    data_relations = ()
+
+    def __init__(self, client, uuid=None, slug=None, data=None, group=None):
+        self._client = client
+        self._uuid = uuid
+        self._slug = slug
+        self._values = {}
+        self._complete = False
+        self._group = group if group is not None else [self]
+        if data is not None:
+            self._values['_data'] = data
+
+    @property
+    def uuid(self):
+        """The entity UUID."""
+        return self._uuid or self._data_field('uuid')
+
+    @property
+    def slug(self):
+        """The entity Slug."""
+        return self._slug or self._data_field('slug')
+
+    @property
+    def data(self):
+        """The entity as returned by the API."""
+        self._fetch()
+        return self._values['_data']
+
+    def get(self, name, default=None):
+        """Get a field of the entity, like dict.get."""
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def prefetch(self, *names):
+        """Load relations (or 'data') now, for this entity and its siblings."""
+        for name in names:
+            if name == 'data':
+                self._fetch()
+            else:
+                self._load(name)
+        return self
+
+    def __getitem__(self, name):
+        data = self._values.get('_data')
+        if data is None or (name not in data and not self._complete):
+            self._fetch()
+            data = self._values['_data']
+        return data[name]
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if name in self.relations:
+            self._load(name)
+            return self._values[name]
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __repr__(self):
+        return '<%s %s>' % (self.__class__.__name__, self._uuid or self._slug or
+                            self._data_field('uuid'))
+
+    def _ids(self):
+        uuid = self.uuid
+        return (uuid, None) if uuid else (None, self.slug)
+
+    def _data_field(self, name):
+        return (self._values.get('_data') or {}).get(name)
+
+    def _fetch(self):
+        if not self._complete:
+            self._load('_data', force=True)
+
+    def _load(self, name, force=False):
+        if name in self._values and not force:
+            return
+        if name in self.data_relations:
+            self._fetch()
+        if name == '_data':
+            pending = [entity for entity in self._group if not entity._complete]
+        else:
+            pending = [entity for entity in self._group if name not in entity._values]
+        loader = getattr(self, '_load_%s' % name.lstrip('_'))
+        outcomes = run_parallel([(lambda entity: lambda: loader.__func__(entity))(entity)
+                                 for entity in pending], self._client.max_workers)
+        for entity, (value, exception) in zip(pending, outcomes):
+            if exception is not None:
+                if entity is self:
+                    raise exception
+                continue
+            entity._values[name] = value
+            if name == '_data':
+                entity._complete = True
+
+    def _wrap(self, cls, items):
+        return EntityList(self._client, cls, items)
+
+
+class EntityList(list):
+    """List of lazy entities loading their relations together."""
+
+    def __init__(self, client, cls, items):
+        super(EntityList, self).__init__()
+        for item in items or []:
+            self.append(cls(client, data=item, group=self))
+
+
+class Artist(Entity):
+    """Lazy Artist.
+
+    Relations: aliases, bands, biography, events, members, related, releases, similar,
+    summary, websites.
+
+    """
+
+    kind = 'artist'
+    relations = ('aliases', 'bands', 'biography', 'events', 'members', 'related', 'releases',
+                 'similar', 'summary', 'websites')
+
+    def _load_data(self):
+        return self._client.get_artist(*self._ids())
+
+    def _load_aliases(self):
+        return self._wrap(Artist, self._client.get_artist_aliases(*self._ids()))
+
+    def _load_bands(self):
+        return self._wrap(Artist, self._client.iter_artist_bands(*self._ids(),
+                                                                  limit=PAGE_SIZE))
+
+    def _load_biography(self):
+        return self._client.get_artist_biography(*self._ids())
+
+    def _load_events(self):
+        return list(self._client.iter_artist_events(*self._ids(), limit=PAGE_SIZE))
+
+    def _load_members(self):
+        return self._wrap(Artist, self._client.iter_artist_members(*self._ids(),
+                                                                    limit=PAGE_SIZE))
+
+    def _load_related(self):
+        return self._wrap(Artist, self._client.iter_artist_related(*self._ids(),
+                                                                    limit=PAGE_SIZE))
+
+    def _load_releases(self):
+        return self._wrap(Release, self._client.iter_artist_releases(*self._ids(),
+                                                                      limit=PAGE_SIZE))
+
+    def _load_similar(self):
+        return self._wrap(Artist, self._client.iter_artist_similar(*self._ids(),
+                                                                    limit=PAGE_SIZE))
+
+    def _load_summary(self):
+        return self._client.get_artist_summary(*self._ids())
+
+    def _load_websites(self):
+        return self._client.get_artist_websites(*self._ids())
+
+
+class Label(Entity):
+    """Lazy Label.
+
+    Relations: artists, biography, releases, similar, websites.
+
+    """
+
+    kind = 'label'
+    relations = ('artists', 'biography', 'releases', 'similar', 'websites')
+
+    def _load_data(self):
+        return self._client.get_label(*self._ids())
+
+    def _load_artists(self):
+        return self._wrap(Artist, self._client.iter_label_artists(*self._ids(),
+                                                                   limit=PAGE_SIZE))
+
+    def _load_biography(self):
+        return self._client.get_label_biography(*self._ids())
+
+    def _load_releases(self):
+        return self._wrap(Release, self._client.iter_label_releases(*self._ids(),
+                                                                     limit=PAGE_SIZE))
+
+    def _load_similar(self):
+        return self._wrap(Label, self._client.iter_label_similar(*self._ids(),
+                                                                  limit=PAGE_SIZE))
+
+    def _load_websites(self):
+        return self._client.get_label_websites(*self._ids())
+
+
+class Release(Entity):
+    """Lazy Release.
+
+    Relations: sources, tracks.
+
+    """
+
+    kind = 'release'
+    relations = ('sources', 'tracks')
+    data_relations = ('tracks',)
+
+    def _load_data(self):
+        return self._client.get_release(*self._ids())
+
+    def _load_sources(self):
+        return self._client.get_release_sources(*self._ids())
+
+    def _load_tracks(self):
+        return self._wrap(Track, self.get('tracks') or [])
+
+
+class Track(Entity):
+    """Lazy Track.
+
+    Relations: sources.
+
+    """
+
+    kind = 'track'
+    relations = ('sources',)
+
+    def _load_data(self):
+        return self._client.get_track(self.uuid)
+
+    def _load_sources(self):
+        return self._client.get_track_sources(self.uuid)
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Event calendar
+    ==============
+
+    Keep a local calendar of the events of many artists.
+
+    EventSync refreshes artists' events with bounded concurrency, sooner for artists
+    with upcoming events, and stores them in an EventStore indexed by date. The
+    store answers date range and location searches, with the filters of
+    search_event, without calling the API.
+
+    :Example:
+
+    >>> from blitzr import BlitzrClient, EventSync
+    >>> sync = EventSync(BlitzrClient(your_api_key), 'events.db')
+    >>> sync.add_artists(artist_uuids)
+    >>> sync.run_once()
+    >>> sync.store.search({'city': 'Paris', 'date_start': '2016-06-01', 'date_end': '2016-06-30'})
+
+"""
+
+import heapq
+import json
+import math
+import sqlite3
+import threading
+import time
+
+from datetime import datetime
+
+from .parallel import imap_unordered
+
+
+def _first(event, *names):
+    for name in names:
+        if event.get(name) not in (None, ''):
+            return event[name]
+    return None
+
+
+def event_fields(event):
+    """Indexed fields of an event: date, city, country_code, venue, latitude, longitude."""
+    venue = event.get('venue') if isinstance(event.get('venue'), dict) else {}
+    location = event.get('location') if isinstance(event.get('location'), dict) else {}
+    places = [event, location, venue]
+    date = _first(event, 'start_date', 'date', 'datetime')
+    fields = {'date': date[:10] if date else None}
+    for name in ('city', 'country_code', 'latitude', 'longitude'):
+        fields[name] = next((place[name] for place in places if place.get(name) is not None),
+                            None)
+    fields['venue'] = venue.get('name') or (event.get('venue') if not venue else None)
+    return fields
+
+
+def distance(latitude, longitude, other_latitude, other_longitude):
+    """Great circle distance in kilometers."""
+    latitude, longitude, other_latitude, other_longitude = [
+        math.radians(float(value)) for value in (latitude, longitude, other_latitude,
+                                                 other_longitude)]
+    haversine = (math.sin((other_latitude - latitude) / 2) ** 2 + math.cos(latitude) *
+                 math.cos(other_latitude) * math.sin((other_longitude - longitude) / 2) ** 2)
+    return 6371 * 2 * math.asin(math.sqrt(haversine))
+
+
+class EventStore(object):
+    """Events stored in SQLite, indexed by date.
+
+    An event is stored once, and linked to every artist whose events list it, e.g. a
+    festival shared by its line-up.
+
+    :param path: SQLite database file, in memory by default
+    :type path: string
+
+    """
+
+    def __init__(self, path=':memory:'):
+        self.path = path
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._connection.executescript(
+                'CREATE TABLE IF NOT EXISTS events ('
+                '  uuid TEXT PRIMARY KEY, date TEXT, city TEXT, country_code TEXT,'
+                '  venue TEXT, latitude REAL, longitude REAL, document TEXT NOT NULL);'
+                'CREATE TABLE IF NOT EXISTS event_artists ('
+                '  event TEXT NOT NULL, artist TEXT NOT NULL, PRIMARY KEY (event, artist));'
+                'CREATE INDEX IF NOT EXISTS events_date ON events (date);'
+                'CREATE INDEX IF NOT EXISTS event_artists_artist ON event_artists (artist);'
+            )
+            self._connection.commit()
+
+    def replace_artist_events(self, artist, events):
+        """Store the events of an artist, unlinking the ones it no longer has.
+
+        Events are kept as long as another artist is linked to them.
+
+        :param artist: The Artist UUID
+        :param events: The artist's events
+        :type artist: string
+        :type events: list
+
+        """
+        rows = []
+        for event in events:
+            if not event.get('uuid'):
+                continue
+            fields = event_fields(event)
+            rows.append((event['uuid'], fields['date'], fields['city'], fields['country_code'],
+                         fields['venue'], fields['latitude'], fields['longitude'],
+                         json.dumps(event)))
+        with self._lock:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            self._connection.execute('DELETE FROM event_artists WHERE artist = ?', (artist,))
+            self._connection.executemany('INSERT OR IGNORE INTO event_artists VALUES (?, ?)',
+                                         [(row[0], artist) for row in rows])
+            self._connection.execute(
+                'DELETE FROM events WHERE NOT EXISTS '
+                '(SELECT 1 FROM event_artists WHERE event = events.uuid)')
+            self._connection.commit()
+
+    def get(self, uuid):
+        """Get a stored event, None if unknown."""
+        with self._lock:
+            row = self._connection.execute('SELECT document FROM events WHERE uuid = ?',
+                                           (uuid,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def next_date(self, artist, today=None):
+        """Date of the next event of an artist, None if it has no upcoming event."""
+        today = today or datetime.utcnow().strftime('%Y-%m-%d')
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT MIN(date) FROM events JOIN event_artists ON event = uuid '
+                'WHERE artist = ? AND date >= ?', (artist, today)
+            ).fetchone()
+        return row[0]
+
+    def search(self, filters={}, start=0, limit=10):
+        """Search stored events, with the filters of search_event.
+
+        :param filters: Filter results. Available filters : artist, country_code, city,
+            venue, date_start, date_end, latitude, longitude, radius (kilometers)
+        :param start: Offset for pagination
+        :param limit: Limit for pagination
+        :type filters: dict
+        :type start: int
+        :type limit: int
+        :return: results and total, sorted by date
+        :rtype: dictionary
+
+        """
+        clauses, values = [], []
+        for name, clause in (('artist',
+                              'uuid IN (SELECT event FROM event_artists WHERE artist = ?)'),
+                             ('country_code', 'LOWER(country_code) = LOWER(?)'),
+                             ('city', 'LOWER(city) = LOWER(?)'),
+                             ('venue', 'LOWER(venue) = LOWER(?)'),
+                             ('date_start', 'date >= ?'),
+                             ('date_end', 'date <= ?')):
+            if filters.get(name) is not None:
+                clauses.append(clause)
+                values.append(filters[name])
+        query = 'SELECT document, latitude, longitude FROM events'
+        if clauses:
+            query += ' WHERE ' + ' AND '.join(clauses)
+        with self._lock:
+            rows = self._connection.execute(query + ' ORDER BY date, uuid', values).fetchall()
+
+        if filters.get('latitude') is not None and filters.get('longitude') is not None:
+            radius = float(filters.get('radius') or 50)
+            rows = [row for row in rows if row[1] is not None and row[2] is not None and
+                    distance(filters['latitude'], filters['longitude'], row[1], row[2]) <= radius]
+        return {
+            'results' : [json.loads(row[0]) for row in rows[start:start + limit]],
+            'total'   : len(rows)
+        }
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM events').fetchone()[0]
+
+
+class EventSync(object):
+    """Refresh the events of many artists into an EventStore.
+
+    An artist is refreshed again after a quarter of the time left until its next
+    event, between min_interval and max_interval, so artists playing soon are
+    refreshed more often.
+
+    :param client: The BlitzrClient fetching events
+    :param path: SQLite file of the EventStore, in memory by default
+    :param max_workers: Number of artists refreshed concurrently, the client's by default
+    :param min_interval: Shortest refresh interval, in seconds
+    :param max_interval: Longest refresh interval, in seconds
+    :type client: BlitzrClient
+    :type path: string
+    :type max_workers: int
+    :type min_interval: int
+    :type max_interval: int
+
+    """
+
+    def __init__(self, client, path=':memory:', max_workers=None, min_interval=3600,
+                 max_interval=7 * 24 * 3600):
+        self.client = client
+        self.store = EventStore(path)
+        self.max_workers = max_workers or client.max_workers
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._queue = []
+        self._due = {}
+        self._lock = threading.Lock()
+
+    def add_artists(self, artists):
+        """Schedule artists for an immediate refresh.
+
+        :param artists: Artist UUIDs
+        :type artists: iterable
+
+        """
+        with self._lock:
+            for artist in artists:
+                if artist not in self._due:
+                    self._schedule(artist, 0)
+
+    def due(self, now=None):
+        """Number of artists waiting for a refresh."""
+        now = time.time() if now is None else now
+        with self._lock:
+            return sum(1 for due in self._due.values() if due <= now)
+
+    def refresh(self, artist):
+        """Refresh one artist now.
+
+        :param artist: The Artist UUID
+        :type artist: string
+        :return: Number of events of the artist
+        :rtype: int
+
+        """
+        events = list(self.client.iter_artist_events(artist, limit=self.client.MAX_PAGE_SIZE))
+        self.store.replace_artist_events(artist, events)
+        with self._lock:
+            self._schedule(artist, time.time() + self.interval(artist))
+        return len(events)
+
+    def interval(self, artist, now=None):
+        """Seconds until the next refresh of an artist, from its upcoming events."""
+        now = time.time() if now is None else now
+        next_date = self.store.next_date(artist, time.strftime('%Y-%m-%d', time.gmtime(now)))
+        if next_date is None:
+            return self.max_interval
+        until = (datetime.strptime(next_date, '%Y-%m-%d') -
+                 datetime.utcfromtimestamp(now)).total_seconds()
+        return int(min(self.max_interval, max(self.min_interval, until / 4)))
+
+    def run_once(self, now=None):
+        """Refresh every due artist, soonest first, with bounded concurrency.
+
+        :return: Artists refreshed, and artists that failed with their exception
+        :rtype: tuple
+
+        """
+        now = time.time() if now is None else now
+        artists = []
+        with self._lock:
+            while self._queue and self._queue[0][0] <= now:
+                due, artist = heapq.heappop(self._queue)
+                if self._due.get(artist) == due:
+                    artists.append(artist)
+        refreshed, failed = [], {}
+        for artist, _, exception in imap_unordered(self.refresh, artists, self.max_workers):
+            if exception is not None:
+                failed[artist] = exception
+                with self._lock:
+                    self._schedule(artist, time.time() + self.min_interval)
+            else:
+                refreshed.append(artist)
+        return refreshed, failed
+
+    def _schedule(self, artist, due):
+        self._due[artist] = due
+        heapq.heappush(self._queue, (due, artist))
@@ -6,6 +6,19 @@ class NetworkException(IOError):
 
 class ClientException(IOError):
     """You just sent a bad request."""
+    status_code = None
+    body = None
 
 class ServerException(IOError):
     """An error occured on the Blitzr side, try again."""
+    status_code = None
+    body = None
+
+class TimeoutException(IOError):
+    """The API did not answer in time, or the deadline of the calls expired."""
+
+class CancelledException(TimeoutException):
+    """The calls were cancelled through their deadline."""
+
+class CircuitOpenException(IOError):
+    """Recent calls to this part of the API failed, calls are suspended for a while."""
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Field selection
+    ===============
+
+    Helpers used by the client to only request and keep the fields a caller needs.
+
+    Fields are names of the returned documents, with dots for nested fields, e.g.
+    ['name', 'location.city']. For searches, 'total' stands for the total count of
+    results: without it, search extras are not requested.
+
+"""
+
+
+def field_tree(fields):
+    """Turn dotted field names into a tree of nested field names."""
+    tree = {}
+    for field in fields:
+        node = tree
+        for name in field.split('.'):
+            node = node.setdefault(name, {})
+    return tree
+
+
+def project(data, fields, search=False):
+    """Keep only the selected fields of an API response.
+
+    :param data: The decoded response
+    :param fields: The selected fields, everything if None
+    :param search: True if data is a search response, whose results are projected
+    :type data: dictionary | list
+    :type fields: array
+    :type search: bool
+    :return: The projected response
+    :rtype: dictionary | list
+
+    """
+    if fields is None:
+        return data
+    tree = field_tree(field for field in fields if field != 'total')
+    if search and isinstance(data, dict) and 'results' in data:
+        projected = {'results': _project(data['results'], tree)}
+        if 'total' in fields:
+            projected['total'] = data.get('total')
+        return projected
+    return _project(data, tree)
+
+
+def _project(data, tree):
+    if isinstance(data, list):
+        return [_project(item, tree) for item in data]
+    if not isinstance(data, dict) or not tree:
+        return data
+    return dict((name, _project(data[name], sub_tree))
+                for name, sub_tree in tree.items() if name in data)
+
+
+def select_extras(fields, available):
+    """Extras to request so that the selected fields are returned.
+
+    :param fields: The selected fields
+    :param available: The extras of the endpoint
+    :type fields: array
+    :type available: array
+    :return: The needed extras
+    :rtype: array
+
+    """
+    names = set(field.split('.')[0] for field in fields)
+    return [extra for extra in available if extra in names]
+
+
+def search_extras(fields):
+    """Value of the extras parameter of a search, 'false' when the total isn't selected."""
+    return 'true' if fields is None or 'total' in fields else 'false'
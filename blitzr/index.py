@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Local index
+    ===========
+
+    An optional full-text index of the artists, labels and releases returned by the
+    API, stored in SQLite. When a LocalIndex is given to the client, every response
+    is indexed, and **search_local** answers searches without calling the API.
+
+    :Example:
+
+    >>> from blitzr import BlitzrClient, LocalIndex
+    >>> blitzr = BlitzrClient(your_api_key, index=LocalIndex('blitzr.db'))
+    >>> blitzr.iter_tag_artists(slug='rock')
+    >>> blitzr.search_local('artist', 'arctic', filters={'location': 'Sheffield'})
+
+"""
+
+import json
+import re
+import sqlite3
+import threading
+
+
+ENDPOINT_KINDS = {
+    '/artist/'             : 'artist',
+    '/artist/aliases/'     : 'artist',
+    '/artist/bands/'       : 'artist',
+    '/artist/members/'     : 'artist',
+    '/artist/related/'     : 'artist',
+    '/artist/similars/'    : 'artist',
+    '/harmonia/artist/'    : 'artist',
+    '/label/artists/'      : 'artist',
+    '/search/artist/'      : 'artist',
+    '/tag/artists/'        : 'artist',
+    '/label/'              : 'label',
+    '/label/similars/'     : 'label',
+    '/harmonia/label/'     : 'label',
+    '/search/label/'       : 'label',
+    '/release/'            : 'release',
+    '/artist/releases/'    : 'release',
+    '/harmonia/release/'   : 'release',
+    '/label/releases/'     : 'release',
+    '/search/release/'     : 'release',
+    '/tag/releases/'       : 'release'
+}
+
+# Indexed fields and their weight in the ranking.
+FIELDS = {
+    'name'     : 3,
+    'aliases'  : 2,
+    'tags'     : 1,
+    'location' : 1
+}
+
+# Document fields matched by the filters of search_artist, search_label and search_release.
+FILTERS = {
+    'artist'  : {
+        'location' : ('location',),
+        'tag'      : ('tags',),
+        'type'     : ('type',)
+    },
+    'label'   : {
+        'location' : ('location',),
+        'tag'      : ('tags',)
+    },
+    'release' : {
+        'artist'         : ('artists', 'artist'),
+        'artist.uuid'    : ('artists.uuid', 'artist.uuid'),
+        'tag'            : ('tags',),
+        'format_summary' : ('format_summary',),
+        'year'           : ('year',),
+        'location'       : ('location',),
+        'label'          : ('labels', 'label'),
+        'label.uuid'     : ('labels.uuid', 'label.uuid')
+    }
+}
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    """Split a text into lower case words."""
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+def field_values(value, path=None):
+    """Flatten a document field into a list of strings.
+
+    Dictionaries contribute their name, slug, uuid, city, country and country_code,
+    or only the sub field given by path (e.g. 'uuid' for 'artists.uuid').
+
+    """
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [flat for item in value for flat in field_values(item, path)]
+    if isinstance(value, dict):
+        if path:
+            return field_values(value.get(path))
+        return [flat for name in ('name', 'slug', 'uuid', 'city', 'country', 'country_code')
+                for flat in field_values(value.get(name))]
+    return [value if isinstance(value, type(u'')) else u'%s' % value]
+
+
+def _lookup(document, path):
+    name, _, sub_field = path.partition('.')
+    return field_values(document.get(name), sub_field or None)
+
+
+class LocalIndex(object):
+    """Inverted index over the names, aliases, tags and locations of fetched entities.
+
+    :param path: SQLite database file, in memory by default
+    :type path: string
+
+    """
+
+    def __init__(self, path=':memory:'):
+        self.path = path
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._connection.executescript(
+                'CREATE TABLE IF NOT EXISTS entities ('
+                '  kind TEXT NOT NULL, id TEXT NOT NULL, document TEXT NOT NULL,'
+                '  PRIMARY KEY (kind, id));'
+                'CREATE TABLE IF NOT EXISTS postings ('
+                '  token TEXT NOT NULL, kind TEXT NOT NULL, id TEXT NOT NULL,'
+                '  weight INTEGER NOT NULL);'
+                'CREATE INDEX IF NOT EXISTS postings_token ON postings (token, kind);'
+                'CREATE INDEX IF NOT EXISTS postings_entity ON postings (kind, id);'
+            )
+            self._connection.commit()
+
+    def add_response(self, method, data):
+        """Index the entities of an API response, if the endpoint returns entities.
+
+        :param method: The API method, e.g. '/search/artist/'
+        :param data: The decoded response
+        :type method: string
+        :type data: dictionary | list
+
+        """
+        kind = ENDPOINT_KINDS.get(method)
+        if kind is None or not data:
+            return
+        if isinstance(data, dict) and isinstance(data.get('results'), list):
+            data = data['results']
+        self.add(kind, data if isinstance(data, list) else [data])
+
+    def add(self, kind, documents):
+        """Index entities, replacing the previous version of known ones.
+
+        :param kind: The entity type (artist|label|release)
+        :param documents: The entities
+        :type kind: string
+        :type documents: list
+
+        """
+        entities, postings = [], []
+        for document in documents:
+            if not isinstance(document, dict) or not document.get('uuid'):
+                continue
+            entities.append((kind, document['uuid'], json.dumps(document)))
+            weights = {}
+            for field, weight in FIELDS.items():
+                for value in field_values(document.get(field)):
+                    for token in tokenize(value):
+                        weights[token] = max(weights.get(token, 0), weight)
+            postings.extend((token, kind, document['uuid'], weight)
+                            for token, weight in weights.items())
+        if not entities:
+            return
+        with self._lock:
+            self._connection.executemany(
+                'DELETE FROM postings WHERE kind = ? AND id = ?',
+                [(kind, uuid) for kind, uuid, _ in entities]
+            )
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO entities (kind, id, document) VALUES (?, ?, ?)', entities
+            )
+            self._connection.executemany(
+                'INSERT INTO postings (token, kind, id, weight) VALUES (?, ?, ?, ?)', postings
+            )
+            self._connection.commit()
+
+    def search(self, kind, query=None, filters={}, start=0, limit=10):
+        """Search indexed entities, with the filters of the API search of this type.
+
+        Every word of the query must match a word of the entity; the last word may be
+        a prefix. Results are ranked by the weight of the matched fields.
+
+        :param kind: The entity type (artist|label|release)
+        :param query: Your query
+        :param filters: Filter results, see search_artist, search_label and search_release
+        :param start: Offset for pagination
+        :param limit: Limit for pagination
+        :type kind: string
+        :type query: string
+        :type filters: dict
+        :type start: int
+        :type limit: int
+        :return: results and total, like the API search
+        :rtype: dictionary
+
+        """
+        tokens = tokenize(query)
+        with self._lock:
+            if tokens:
+                scores = None
+                for position, token in enumerate(tokens):
+                    if position == len(tokens) - 1:
+                        rows = self._connection.execute(
+                            'SELECT id, MAX(weight) FROM postings WHERE kind = ? AND '
+                            'token >= ? AND token < ? GROUP BY id', (kind, token, token + u'\uffff')
+                        ).fetchall()
+                    else:
+                        rows = self._connection.execute(
+                            'SELECT id, MAX(weight) FROM postings WHERE kind = ? AND token = ? '
+                            'GROUP BY id', (kind, token)
+                        ).fetchall()
+                    matches = dict(rows)
+                    if scores is None:
+                        scores = matches
+                    else:
+                        scores = dict((uuid, scores[uuid] + weight)
+                                      for uuid, weight in matches.items() if uuid in scores)
+                    if not scores:
+                        break
+                ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+                documents = []
+                for uuid, _ in ranked:
+                    row = self._connection.execute(
+                        'SELECT document FROM entities WHERE kind = ? AND id = ?', (kind, uuid)
+                    ).fetchone()
+                    documents.append(json.loads(row[0]))
+            else:
+                documents = [json.loads(row[0]) for row in self._connection.execute(
+                    'SELECT document FROM entities WHERE kind = ? ORDER BY id', (kind,)
+                )]
+
+        if filters:
+            documents = [document for document in documents
+                         if self._match(kind, document, filters)]
+        return {
+            'results' : documents[start:start + limit],
+            'total'   : len(documents)
+        }
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM entities').fetchone()[0]
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            self._connection.close()
+
+    def _match(self, kind, document, filters):
+        for name, expected in filters.items():
+            paths = FILTERS.get(kind, {}).get(name, (name,))
+            values = [value.lower() for path in paths for value in _lookup(document, path)]
+            if (u'%s' % expected).lower() not in values:
+                return False
+        return True
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Label mirror
+    ============
+
+    A local copy of label catalogs: label details, artists, releases, biography and
+    websites.
+
+    The calls of a label are issued in parallel, and labels are mirrored concurrently.
+    Artists and releases are walked again only when their first page changed, so a
+    refresh of an unchanged label costs one round of parallel calls.
+
+    :Example:
+
+    >>> from blitzr import BlitzrClient, LabelMirror
+    >>> mirror = LabelMirror(BlitzrClient(your_api_key), 'labels.db', release_format='album')
+    >>> for label, changed in mirror.mirror_many(label_uuids):
+    >>>     print label, changed
+    >>> mirror.failures
+    >>> mirror.get(label_uuids[0])['releases']
+
+"""
+
+from functools import partial
+
+from .parallel import imap_unordered, run_parallel
+from .store import JSONStore
+from .sync import entity_id, walk_pages
+
+
+class LabelMirror(object):
+    """Mirror of label catalogs, refreshed incrementally.
+
+    :param client: The BlitzrClient used to fetch labels
+    :param path: SQLite file storing the catalogs, in memory by default
+    :param page_size: Number of artists or releases fetched per page
+    :param release_format: Release format (album|single|live|all)
+    :param html_format: True to mirror biographies with HTML markup
+    :type client: BlitzrClient
+    :type path: string
+    :type page_size: int
+    :type release_format: string
+    :type html_format: bool
+
+    """
+
+    PARTS = ('label', 'artists', 'releases', 'biography', 'websites')
+
+    def __init__(self, client, path=':memory:', page_size=50, release_format=None,
+                 html_format=False):
+        self.client = client
+        self.store = JSONStore(path)
+        self.page_size = page_size
+        self.release_format = release_format
+        self.html_format = html_format
+        self.failures = {}
+
+    def get(self, label):
+        """Mirrored catalog of a label, None if never mirrored.
+
+        :param label: The label UUID, or 'slug:<slug>'
+        :type label: string
+        :return: label, artists, releases, biography and websites
+        :rtype: dictionary
+
+        """
+        return self.store.get('labels', label)
+
+    def labels(self):
+        """Identifiers of the mirrored labels."""
+        return self.store.keys('labels')
+
+    def mirror(self, uuid=None, slug=None, full=False):
+        """Mirror one label.
+
+        :param uuid: The Label UUID
+        :param slug: The Label Slug
+        :param full: Walk artists and releases even if their first page did not change
+        :type uuid: string
+        :type slug: string
+        :type full: bool
+        :return: Names of the parts that changed since the previous mirror
+        :rtype: list
+
+        """
+        label = uuid or 'slug:%s' % slug
+        fetch = {
+            'artists'  : lambda start: self.client.get_label_artists(uuid, slug, start,
+                                                                     self.page_size),
+            'releases' : lambda start: self.client.get_label_releases(
+                uuid, slug, self.release_format, start, self.page_size)
+        }
+        outcomes = run_parallel([
+            lambda: self.client.get_label(uuid, slug),
+            lambda: fetch['artists'](0),
+            lambda: fetch['releases'](0),
+            lambda: self.client.get_label_biography(uuid, slug, self.html_format),
+            lambda: self.client.get_label_websites(uuid, slug)
+        ], max_workers=len(self.PARTS))
+        for _, exception in outcomes:
+            if exception is not None:
+                raise exception
+        fetched = dict(zip(self.PARTS, [result for result, _ in outcomes]))
+
+        previous = self.get(label) or {}
+        fingerprints = self.store.get('fingerprints', label, {})
+        listings = run_parallel([
+            partial(walk_pages, fetch[part], self.page_size, fingerprints.get(part), full,
+                    fetched[part] or [])
+            for part in ('artists', 'releases')
+        ])
+        for part, (walked, exception) in zip(('artists', 'releases'), listings):
+            if exception is not None:
+                raise exception
+            results, fingerprints[part] = walked
+            fetched[part] = previous.get(part, []) if results is None else results
+
+        changed = [part for part in self.PARTS if fetched[part] != previous.get(part)]
+        if changed:
+            self.store.put('labels', label, fetched)
+        self.store.put('fingerprints', label, fingerprints)
+        return changed
+
+    def mirror_many(self, labels, full=False, max_workers=None):
+        """Mirror many labels concurrently.
+
+        A label whose mirror fails doesn't stop the others: its mirrored catalog is
+        kept, and its exception is kept in **failures** until it is mirrored again.
+
+        :param labels: Label UUIDs, or dictionaries with an uuid or slug
+        :param full: Walk artists and releases even if their first page did not change
+        :param max_workers: Number of labels mirrored at once, the client's max_workers by
+            default
+        :type labels: iterable
+        :type full: bool
+        :type max_workers: int
+        :return: Pairs of label identifier and changed parts, for the labels that changed
+        :rtype: generator
+
+        """
+        def mirror(label):
+            if isinstance(label, dict):
+                return self.mirror(label.get('uuid'), label.get('slug'), full)
+            return self.mirror(label, full=full)
+
+        for label, changed, exception in imap_unordered(mirror, labels,
+                                                        max_workers or self.client.max_workers):
+            label = entity_id(label) if isinstance(label, dict) else label
+            if exception is not None:
+                self.failures[label] = exception
+                continue
+            self.failures.pop(label, None)
+            if changed:
+                yield label, changed
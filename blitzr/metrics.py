@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Metrics
+    =======
+
+    Counters collected by the client.
+
+"""
+
+import threading
+
+
+class TransferStats(object):
+    """Bytes transferred per endpoint.
+
+    For every endpoint, counts the responses, the bytes received on the wire (compressed)
+    and the bytes of the decoded bodies, by content encoding.
+
+    :Example:
+
+    >>> blitzr.get_artist_biography(slug='eminem')
+    >>> print blitzr.transfer_stats.report()
+    {'/artist/biography/': {'responses': 1, 'wire_bytes': 5120, 'body_bytes': 14760,
+                            'ratio': 0.35, 'encodings': {'gzip': 1}}}
+
+    """
+
+    def __init__(self):
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, wire_bytes, body_bytes, encoding=None):
+        """Count one response.
+
+        :param endpoint: The API method, e.g. '/search/artist/'
+        :param wire_bytes: Size of the body as received
+        :param body_bytes: Size of the decoded body
+        :param encoding: Content encoding of the response, None if not compressed
+        :type endpoint: string
+        :type wire_bytes: int
+        :type body_bytes: int
+        :type encoding: string
+
+        """
+        endpoint = '/%s/' % endpoint.strip('/')
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, {
+                'responses'  : 0,
+                'wire_bytes' : 0,
+                'body_bytes' : 0,
+                'encodings'  : {}
+            })
+            stats['responses'] += 1
+            stats['wire_bytes'] += wire_bytes
+            stats['body_bytes'] += body_bytes
+            encoding = encoding or 'identity'
+            stats['encodings'][encoding] = stats['encodings'].get(encoding, 0) + 1
+
+    def report(self):
+        """Counters by endpoint, with the compression ratio (wire / decoded bytes).
+
+        :return: Counters
+        :rtype: dictionary
+
+        """
+        with self._lock:
+            report = {}
+            for endpoint, stats in self._endpoints.items():
+                report[endpoint] = dict(stats, encodings=dict(stats['encodings']))
+                report[endpoint]['ratio'] = (float(stats['wire_bytes']) / stats['body_bytes']
+                                             if stats['body_bytes'] else 1.0)
+            return report
+
+    def totals(self):
+        """Counters of every endpoint summed up."""
+        totals = {'responses': 0, 'wire_bytes': 0, 'body_bytes': 0}
+        for stats in self.report().values():
+            for name in totals:
+                totals[name] += stats[name]
+        return totals
+
+    def reset(self):
+        """Reset every counter."""
+        with self._lock:
+            self._endpoints.clear()
+
+
+class StaleStats(object):
+    """Stale responses served and background refreshes, per endpoint.
+
+    :Example:
+
+    >>> print blitzr.revalidation.stats.report()
+    {'/artist/summary/': {'served': 12, 'refreshed': 3, 'failed': 0, 'coalesced': 9}}
+
+    """
+
+    EVENTS = ('served', 'refreshed', 'failed', 'coalesced')
+
+    def __init__(self):
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, event):
+        """Count one event: served, refreshed, failed or coalesced (refresh already running).
+
+        :param endpoint: The API method, e.g. '/label/'
+        :param event: The event
+        :type endpoint: string
+        :type event: string
+
+        """
+        endpoint = '/%s/' % endpoint.strip('/')
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, dict.fromkeys(self.EVENTS, 0))
+            stats[event] += 1
+
+    def report(self):
+        """Counters by endpoint."""
+        with self._lock:
+            return dict((endpoint, dict(stats)) for endpoint, stats in self._endpoints.items())
+
+    def reset(self):
+        """Reset every counter."""
+        with self._lock:
+            self._endpoints.clear()
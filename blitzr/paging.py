@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Adaptive paging
+    ===============
+
+    Page size tuning for the paginating generators of the client.
+
+"""
+
+
+class AdaptivePager(object):
+    """Choose the size of the next page of a walk.
+
+    The walk starts with small pages so the first items come fast. The page size is
+    doubled, up to max_limit, while pages come back faster than target_latency and
+    the consumer drains them faster than they are fetched. It is halved when a page
+    takes more than twice target_latency.
+
+    :param limit: The size of the first page, capped to first_limit
+    :param max_limit: The largest page size accepted by the endpoint
+    :param target_latency: Page latency, in seconds, under which pages may grow
+    :type limit: int
+    :type max_limit: int
+    :type target_latency: float
+
+    """
+
+    first_limit = 10
+
+    def __init__(self, limit, max_limit=100, target_latency=0.5):
+        self.limit = max(1, min(limit, self.first_limit))
+        self.min_limit = self.limit
+        self.max_limit = max(max_limit, self.limit)
+        self.target_latency = target_latency
+
+    def next_limit(self, latency, consumption):
+        """Size of the next page.
+
+        :param latency: Seconds taken to fetch the last page
+        :param consumption: Seconds the consumer took to process the last page
+        :type latency: float
+        :type consumption: float
+        :return: Page size
+        :rtype: int
+
+        """
+        if latency > 2 * self.target_latency:
+            self.limit = max(self.min_limit, self.limit // 2)
+        elif latency < self.target_latency and consumption < latency:
+            self.limit = min(self.max_limit, self.limit * 2)
+        return self.limit
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Concurrency helpers
+    ===================
+
+    Helpers used to issue several API calls at the same time.
+
+"""
+
+import threading
+import time
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def run_parallel(calls, max_workers=8):
+    """Run callables concurrently in a thread pool.
+
+    :param calls: Callables taking no argument
+    :param max_workers: Maximum number of concurrent calls
+    :type calls: list
+    :type max_workers: int
+    :return: Pairs of (result, exception) in the order of calls, one of them is None
+    :rtype: list
+
+    """
+    calls = list(calls)
+    if not calls:
+        return []
+    workers = max(1, min(max_workers, len(calls)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(call) for call in calls]
+        outcomes = []
+        for future in futures:
+            exception = future.exception()
+            outcomes.append((None, exception) if exception else (future.result(), None))
+        return outcomes
+
+
+def imap_unordered(function, items, max_workers=8):
+    """Apply a function to items concurrently, with a bounded number of calls in flight.
+
+    Items are consumed lazily, so huge or endless iterables can be processed.
+
+    :param function: Callable taking one item
+    :param items: The items to process
+    :param max_workers: Maximum number of concurrent calls
+    :type function: callable
+    :type items: iterable
+    :type max_workers: int
+    :return: Triples of (item, result, exception) in completion order
+    :rtype: generator
+
+    """
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        for item in items:
+            pending[executor.submit(function, item)] = item
+            if len(pending) >= max_workers * 2:
+                break
+        while pending:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                exception = future.exception()
+                yield item, (None if exception else future.result()), exception
+                for next_item in items:
+                    pending[executor.submit(function, next_item)] = next_item
+                    break
+
+
+class RateLimiter(object):
+    """Token bucket shared by concurrent callers to cap their request rate.
+
+    :param rate: Calls allowed per second
+    :param burst: Calls allowed at once after an idle period, rate by default
+    :type rate: float
+    :type burst: int
+
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.time()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a call is allowed."""
+        while True:
+            with self._lock:
+                now = time.time()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = (1 - self._tokens) / self.rate
+            time.sleep(wait_time)
+
+    def wrap(self, function):
+        """Callable calling function once a call is allowed."""
+        def limited(*args, **kwargs):
+            self.acquire()
+            return function(*args, **kwargs)
+        return limited
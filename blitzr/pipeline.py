@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Pipelines
+    =========
+
+    Compose generators of the client (iter_* methods, SearchGenerator, or any
+    iterable) with map, filter, enrich, batch and sink stages.
+
+    Stages are lazy: items are pulled from the source only when the concurrent stages
+    have room for them, so a slow stage slows the whole pipeline down instead of
+    buffering the source in memory.
+
+    :Example:
+
+    >>> from blitzr import BlitzrClient, Pipeline
+    >>> blitzr = BlitzrClient(your_api_key)
+    >>> artists = (Pipeline(blitzr.iter_tag_artists(slug='rock', limit=100))
+    >>>            .enrich(summary=lambda artist: blitzr.get_artist_summary(uuid=artist['uuid']),
+    >>>                    events=lambda artist: blitzr.get_artist_events(uuid=artist['uuid']))
+    >>>            .filter(lambda artist: artist['events']))
+    >>> for artist in artists:
+    >>>     print artist['name'], len(artist['events'])
+
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _map_concurrent(items, function, workers):
+    """Apply function to items with at most workers calls in flight, keeping order."""
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(function, item))
+            if len(pending) >= workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+class Pipeline(object):
+    """A source followed by processing stages.
+
+    Every stage method returns a new Pipeline; iterating it runs the stages.
+
+    :param source: Any iterable, e.g. the generator of an iter_* method
+    :type source: iterable
+
+    """
+
+    def __init__(self, source, stages=()):
+        self.source = source
+        self.stages = tuple(stages)
+
+    def _then(self, stage):
+        return Pipeline(self.source, self.stages + (stage,))
+
+    def map(self, function, workers=1):
+        """Replace every item by function(item).
+
+        :param function: Callable taking an item
+        :param workers: Number of concurrent calls, order is kept
+        :type function: callable
+        :type workers: int
+        :rtype: Pipeline
+
+        """
+        if workers > 1:
+            return self._then(lambda items: _map_concurrent(items, function, workers))
+        return self._then(lambda items: (function(item) for item in items))
+
+    def filter(self, predicate):
+        """Keep the items for which predicate(item) is true.
+
+        :rtype: Pipeline
+
+        """
+        return self._then(lambda items: (item for item in items if predicate(item)))
+
+    def enrich(self, workers=8, **fields):
+        """Add fields to every item, computed concurrently.
+
+        Every keyword is a field name and a callable taking the item. All the fields of
+        all the items in flight are computed concurrently, at most workers at a time.
+        Items must be dictionaries, they are copied.
+
+        :param workers: Number of concurrent calls
+        :type workers: int
+        :rtype: Pipeline
+
+        """
+        names = sorted(fields)
+
+        def stage(items):
+            window = max(1, workers // max(1, len(names)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                pending = deque()
+                for item in items:
+                    pending.append((item, [executor.submit(fields[name], item)
+                                           for name in names]))
+                    if len(pending) >= window:
+                        yield self._merge(pending.popleft(), names)
+                while pending:
+                    yield self._merge(pending.popleft(), names)
+        return self._then(stage)
+
+    def batch(self, size):
+        """Group items in lists of size items, the last one may be shorter.
+
+        :rtype: Pipeline
+
+        """
+        def stage(items):
+            group = []
+            for item in items:
+                group.append(item)
+                if len(group) == size:
+                    yield group
+                    group = []
+            if group:
+                yield group
+        return self._then(stage)
+
+    def sink(self, function):
+        """Run the pipeline, calling function on every output item.
+
+        :param function: Callable taking an item
+        :type function: callable
+        :return: Number of items
+        :rtype: int
+
+        """
+        count = 0
+        for item in self:
+            function(item)
+            count += 1
+        return count
+
+    def __iter__(self):
+        items = iter(self.source)
+        for stage in self.stages:
+            items = stage(items)
+        return iter(items)
+
+    @staticmethod
+    def _merge(pending, names):
+        item, futures = pending
+        enriched = dict(item)
+        for name, future in zip(names, futures):
+            enriched[name] = future.result()
+        return enriched
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Shop snapshots
+    ==============
+
+    Track the products sold for artists, labels, releases and tracks over time.
+    Each poll is reduced to a compact snapshot (one digest per offer) and compared
+    with the previous one, so only the offers that changed are reported.
+
+    :Example:
+
+    >>> from blitzr import BlitzrClient, ShopPoller
+    >>> blitzr = BlitzrClient(your_api_key)
+    >>> poller = ShopPoller(blitzr, path='offers.json')
+    >>> poller.watch('artist', 'cd', slug='eminem')
+    >>> for diff in poller.iter_changes():
+    >>>     print diff.key, len(diff.added), len(diff.removed), len(diff.changed)
+
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from .exceptions import ConfigurationException
+from .parallel import run_parallel
+
+
+def offer_key(offer):
+    """Identify an offer across polls and product types.
+
+    :param offer: A product returned by the shop API
+    :type offer: dictionary
+    :return: Offer identifier
+    :rtype: string
+
+    """
+    if isinstance(offer, dict):
+        for field in ('uuid', 'url'):
+            if offer.get(field):
+                return '%s:%s' % (field, offer[field])
+    return json.dumps(offer, sort_keys=True)
+
+
+def offer_digest(offer):
+    """Short digest of an offer content, used to detect price or availability changes."""
+    content = json.dumps(offer, sort_keys=True).encode('utf-8')
+    return hashlib.md5(content).hexdigest()[:16]
+
+
+def snapshot_offers(offers):
+    """Reduce a list of offers to a compact snapshot.
+
+    :param offers: Products returned by the shop API
+    :type offers: list
+    :return: Offer digests by offer identifier
+    :rtype: dictionary
+
+    """
+    return dict((offer_key(offer), offer_digest(offer)) for offer in offers or [])
+
+
+class OfferDiff(object):
+    """Changes of the offers of one watched entity between two polls.
+
+    :ivar key: The watched entity key
+    :ivar added: Offers that appeared
+    :ivar removed: Identifiers of the offers that disappeared
+    :ivar changed: New version of the offers whose content changed
+
+    """
+
+    def __init__(self, key, added=None, removed=None, changed=None):
+        self.key = key
+        self.added = added or []
+        self.removed = removed or []
+        self.changed = changed or []
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    __nonzero__ = __bool__
+
+    def __repr__(self):
+        return '<OfferDiff %s +%d -%d ~%d>' % (self.key, len(self.added), len(self.removed),
+                                              len(self.changed))
+
+
+def diff_offers(key, snapshot, offers):
+    """Compare fresh offers with a previous snapshot.
+
+    :param key: The watched entity key
+    :param snapshot: The previous snapshot, None if the entity was never polled
+    :param offers: Products returned by the shop API
+    :type key: string
+    :type snapshot: dictionary
+    :type offers: list
+    :return: Changes
+    :rtype: OfferDiff
+
+    """
+    snapshot = snapshot or {}
+    diff = OfferDiff(key)
+    seen = set()
+    for offer in offers or []:
+        identifier = offer_key(offer)
+        seen.add(identifier)
+        if identifier not in snapshot:
+            diff.added.append(offer)
+        elif snapshot[identifier] != offer_digest(offer):
+            diff.changed.append(offer)
+    diff.removed = sorted(identifier for identifier in snapshot if identifier not in seen)
+    return diff
+
+
+class OfferSnapshotStore(object):
+    """Snapshots of the watched entities, optionally persisted to a JSON file.
+
+    :param path: File where the snapshots are saved, in memory only if None
+    :type path: string
+
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._snapshots = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path) as snapshots_file:
+                self._snapshots = json.load(snapshots_file)
+
+    def get(self, key):
+        """Get the last snapshot of an entity, None if it was never polled."""
+        with self._lock:
+            return self._snapshots.get(key)
+
+    def put(self, key, snapshot):
+        """Replace the snapshot of an entity."""
+        with self._lock:
+            self._snapshots[key] = snapshot
+
+    def save(self):
+        """Write the snapshots to the file."""
+        if not self.path:
+            return
+        with self._lock:
+            content = json.dumps(self._snapshots, separators=(',', ':'), sort_keys=True)
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w') as snapshots_file:
+            snapshots_file.write(content)
+        os.rename(temporary, self.path)
+
+
+class ShopPoller(object):
+    """Poll shop endpoints and report only the offers that changed.
+
+    Every watched entity has its own polling interval: it is halved each time a poll
+    finds a change and doubled when nothing changed, between min_interval and
+    max_interval.
+
+    :param client: The BlitzrClient used to poll
+    :param path: File where the snapshots are saved, in memory only if None
+    :param min_interval: Shortest polling interval, in seconds
+    :param max_interval: Longest polling interval, in seconds
+    :type client: BlitzrClient
+    :type path: string
+    :type min_interval: int | float
+    :type max_interval: int | float
+
+    """
+
+    ENTITIES = ('artist', 'label', 'release', 'track')
+
+    def __init__(self, client, path=None, min_interval=60, max_interval=6 * 3600):
+        self.client = client
+        self.store = OfferSnapshotStore(path)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._targets = {}
+        self._schedule = {}
+        self._lock = threading.Lock()
+        self.failures = {}
+
+    def watch(self, entity, product_type=None, uuid=None, slug=None):
+        """Start watching the products of an entity.
+
+        :param entity: The entity type (artist|label|release|track)
+        :param product_type: The product's type (cd|lp|mp3|merch), not used for tracks
+        :param uuid: The entity UUID
+        :param slug: The entity Slug
+        :type entity: string
+        :type product_type: string
+        :type uuid: string
+        :type slug: string
+        :return: The watched entity key
+        :rtype: string
+
+        """
+        if entity not in self.ENTITIES:
+            raise ConfigurationException('Unknown shop entity: %s' % entity)
+        if entity != 'track' and not product_type:
+            raise ConfigurationException('product_type is missing.')
+        key = '/'.join(str(part) for part in (entity, product_type or '', uuid or slug))
+        with self._lock:
+            self._targets[key] = (entity, product_type, uuid, slug)
+            self._schedule.setdefault(key, [self.min_interval, 0])
+        return key
+
+    def unwatch(self, key):
+        """Stop watching an entity."""
+        with self._lock:
+            self._targets.pop(key, None)
+            self._schedule.pop(key, None)
+            self.failures.pop(key, None)
+
+    def interval(self, key):
+        """Current polling interval of a watched entity, in seconds."""
+        return self._schedule[key][0]
+
+    def due(self, now=None):
+        """Keys of the watched entities that should be polled now."""
+        now = time.time() if now is None else now
+        with self._lock:
+            return [key for key, (_, next_poll) in self._schedule.items() if next_poll <= now]
+
+    def poll(self, key):
+        """Poll one watched entity right away.
+
+        :param key: The watched entity key
+        :type key: string
+        :return: Changes since the previous poll
+        :rtype: OfferDiff
+
+        """
+        entity, product_type, uuid, slug = self._targets[key]
+        if entity == 'track':
+            offers = self.client.get_shop_track(uuid)
+        else:
+            offers = getattr(self.client, 'get_shop_%s' % entity)(product_type, uuid, slug)
+
+        diff = diff_offers(key, self.store.get(key), offers)
+        self.store.put(key, snapshot_offers(offers))
+        with self._lock:
+            if key in self._schedule:
+                interval = self._schedule[key][0]
+                if diff:
+                    interval = max(self.min_interval, interval / 2.0)
+                else:
+                    interval = min(self.max_interval, interval * 2)
+                self._schedule[key] = [interval, time.time() + interval]
+        return diff
+
+    def _back_off(self, key):
+        with self._lock:
+            if key in self._schedule:
+                interval = min(self.max_interval, self._schedule[key][0] * 2)
+                self._schedule[key] = [interval, time.time() + interval]
+
+    def run_once(self, now=None):
+        """Poll every due entity concurrently.
+
+        A failed poll keeps the previous snapshot and is retried after a backoff: the
+        entity's interval is doubled, up to max_interval.
+
+        :param now: Time of the round, now by default
+        :type now: float
+        :return: Changes of the entities that changed, and the entities that failed with
+            their exception
+        :rtype: tuple
+
+        """
+        keys = self.due(now)
+        outcomes = run_parallel([
+            (lambda key: lambda: self.poll(key))(key) for key in keys
+        ], self.client.max_workers)
+        self.store.save()
+        diffs, failed = [], {}
+        for key, (diff, exception) in zip(keys, outcomes):
+            if exception is not None:
+                failed[key] = exception
+                self._back_off(key)
+            elif diff:
+                diffs.append(diff)
+        with self._lock:
+            for key in keys:
+                if key in failed:
+                    self.failures[key] = failed[key]
+                else:
+                    self.failures.pop(key, None)
+        return diffs, failed
+
+    def iter_changes(self, cycles=None):
+        """Poll forever, sleeping until the next entity is due, and yield the changes.
+
+        Failed polls are retried later, the last failure of every entity still failing is
+        kept in **failures**.
+
+        :param cycles: Number of polling rounds, endless if None
+        :type cycles: int
+        :return: Changes
+        :rtype: generator
+
+        """
+        while cycles is None or cycles > 0:
+            for diff in self.run_once()[0]:
+                yield diff
+            if cycles is not None:
+                cycles -= 1
+            with self._lock:
+                next_poll = min([when for _, when in self._schedule.values()] or [0])
+            delay = next_poll - time.time()
+            if delay > 0 and (cycles is None or cycles > 0):
+                time.sleep(delay)
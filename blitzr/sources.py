@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Source resolution
+    =================
+
+    Resolve the sources of tracks and releases ahead of playback.
+
+    The resolver prefetches the sources of upcoming tracks in the background, keeps
+    them in a TTL cache, and answers **best_known** without blocking, so playback
+    doesn't wait for a round trip.
+
+    :Example:
+
+    >>> from blitzr import BlitzrClient, SourceResolver
+    >>> blitzr = BlitzrClient(your_api_key)
+    >>> with SourceResolver(blitzr, preference=['youtube', 'spotify']) as resolver:
+    >>>     for track in resolver.follow(blitzr.iter_radio_artist(slug='eminem'), ahead=5):
+    >>>         play(resolver.best_known(track['uuid']) or resolver.best(track['uuid']))
+
+"""
+
+import threading
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .cache import TTLCache
+from .exceptions import ConfigurationException
+
+
+def source_service(source):
+    """Name of the service of a source, None if unknown."""
+    return source.get('source_name') or source.get('service') or source.get('source')
+
+
+class SourceResolver(object):
+    """Prefetching and caching resolver of track and release sources.
+
+    :param client: The BlitzrClient fetching sources
+    :param ttl: Seconds sources are kept
+    :param max_workers: Number of concurrent resolutions, the client's max_workers by
+        default
+    :param preference: Services by order of preference, sources of other services come
+        last
+    :type client: BlitzrClient
+    :type ttl: int
+    :type max_workers: int
+    :type preference: list
+
+    """
+
+    KINDS = ('track', 'release')
+
+    def __init__(self, client, ttl=3600, max_workers=None, preference=None):
+        self.client = client
+        self.cache = TTLCache(ttl=ttl)
+        self.preference = list(preference or [])
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or client.max_workers)
+
+    def prefetch(self, uuids, kind='track'):
+        """Resolve sources in the background.
+
+        :param uuids: Track or release UUIDs, or dictionaries with an uuid
+        :param kind: track or release
+        :type uuids: iterable
+        :type kind: string
+        :return: Futures of the sources, by UUID
+        :rtype: dict
+
+        """
+        futures = {}
+        for uuid in uuids:
+            uuid = uuid['uuid'] if isinstance(uuid, dict) else uuid
+            futures[uuid] = self._submit(kind, uuid)
+        return futures
+
+    def follow(self, tracks, ahead=5, kind='track'):
+        """Iterate over tracks, prefetching the sources of the next ones.
+
+        :param tracks: Tracks, e.g. a radio generator
+        :param ahead: Number of upcoming tracks resolved in advance
+        :param kind: track or release
+        :type tracks: iterable
+        :type ahead: int
+        :type kind: string
+        :return: The tracks
+        :rtype: generator
+
+        """
+        tracks = iter(tracks)
+        upcoming = deque()
+        while True:
+            for track in tracks:
+                self.prefetch([track], kind)
+                upcoming.append(track)
+                if len(upcoming) > ahead:
+                    break
+            if not upcoming:
+                return
+            yield upcoming.popleft()
+
+    def resolve(self, uuid, kind='track'):
+        """Sources of a track or release, waiting for them if needed.
+
+        :param uuid: The Track or Release UUID
+        :param kind: track or release
+        :type uuid: string
+        :type kind: string
+        :return: Sources
+        :rtype: list
+
+        """
+        return self._submit(kind, uuid).result()
+
+    def resolve_many(self, uuids, kind='track'):
+        """Sources of several tracks or releases, resolved concurrently.
+
+        :return: Sources by UUID
+        :rtype: dict
+
+        """
+        return dict((uuid, future.result())
+                    for uuid, future in self.prefetch(uuids, kind).items())
+
+    def best(self, uuid, kind='track'):
+        """Preferred source of a track or release, waiting for it if needed."""
+        return self.pick(self.resolve(uuid, kind))
+
+    def best_known(self, uuid, kind='track'):
+        """Preferred source already resolved, without blocking.
+
+        Unknown sources are prefetched, and None is returned meanwhile.
+
+        :param uuid: The Track or Release UUID
+        :param kind: track or release
+        :type uuid: string
+        :type kind: string
+        :return: Source
+        :rtype: dictionary
+
+        """
+        sources = self.cache.get((kind, uuid))
+        if sources is None:
+            self._submit(kind, uuid)
+            return None
+        return self.pick(sources)
+
+    def pick(self, sources):
+        """Preferred source among sources, None if there is none."""
+        for service in self.preference:
+            for source in sources:
+                if source_service(source) == service:
+                    return source
+        return sources[0] if sources else None
+
+    def close(self):
+        """Wait for the pending resolutions and stop the workers."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _submit(self, kind, uuid):
+        if kind not in self.KINDS:
+            raise ConfigurationException('Unknown source kind: %s' % kind)
+        key = (kind, uuid)
+        with self._lock:
+            # A fetch caches its sources before leaving _pending, check both under the lock.
+            sources = self.cache.get(key)
+            if sources is not None:
+                future = Future()
+                future.set_result(sources)
+                return future
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+            if self._executor is None:
+                raise ConfigurationException('The resolver is closed.')
+            future = self._executor.submit(self._fetch, kind, uuid)
+            self._pending[key] = future
+        return future
+
+    def _fetch(self, kind, uuid):
+        key = (kind, uuid)
+        try:
+            if kind == 'track':
+                sources = self.client.get_track_sources(uuid) or []
+            else:
+                sources = self.client.get_release_sources(uuid) or []
+            self.cache.set(key, sources)
+            return sources
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Local storage
+    =============
+
+    A small SQLite backed store of JSON documents, used by the synchronization helpers
+    to keep their state between runs.
+
+"""
+
+import json
+import sqlite3
+import threading
+
+
+class JSONStore(object):
+    """Key/value store of JSON documents grouped by namespace.
+
+    :param path: SQLite database file, in memory by default
+    :type path: string
+
+    """
+
+    def __init__(self, path=':memory:'):
+        self.path = path
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS documents ('
+                'namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, '
+                'PRIMARY KEY (namespace, key))'
+            )
+            self._connection.commit()
+
+    def get(self, namespace, key, default=None):
+        """Get a document, or default if missing."""
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT value FROM documents WHERE namespace = ? AND key = ?', (namespace, key)
+            ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def put(self, namespace, key, value):
+        """Store a document."""
+        self.put_many(namespace, [(key, value)])
+
+    def put_many(self, namespace, items):
+        """Store several (key, document) pairs in one transaction."""
+        rows = [(namespace, key, json.dumps(value, separators=(',', ':')))
+                for key, value in items]
+        with self._lock:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO documents (namespace, key, value) VALUES (?, ?, ?)', rows
+            )
+            self._connection.commit()
+
+    def update(self, namespace, key, function, default=None):
+        """Replace a document by function(document), atomically.
+
+        :param namespace: The document namespace
+        :param key: The document key
+        :param function: Callable called with the current document, or default if
+            missing, and returning the new one
+        :param default: Document passed to function when missing
+        :type namespace: string
+        :type key: string
+        :type function: callable
+        :return: The new document
+        :rtype: object
+
+        """
+        return self.update_many(namespace, [key], lambda key, value: function(value),
+                                default)[key]
+
+    def update_many(self, namespace, keys, function, default=None):
+        """Replace several documents by function(key, document), in one transaction.
+
+        The documents are read and written back under the store lock, so concurrent
+        updates of the same documents are not lost.
+
+        :return: The new documents by key
+        :rtype: dict
+
+        """
+        with self._lock:
+            updates = [(key, function(key, self.get(namespace, key, default))) for key in keys]
+            self.put_many(namespace, updates)
+        return dict(updates)
+
+    def delete(self, namespace, key):
+        """Remove a document."""
+        with self._lock:
+            self._connection.execute(
+                'DELETE FROM documents WHERE namespace = ? AND key = ?', (namespace, key)
+            )
+            self._connection.commit()
+
+    def keys(self, namespace):
+        """Keys of every document of a namespace."""
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT key FROM documents WHERE namespace = ? ORDER BY key', (namespace,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def items(self, namespace):
+        """(key, document) pairs of a namespace."""
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT key, value FROM documents WHERE namespace = ? ORDER BY key', (namespace,)
+            ).fetchall()
+        return [(key, json.loads(value)) for key, value in rows]
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Discography sync
+    ================
+
+    Incremental synchronization of artists' releases.
+
+    A compact fingerprint of every artist's release list is kept in a local store.
+    A sync only fetches the first page of releases, and the release at the end of the
+    previous walk, to check the fingerprint, and walks the whole discography again only
+    when it moved.
+
+    :Example:
+
+    >>> from blitzr import BlitzrClient, DiscographySync
+    >>> blitzr = BlitzrClient(your_api_key)
+    >>> sync = DiscographySync(blitzr, 'discographies.db')
+    >>> for delta in sync.iter_deltas(artist_uuids):
+    >>>     print delta.artist, len(delta.added), len(delta.removed)
+
+"""
+
+import hashlib
+
+from .parallel import imap_unordered
+from .store import JSONStore
+
+
+def entity_id(entity):
+    """Identifier of an entity returned by the API: its UUID, or its slug."""
+    return entity.get('uuid') or 'slug:%s' % entity.get('slug')
+
+
+def fingerprint_page(page):
+    """Short digest of the identifiers of a page of results.
+
+    :param page: Results returned by the API
+    :type page: list
+    :return: Digest
+    :rtype: string
+
+    """
+    content = '\n'.join(entity_id(entity) for entity in page).encode('utf-8')
+    return hashlib.sha1(content).hexdigest()[:16]
+
+
+def walk_pages(fetch, page_size, fingerprint=None, full=False, first_page=None):
+    """Fetch every page of a listing, unless it matches the fingerprint of the last walk.
+
+    Listings are assumed to be sorted newest first. The listing is unchanged when its
+    first page has the same digest and, for listings longer than a page, when one more
+    call at the end of the previous walk still finds its last result there and nothing
+    after it. A change in the middle of the listing that keeps its length, its first
+    page and its last result is only detected by a **full** walk.
+
+    :param fetch: Callable taking an offset and returning a page of page_size results
+    :param page_size: Number of results per page
+    :param fingerprint: Fingerprint of the previous walk, with count, first_page and last
+    :param full: Walk even if the listing looks unchanged
+    :param first_page: The first page, if already fetched
+    :type fetch: callable
+    :type page_size: int
+    :type fingerprint: dict
+    :type full: bool
+    :type first_page: list
+    :return: Every result, None if the listing did not change, and its fingerprint
+    :rtype: tuple
+
+    """
+    if first_page is None:
+        first_page = fetch(0) or []
+    digest = fingerprint_page(first_page)
+    if not full and fingerprint and fingerprint['first_page'] == digest:
+        if len(first_page) < page_size:
+            if fingerprint['count'] == len(first_page):
+                return None, fingerprint
+        elif 'last' in fingerprint:
+            tail = fetch(fingerprint['count'] - 1) or []
+            if len(tail) == 1 and entity_id(tail[0]) == fingerprint['last']:
+                return None, fingerprint
+
+    page, results = first_page, list(first_page)
+    while len(page) == page_size:
+        page = fetch(len(results)) or []
+        results.extend(page)
+    return results, {
+        'count'      : len(results),
+        'first_page' : digest,
+        'last'       : entity_id(results[-1]) if results else None
+    }
+
+
+class ReleaseDelta(object):
+    """Releases added to or removed from an artist's discography.
+
+    :ivar artist: The artist UUID, or 'slug:<slug>'
+    :ivar added: Releases that appeared
+    :ivar removed: Identifiers of the releases that disappeared
+
+    """
+
+    def __init__(self, artist, added=None, removed=None):
+        self.artist = artist
+        self.added = added or []
+        self.removed = removed or []
+
+    def __bool__(self):
+        return bool(self.added or self.removed)
+
+    __nonzero__ = __bool__
+
+    def __repr__(self):
+        return '<ReleaseDelta %s +%d -%d>' % (self.artist, len(self.added), len(self.removed))
+
+
+class DiscographySync(object):
+    """Incremental sync of artists' releases.
+
+    The fingerprint of an artist holds its release count, the digest of its first page
+    and its last release, see walk_pages: a release replaced by another one beyond the
+    first page, keeping the count and the last release, is only detected by a **full**
+    sync.
+
+    :param client: The BlitzrClient used to fetch releases
+    :param path: SQLite file storing the fingerprints, in memory by default
+    :param page_size: Number of releases fetched per page
+    :param release_type: Release type (official|unofficial|all)
+    :param release_format: Release format (album|single|live|all)
+    :param credited: Releases where artist is credited (not main releases)
+    :type client: BlitzrClient
+    :type path: string
+    :type page_size: int
+    :type release_type: string
+    :type release_format: string
+    :type credited: bool
+
+    """
+
+    def __init__(self, client, path=':memory:', page_size=50, release_type=None,
+                 release_format=None, credited=False):
+        self.client = client
+        self.store = JSONStore(path)
+        self.page_size = page_size
+        self.release_type = release_type
+        self.release_format = release_format
+        self.credited = credited
+        self.failures = {}
+
+    def fingerprint(self, artist):
+        """Stored fingerprint of an artist, None if never synced.
+
+        :param artist: The artist UUID, or 'slug:<slug>'
+        :type artist: string
+        :return: count, first_page and last
+        :rtype: dictionary
+
+        """
+        return self.store.get('fingerprints', artist)
+
+    def sync(self, uuid=None, slug=None, full=False):
+        """Sync one artist.
+
+        :param uuid: The Artist UUID
+        :param slug: The Artist Slug
+        :param full: Walk the whole discography even if the first page did not change
+        :type uuid: string
+        :type slug: string
+        :type full: bool
+        :return: Changes since the previous sync, empty if the fingerprint did not move
+        :rtype: ReleaseDelta
+
+        """
+        artist = uuid or 'slug:%s' % slug
+        releases, fingerprint = walk_pages(lambda start: self._releases(uuid, slug, start),
+                                           self.page_size, self.fingerprint(artist), full)
+        if releases is None:
+            return ReleaseDelta(artist)
+
+        known = set(self.store.get('releases', artist, []))
+        current = [entity_id(release) for release in releases]
+        delta = ReleaseDelta(
+            artist,
+            added=[release for release in releases if entity_id(release) not in known],
+            removed=sorted(known.difference(current))
+        )
+        self.store.put('releases', artist, current)
+        self.store.put('fingerprints', artist, fingerprint)
+        return delta
+
+    def iter_deltas(self, artists, full=False, max_workers=None):
+        """Sync many artists concurrently and yield the changes of those that moved.
+
+        An artist whose sync fails doesn't stop the others: its stored releases are
+        kept, and its exception is kept in **failures** until it syncs again.
+
+        :param artists: Artist UUIDs, or dictionaries with an uuid or slug
+        :param full: Walk every discography even if its first page did not change
+        :param max_workers: Number of concurrent syncs, the client's max_workers by default
+        :type artists: iterable
+        :type full: bool
+        :type max_workers: int
+        :return: Changes
+        :rtype: generator
+
+        """
+        def sync(artist):
+            if isinstance(artist, dict):
+                return self.sync(artist.get('uuid'), artist.get('slug'), full)
+            return self.sync(artist, full=full)
+
+        for artist, delta, exception in imap_unordered(sync, artists,
+                                                       max_workers or self.client.max_workers):
+            artist = entity_id(artist) if isinstance(artist, dict) else artist
+            if exception is not None:
+                self.failures[artist] = exception
+                continue
+            self.failures.pop(artist, None)
+            if delta:
+                yield delta
+
+    def _releases(self, uuid, slug, start):
+        return self.client.get_artist_releases(uuid, slug, start, self.page_size,
+                                               self.release_type, self.release_format,
+                                               self.credited) or []
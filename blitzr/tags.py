@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Tag materialization
+    ===================
+
+    A local inverted index of tags to the artists and releases they list.
+
+    Tags are discovered in any API response (get_tag, searches, entities with tags)
+    and walked concurrently under a shared rate limit. As with DiscographySync, a
+    tag's artists or releases are walked again only when their first page changed.
+
+    :Example:
+
+    >>> from blitzr import BlitzrClient, TagIndex
+    >>> tags = TagIndex(BlitzrClient(your_api_key), 'tags.db', rate=10)
+    >>> tags.discover(blitzr.search_artist('radiohead'))
+    >>> tags.materialize()
+    >>> tags.entities('rock', 'artists')
+
+"""
+
+from .parallel import RateLimiter, imap_unordered
+from .store import JSONStore
+from .sync import entity_id, walk_pages
+
+
+def find_tags(data):
+    """Slugs of the tags found anywhere in an API response.
+
+    :param data: A decoded API response
+    :return: Tag slugs
+    :rtype: set
+
+    """
+    found = set()
+    if isinstance(data, dict):
+        for name, value in data.items():
+            if name == 'tags' and isinstance(value, list):
+                for tag in value:
+                    slug = tag.get('slug') if isinstance(tag, dict) else tag
+                    if slug:
+                        found.add(slug)
+            else:
+                found.update(find_tags(value))
+    elif isinstance(data, list):
+        for value in data:
+            found.update(find_tags(value))
+    return found
+
+
+class TagIndex(object):
+    """Tag to entity inverted index, refreshed incrementally.
+
+    :param client: The BlitzrClient used to walk tags
+    :param path: SQLite file storing the index, in memory by default
+    :param page_size: Number of entities fetched per page
+    :param rate: Maximum number of API calls per second, shared by all walks
+    :param max_workers: Number of concurrent walks, the client's max_workers by default
+    :type client: BlitzrClient
+    :type path: string
+    :type page_size: int
+    :type rate: float
+    :type max_workers: int
+
+    """
+
+    KINDS = ('artists', 'releases')
+
+    def __init__(self, client, path=':memory:', page_size=50, rate=10, max_workers=None):
+        self.client = client
+        self.store = JSONStore(path)
+        self.page_size = page_size
+        self.limiter = RateLimiter(rate)
+        self.max_workers = max_workers or client.max_workers
+
+    def add_tags(self, slugs):
+        """Add tags to the ones walked by materialize.
+
+        :return: Number of new tags
+        :rtype: int
+
+        """
+        known = set(self.tags())
+        new = sorted(set(slugs).difference(known))
+        self.store.put_many('tags', [(slug, {}) for slug in new])
+        return len(new)
+
+    def discover(self, data):
+        """Add the tags found in an API response.
+
+        :return: Number of new tags
+        :rtype: int
+
+        """
+        return self.add_tags(find_tags(data))
+
+    def discover_tag(self, slug):
+        """Add a tag, and the tags found in its get_tag response.
+
+        :return: Number of new tags
+        :rtype: int
+
+        """
+        self.limiter.acquire()
+        return self.add_tags(find_tags(self.client.get_tag(slug)) | set([slug]))
+
+    def tags(self):
+        """Slugs of the known tags."""
+        return self.store.keys('tags')
+
+    def entities(self, slug, kind='artists'):
+        """Identifiers of the artists or releases of a tag, as last materialized.
+
+        :param slug: The Tag slug
+        :param kind: artists or releases
+        :type slug: string
+        :type kind: string
+        :return: UUIDs, or 'slug:<slug>'
+        :rtype: list
+
+        """
+        return self.store.get('postings', '%s:%s' % (kind, slug), [])
+
+    def tags_of(self, entity):
+        """Slugs of the tags listing an artist or release.
+
+        :param entity: The entity UUID, or 'slug:<slug>'
+        :type entity: string
+        :rtype: list
+
+        """
+        return self.store.get('entity_tags', entity, [])
+
+    def refresh(self, slug, kind, full=False):
+        """Walk the artists or releases of one tag, if their first page changed.
+
+        :param slug: The Tag slug
+        :param kind: artists or releases
+        :param full: Walk even if the first page did not change
+        :type slug: string
+        :type kind: string
+        :type full: bool
+        :return: Number of entities added and removed
+        :rtype: int
+
+        """
+        state = self.store.get('tags', slug) or {}
+        entities, fingerprint = walk_pages(lambda start: self._page(slug, kind, start),
+                                           self.page_size, state.get(kind), full)
+        if entities is None:
+            return 0
+        self.discover(entities)
+
+        key = '%s:%s' % (kind, slug)
+        known = set(self.store.get('postings', key, []))
+        current = [entity_id(entity) for entity in entities]
+        self._update_postings(slug, set(current).difference(known), known.difference(current))
+        self.store.put('postings', key, current)
+
+        def record(state):
+            state[kind] = fingerprint
+            return state
+
+        self.store.update('tags', slug, record, {})
+        return len(set(current).symmetric_difference(known))
+
+    def materialize(self, full=False):
+        """Walk every known tag concurrently.
+
+        Tags discovered during the walk are added to the index, and walked by the next
+        call.
+
+        :param full: Walk even the tags whose first pages did not change
+        :type full: bool
+        :return: Number of changed entities by tag slug, and the failed walks with their
+            exception by (slug, kind)
+        :rtype: tuple
+
+        """
+        walks = [(slug, kind) for slug in self.tags() for kind in self.KINDS]
+        changes, failed = {}, {}
+        for walk, changed, exception in imap_unordered(
+                lambda walk: self.refresh(walk[0], walk[1], full), walks, self.max_workers):
+            if exception is not None:
+                failed[walk] = exception
+            elif changed:
+                changes[walk[0]] = changes.get(walk[0], 0) + changed
+        return changes, failed
+
+    def _page(self, slug, kind, start):
+        self.limiter.acquire()
+        if kind == 'artists':
+            return self.client.get_tag_artists(slug, start, self.page_size) or []
+        return self.client.get_tag_releases(slug, start, self.page_size) or []
+
+    def _update_postings(self, slug, added, removed):
+        def update(entity, tags):
+            tags = set(tags)
+            if entity in added:
+                tags.add(slug)
+            else:
+                tags.discard(slug)
+            return sorted(tags)
+
+        # Postings of several walks are read and written back: update them atomically.
+        self.store.update_many('entity_tags', added.union(removed), update, [])
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Transports
+    ==========
+
+    Transports send the HTTP requests of the client, which accepts any Transport at
+    construction:
+
+    - RequestsTransport, the default, one requests.get call per request
+    - PooledTransport, a requests session keeping connections alive
+    - HTTP2Transport, multiplexing concurrent calls over a few HTTP/2 connections,
+      needs httpx (pip install blitzr[http2])
+    - FixtureTransport, serving recorded responses from memory, for tests and benchmarks
+
+    Asynchronous transports are in blitzr.aio.
+
+    :Example:
+
+    >>> from blitzr import BlitzrClient, HTTP2Transport
+    >>> blitzr = BlitzrClient(your_api_key, transport=HTTP2Transport(max_connections=2))
+
+"""
+
+import json
+
+import requests
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+from .cache import cache_key
+from .exceptions import (ConfigurationException, ServerException, ClientException, NetworkException,
+                         TimeoutException)
+
+try:
+    from urllib.parse import urlsplit
+except ImportError:
+    from urlparse import urlsplit
+
+
+# Brotli responses are decoded by urllib3 and httpx when a brotli package is installed.
+ACCEPT_ENCODING = 'br, gzip, deflate' if brotli is not None else 'gzip, deflate'
+
+
+def check_status(status_code, response):
+    """Raise the client exception matching an HTTP error status.
+
+    The exception carries the status_code and the decoded body of the response, None if
+    the body is not JSON.
+
+    """
+    if status_code < 400:
+        return
+    try:
+        body = response.json()
+    except ValueError:
+        body = None
+    if status_code >= 500:
+        exception = ServerException(
+            'An error occured on the Blitzr side. HTTP code: ' + str(status_code)
+            )
+    else:
+        exception = ClientException(body)
+    exception.status_code = status_code
+    exception.body = body
+    raise exception
+
+
+def _urllib3_wire_bytes(response):
+    # urllib3 reports the bytes read from the socket, before decoding.
+    wire_bytes = getattr(response.raw, 'tell', lambda: None)()
+    return wire_bytes if isinstance(wire_bytes, int) else None
+
+
+class Transport(object):
+    """Base class of the transports.
+
+    **get** returns a successful response, with headers, content and json(), and raises
+    NetworkException, TimeoutException, ClientException or ServerException otherwise.
+
+    """
+
+    def get(self, url, params, headers, timeout=None):
+        """Send a GET request.
+
+        :param url: The full URL
+        :param params: Query parameters, None values are not sent
+        :param headers: Request headers
+        :param timeout: Seconds to wait for the response, None to wait forever
+        :type url: string
+        :type params: dict
+        :type headers: dict
+        :type timeout: float
+        :return: The response
+
+        """
+        raise NotImplementedError()
+
+    def wire_bytes(self, response):
+        """Size of the response body as received, before decoding, None if unknown."""
+        return None
+
+    def close(self):
+        """Release the connections of the transport."""
+
+
+class RequestsTransport(Transport):
+    """Default transport, one requests.get call per request."""
+
+    def get(self, url, params, headers, timeout=None):
+        try:
+            req = requests.get(url=url, params=params, headers=headers, timeout=timeout)
+            req.raise_for_status()
+            return req
+        except requests.exceptions.HTTPError:
+            check_status(req.status_code, req)
+        except requests.exceptions.Timeout as exception:
+            raise TimeoutException(str(exception))
+        except requests.exceptions.ConnectionError as exception:
+            raise NetworkException(str(exception))
+
+    def wire_bytes(self, response):
+        return _urllib3_wire_bytes(response)
+
+
+class PooledTransport(Transport):
+    """Transport reusing kept-alive connections through a requests session.
+
+    :param pool_size: Maximum number of connections kept open
+    :type pool_size: int
+
+    """
+
+    def __init__(self, pool_size=10):
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def get(self, url, params, headers, timeout=None):
+        try:
+            req = self.session.get(url, params=params, headers=headers, timeout=timeout)
+        except requests.exceptions.Timeout as exception:
+            raise TimeoutException(str(exception))
+        except requests.exceptions.ConnectionError as exception:
+            raise NetworkException(str(exception))
+        check_status(req.status_code, req)
+        return req
+
+    def wire_bytes(self, response):
+        return _urllib3_wire_bytes(response)
+
+    def close(self):
+        self.session.close()
+
+
+class HTTP2Transport(Transport):
+    """HTTP/2 transport multiplexing concurrent requests over a few connections.
+
+    :param max_connections: Maximum number of open connections
+    :param http1: Allow falling back to HTTP/1.1 when the server doesn't negotiate HTTP/2.
+        Set it to False to use HTTP/2 without TLS (prior knowledge), e.g. with a local server
+    :type max_connections: int
+    :type http1: bool
+
+    """
+
+    def __init__(self, max_connections=4, http1=True):
+        if httpx is None:
+            raise ConfigurationException('HTTP2Transport requires httpx: pip install blitzr[http2]')
+        self.client = httpx.Client(
+            http1=http1,
+            http2=True,
+            limits=httpx.Limits(max_connections=max_connections),
+            timeout=None
+        )
+
+    def get(self, url, params, headers, timeout=None):
+        params = dict((name, value) for name, value in params.items() if value is not None)
+        try:
+            response = self.client.get(url, params=params, headers=headers, timeout=timeout)
+        except httpx.TimeoutException as exception:
+            raise TimeoutException(str(exception))
+        except httpx.TransportError as exception:
+            raise NetworkException(str(exception))
+        check_status(response.status_code, response)
+        return response
+
+    def wire_bytes(self, response):
+        return response.num_bytes_downloaded
+
+    def close(self):
+        self.client.close()
+
+
+class FixtureResponse(object):
+    """In-memory response served by a FixtureTransport."""
+
+    def __init__(self, status_code=200, content=b'null', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.content.decode('utf-8'))
+
+
+class FixtureTransport(Transport):
+    """Transport serving recorded responses from memory, without network.
+
+    Responses are matched on the API method and parameters (the API key and unset
+    parameters are ignored). A response added without parameters answers any call to
+    its method. Unknown calls get a 404 response.
+
+    :param fixtures: Recorded responses, dictionaries with method, params, status and body
+    :type fixtures: list
+
+    :Example:
+
+    >>> transport = FixtureTransport()
+    >>> transport.add('/artist/', {'slug': 'eminem'}, {'name': 'Eminem'})
+    >>> BlitzrClient('key', transport=transport).get_artist(slug='eminem')
+    {'name': 'Eminem'}
+
+    """
+
+    def __init__(self, fixtures=None):
+        self.calls = 0
+        self._responses = {}
+        for fixture in fixtures or []:
+            self.add(fixture['method'], fixture.get('params'), fixture.get('body'),
+                     fixture.get('status', 200))
+
+    @classmethod
+    def from_file(cls, path):
+        """Load recorded responses from a JSON file holding a list of fixtures."""
+        with open(path) as fixtures_file:
+            return cls(json.load(fixtures_file))
+
+    def add(self, method, params=None, body=None, status=200):
+        """Record a response.
+
+        :param method: The API method, e.g. '/artist/'
+        :param params: The call parameters, None to answer any call of the method
+        :param body: The decoded response body
+        :param status: The HTTP status
+        :type method: string
+        :type params: dict
+        :type status: int
+
+        """
+        method = '/%s/' % method.strip('/')
+        key = cache_key(method, params) if params is not None else method
+        content = json.dumps(body, separators=(',', ':')).encode('utf-8')
+        self._responses[key] = FixtureResponse(status, content, {
+            'Content-Type'   : 'application/json',
+            'Content-Length' : str(len(content))
+        })
+
+    def get(self, url, params, headers, timeout=None):
+        self.calls += 1
+        method = '/%s/' % urlsplit(url).path.strip('/')
+        response = self._responses.get(cache_key(method, params)) or self._responses.get(method)
+        if response is None:
+            response = FixtureResponse(404, json.dumps({
+                'message': 'No fixture for %s' % cache_key(method, params)
+            }).encode('utf-8'))
+        check_status(response.status_code, response)
+        return response
+
+    def wire_bytes(self, response):
+        return len(response.content)
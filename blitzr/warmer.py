@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Cache warming
+    =============
+
+    Fill the response cache of a client before the traffic hits it, e.g. after a deploy.
+
+    The warmer is fed with seed entities or with recorded accesses (API method and
+    parameters, from a cassette or an access log), and prefetches the most accessed
+    calls concurrently under a rate limit. Progress is reported while warming, and the
+    hit rate achieved by the cache afterwards tells how useful the warm-up was.
+
+    :Example:
+
+    >>> from blitzr import BlitzrClient, CacheWarmer, TTLCache
+    >>> blitzr = BlitzrClient(your_api_key, cache=TTLCache(ttl=3600))
+    >>> warmer = CacheWarmer(blitzr, rate=20)
+    >>> warmer.add_cassette('traffic.jsonl.gz')
+    >>> warmer.add_entities('artist', top_artist_uuids)
+    >>> warmer.warm(limit=1000, progress=lambda done, total: log(done, total))
+    >>> ...
+    >>> warmer.hit_rate()
+
+"""
+
+import threading
+import time
+
+from .cache import cache_key
+from .cassette import normalize_params, read_cassette
+from .exceptions import ConfigurationException
+from .parallel import RateLimiter, imap_unordered
+
+
+class CacheWarmer(object):
+    """Prefetch the most accessed API calls into the cache of a client.
+
+    :param client: The BlitzrClient whose cache is warmed, it must have a cache
+    :param rate: Maximum number of API calls per second
+    :param max_workers: Number of concurrent calls, the client's max_workers by default
+    :type client: BlitzrClient
+    :type rate: float
+    :type max_workers: int
+
+    """
+
+    def __init__(self, client, rate=10, max_workers=None):
+        if client.cache is None:
+            raise ConfigurationException('CacheWarmer needs a client with a cache.')
+        self.client = client
+        self.limiter = RateLimiter(rate)
+        self.max_workers = max_workers or client.max_workers
+        self._accesses = {}
+        self._warmed_counters = None
+        self._lock = threading.Lock()
+
+    def add(self, method, params=None, count=1):
+        """Record accesses to an API call.
+
+        :param method: The API method, e.g. '/artist/'
+        :param params: The call parameters
+        :param count: Number of accesses
+        :type method: string
+        :type params: dict
+        :type count: int
+
+        """
+        method = '/%s/' % method.strip('/')
+        params = normalize_params(params)
+        key = cache_key(method, params)
+        with self._lock:
+            entry = self._accesses.setdefault(key, [method, params, 0])
+            entry[2] += count
+
+    def add_accesses(self, accesses):
+        """Record accesses from an access log.
+
+        :param accesses: (method, params) pairs
+        :type accesses: iterable
+
+        """
+        for method, params in accesses:
+            self.add(method, params)
+
+    def add_cassette(self, path):
+        """Record the successful calls of a cassette, see RecordingTransport."""
+        for exchange in read_cassette(path):
+            if exchange.get('status', 200) < 400:
+                self.add(exchange['method'], exchange['params'])
+
+    def add_entities(self, kind, entities, count=1):
+        """Record accesses to entities, e.g. the most popular artists.
+
+        :param kind: artist, label, release, track, event or tag
+        :param entities: UUIDs, or dictionaries with an uuid or slug
+        :param count: Number of accesses of each entity
+        :type kind: string
+        :type entities: iterable
+        :type count: int
+
+        """
+        for entity in entities:
+            if isinstance(entity, dict):
+                params = {'uuid': entity.get('uuid'), 'slug': entity.get('slug')}
+            elif kind == 'tag':
+                params = {'slug': entity}
+            else:
+                params = {'uuid': entity}
+            self.add('/%s/' % kind, params, count)
+
+    def plan(self, limit=None):
+        """Calls to warm, most accessed first, skipping the ones already cached.
+
+        :param limit: Maximum number of calls
+        :type limit: int
+        :return: (method, params, count) triples
+        :rtype: list
+
+        """
+        with self._lock:
+            entries = sorted(self._accesses.items(), key=lambda item: (-item[1][2], item[0]))
+        plan = [tuple(entry) for key, entry in entries if key not in self.client.cache]
+        return plan if limit is None else plan[:limit]
+
+    def warm(self, limit=None, progress=None):
+        """Prefetch the most accessed calls concurrently.
+
+        :param limit: Maximum number of calls
+        :param progress: Callable called with the number of calls done and planned after
+            each call
+        :type limit: int
+        :type progress: callable
+        :return: Number of calls planned, warmed and failed, and the seconds spent
+        :rtype: dictionary
+
+        """
+        plan = self.plan(limit)
+        started = time.time()
+        warmed = failed = 0
+
+        def fetch(entry):
+            self.limiter.acquire()
+            return self.client._request(entry[0], dict(entry[1]))
+
+        for done, (_, _, exception) in enumerate(
+                imap_unordered(fetch, plan, self.max_workers), 1):
+            if exception is None:
+                warmed += 1
+            else:
+                failed += 1
+            if progress is not None:
+                progress(done, len(plan))
+
+        cache = self.client.cache
+        self._warmed_counters = (cache.hits, cache.misses)
+        return {
+            'planned' : len(plan),
+            'warmed'  : warmed,
+            'failed'  : failed,
+            'seconds' : time.time() - started
+        }
+
+    def hit_rate(self):
+        """Hit rate of the client's cache since the last warm-up, None if nothing was read."""
+        if self._warmed_counters is None:
+            return None
+        hits = self.client.cache.hits - self._warmed_counters[0]
+        misses = self.client.cache.misses - self._warmed_counters[1]
+        return float(hits) / (hits + misses) if hits + misses else None
@@ -16,7 +16,11 @@ setup(name='blitzr',
     url='https://github.com/blitzr/blitzr-python',
     download_url='https://github.com/blitzr/blitzr-python/tarball/' + VERSION,
     author_email='contact@blitzr.com',
-    install_requires=['requests'],
+    install_requires=['requests', 'futures; python_version < "3.2"'],
+    extras_require={
+        'brotli' : ['brotli'],
+        'http2'  : ['httpx[http2]']
+    },
     long_description=open('README.md').read(),
     zip_safe=False,
     packages=find_packages(exclude=['tests']),
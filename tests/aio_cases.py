@@ -0,0 +1,122 @@
+"""Tests of the asynchronous client, imported by test_aio on Python 3.7+ only."""
+
+import asyncio
+import unittest
+
+from blitzr import (CircuitBreakers, FixtureTransport, LocalIndex, StaleWhileRevalidate,
+                    TTLCache)
+from blitzr.aio import AsyncBlitzrClient, AsyncFixtureTransport
+from blitzr.exceptions import ClientException, ConfigurationException, ServerException
+
+
+API_KEY = 'testing'
+
+
+class TestAsyncBlitzrClient(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = FixtureTransport([
+            {'method': '/artist/', 'params': {'slug': 'eminem'}, 'body': {'name': 'Eminem'}},
+            {'method': '/tag/artists/', 'body': [{'name': 'Any'}]},
+            {'method': '/buy/artist/cd/', 'body': [{'url': 'a', 'price': 10}]},
+            {'method': '/buy/artist/lp/', 'body': [{'url': 'a', 'price': 10},
+                                                   {'url': 'b', 'price': 20}]},
+            {'method': '/buy/artist/mp3/', 'status': 503},
+            {'method': '/search/artist/', 'body': {'results': [{'name': 'Eminem', 'score': 2}],
+                                                   'total': 1}},
+            {'method': '/search/label/', 'body': {'results': [{'name': 'Shady', 'score': 3}],
+                                                  'total': 1}}
+        ])
+        self.client = AsyncBlitzrClient(API_KEY, transport=AsyncFixtureTransport(self.transport))
+
+    def test_gathered_calls(self):
+        async def fetch():
+            return await asyncio.gather(self.client.get_artist(slug='eminem'),
+                                        self.client.get_tag_artists(slug='rock'))
+
+        self.assertEqual(asyncio.run(fetch()), [{'name': 'Eminem'}, [{'name': 'Any'}]])
+
+    def test_get_shop_products(self):
+        products = asyncio.run(self.client.get_shop_products(
+            'artist', slug='eminem', product_types=['cd', 'lp', 'mp3']))
+        self.assertEqual([offer['url'] for offer in products['offers']], ['a', 'b'])
+        self.assertEqual(products['offers'][0]['product_types'], ['cd', 'lp'])
+        self.assertIsInstance(products['errors']['mp3'], ServerException)
+
+    def test_search_local_falls_back_to_the_api(self):
+        client = AsyncBlitzrClient(API_KEY, index=LocalIndex(),
+                                   transport=AsyncFixtureTransport(self.transport))
+        self.assertEqual(asyncio.run(client.search_local('artist', 'eminem', fallback=False)),
+                         {'results': [], 'total': 0})
+        self.assertEqual(self.transport.calls, 0)
+        self.assertEqual(asyncio.run(client.search_local('artist', 'eminem'))['total'], 1)
+        self.assertEqual(self.transport.calls, 1)
+
+    def test_search_federated(self):
+        search = asyncio.run(self.client.search_federated('e', ['artist', 'label', 'release']))
+        self.assertEqual([name for name, _ in search.ranked()], ['label', 'artist'])
+        self.assertEqual(search.totals, {'artist': 1, 'label': 1})
+        self.assertIsInstance(search.errors['release'], ClientException)
+
+    def test_lazy_entities_and_batch_are_not_available(self):
+        for method in ('artist', 'label', 'release', 'track', 'batch'):
+            self.assertRaises(ConfigurationException, getattr(self.client, method))
+
+    def test_generators_are_not_available(self):
+        for method in ('iter_tag_artists', 'iter_artist_aliases', 'iter_search_artist',
+                       'iter_search', 'iter_radio_tag', '_paginate', '_request_raw'):
+            self.assertRaises(ConfigurationException, getattr(self.client, method))
+        self.assertEqual(self.transport.calls, 0)
+
+
+class TestAsyncRevalidation(unittest.TestCase):
+
+    def test_stale_response_is_refreshed_once_on_the_loop(self):
+        transport = AsyncFixtureTransport()
+        transport.add('/label/', {'slug': 'warp'}, {'name': 'Warp'})
+        revalidation = StaleWhileRevalidate({'label': 300})
+        # Every cached response is expired at once.
+        client = AsyncBlitzrClient(API_KEY, cache=TTLCache(ttl=0), transport=transport,
+                                   revalidation=revalidation)
+
+        async def serve_stale():
+            await client.get_label(slug='warp')
+            transport.add('/label/', {'slug': 'warp'}, {'name': 'Warp Records'})
+            stale = await asyncio.gather(*[client.get_label(slug='warp') for _ in range(4)])
+            await client.close()
+            self.assertEqual(revalidation.refreshing_on(asyncio.get_running_loop()), [])
+            return stale
+
+        self.assertEqual(asyncio.run(serve_stale()), [{'name': 'Warp'}] * 4)
+        self.assertEqual(transport.fixtures.calls, 2)
+        revalidation.close()
+        self.assertEqual(asyncio.run(client.get_label(slug='warp')), {'name': 'Warp Records'})
+        self.assertEqual(revalidation.stats.report(), {'/label/': {
+            'served': 5, 'refreshed': 1, 'failed': 0, 'coalesced': 3}})
+
+
+class SlowAsyncTransport(AsyncFixtureTransport):
+
+    delay = 0
+
+    async def get(self, url, params, headers, timeout=None):
+        await asyncio.sleep(self.delay)
+        return await super(SlowAsyncTransport, self).get(url, params, headers, timeout)
+
+
+class TestAsyncCircuitBreakers(unittest.TestCase):
+
+    def test_cancelled_trial_lets_the_next_call_through(self):
+        transport = SlowAsyncTransport()
+        transport.add('/artist/', {'slug': 'eminem'}, {'message': 'Unavailable'}, 503)
+        breakers = CircuitBreakers(failure_threshold=1, reset_timeout=0)
+        client = AsyncBlitzrClient(API_KEY, transport=transport, breakers=breakers)
+        self.assertRaises(ServerException, asyncio.run, client.get_artist(slug='eminem'))
+
+        transport.delay = 1
+        self.assertRaises(asyncio.TimeoutError, asyncio.run,
+                          asyncio.wait_for(client.get_artist(slug='eminem'), 0.01))
+        transport.delay = 0
+        transport.add('/artist/', {'slug': 'eminem'}, {'name': 'Eminem'})
+        self.assertEqual(asyncio.run(client.get_artist(slug='eminem')), {'name': 'Eminem'})
+        self.assertEqual(breakers.states(), {'artist': 'closed'})
@@ -0,0 +1,9 @@
+import sys
+import unittest
+
+if sys.version_info < (3, 7):
+    raise unittest.SkipTest('The asynchronous client needs Python 3.7+')
+
+# The cases are written with async syntax, which older versions cannot parse.
+from aio_cases import (TestAsyncBlitzrClient, TestAsyncCircuitBreakers,  # noqa
+                       TestAsyncRevalidation)
@@ -0,0 +1,52 @@
+import unittest
+
+from concurrent.futures import CancelledError
+from mock import MagicMock
+
+from blitzr import Autocompleter
+from blitzr.autocomplete import matches_prefix
+
+
+ARTISTS = [{'name': 'Eminem'}, {'name': 'Emine'}, {'name': 'Emily Loizeau'}]
+
+
+class TestAutocompleter(unittest.TestCase):
+
+    def setUp(self):
+        self.client = MagicMock()
+        self.client.search_artist.return_value = {'results': ARTISTS, 'total': 3}
+
+    def test_longer_prefix_is_filtered_from_cache(self):
+        autocomplete = Autocompleter(self.client, 'artist')
+        self.assertEqual(autocomplete.complete('Em'), ARTISTS)
+        self.assertEqual(autocomplete.complete('emin'), ARTISTS[:2])
+        self.assertEqual(autocomplete.complete('em'), ARTISTS)
+        self.client.search_artist.assert_called_once_with('em', {}, True, 0, 10)
+        self.assertEqual(autocomplete.stats()['filtered_hits'], 1)
+        self.assertEqual(autocomplete.stats()['hits'], 1)
+
+    def test_filter_matches_word_prefixes_only(self):
+        autocomplete = Autocompleter(self.client, 'artist')
+        autocomplete.complete('e')
+        self.assertEqual(autocomplete.complete('emily l'), ARTISTS[2:])
+        self.assertEqual(autocomplete.complete('emine'), ARTISTS[:2])
+        self.assertEqual(self.client.search_artist.call_count, 1)
+        self.assertTrue(matches_prefix(u'\xc9milie Simon', 'emilie s'))
+        self.assertTrue(matches_prefix('Slim Shady (Eminem)', 'emin'))
+        self.assertFalse(matches_prefix('Eminem', 'nem'))
+
+    def test_incomplete_results_are_not_filtered(self):
+        self.client.search_artist.return_value = {'results': ARTISTS, 'total': 80}
+        autocomplete = Autocompleter(self.client, 'artist')
+        autocomplete.complete('em')
+        autocomplete.complete('emi')
+        self.assertEqual(self.client.search_artist.call_count, 2)
+        self.assertEqual(autocomplete.hit_rate, 0.0)
+
+    def test_submit_cancels_superseded_prefix(self):
+        autocomplete = Autocompleter(self.client, 'artist', debounce=0.05)
+        first = autocomplete.submit('e')
+        second = autocomplete.submit('em')
+        self.assertRaises(CancelledError, first.result)
+        self.assertEqual(second.result(timeout=1), ARTISTS)
+        self.client.search_artist.assert_called_once_with('em', {}, True, 0, 10)
@@ -0,0 +1,105 @@
+import threading
+import unittest
+
+from mock import MagicMock
+
+from blitzr import BlitzrClient, FixtureTransport, LazyResult
+
+
+API_KEY = 'testing'
+
+
+class TestBatchPlanner(unittest.TestCase):
+
+    def setUp(self):
+        self.client = BlitzrClient(API_KEY)
+        self.threads = set()
+
+        def fake_request(method, params={}, fields=None):
+            self.threads.add(threading.current_thread().name)
+            return {'uuid': params['uuid']}
+        self.client._request = MagicMock(side_effect=fake_request)
+
+    def test_lookups_are_deduplicated_and_concurrent(self):
+        with self.client.batch(window=None) as batch:
+            futures = [batch.get_release(uuid) for uuid in ['RE1', 'RE2', 'RE1', 'RE3']]
+            self.assertFalse(self.client._request.called)
+        self.assertEqual([future.result()['uuid'] for future in futures], ['RE1', 'RE2', 'RE1', 'RE3'])
+        self.assertIs(futures[0], futures[2])
+        self.assertEqual(self.client._request.call_count, 3)
+        self.assertEqual(batch.deduplicated, 1)
+        self.assertNotIn(threading.current_thread().name, self.threads)
+
+    def test_result_dispatches_pending_lookups(self):
+        with self.client.batch(window=None) as batch:
+            self.assertEqual(batch.get_release('RE1').result(timeout=1), {'uuid': 'RE1'})
+
+    def test_only_lookups_are_exposed(self):
+        batch = self.client.batch()
+        self.assertRaises(AttributeError, getattr, batch, 'iter_artist_releases')
+        batch.close()
+
+
+class ThreadRecordingTransport(FixtureTransport):
+    """Records the calling threads, and whether two releases were fetched at once."""
+
+    def __init__(self, fixtures=None):
+        super(ThreadRecordingTransport, self).__init__(fixtures)
+        self.threads = set()
+        self.releases = []
+        self.overlapped = threading.Event()
+        self.wait_for_overlap = False
+        self.serialized = False
+
+    def get(self, url, params, headers, timeout=None):
+        self.threads.add(threading.current_thread().name)
+        if url.endswith('/release/'):
+            self.releases.append(params['uuid'])
+            if len(self.releases) == 2:
+                self.overlapped.set()
+            if self.wait_for_overlap and not self.overlapped.wait(1):
+                self.serialized = True
+        return super(ThreadRecordingTransport, self).get(url, params, headers, timeout)
+
+
+class TestAutomaticBatching(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = ThreadRecordingTransport([
+            {'method': '/artist/releases/', 'body': [{'uuid': 'RE1'}, {'uuid': 'RE2'},
+                                                     {'uuid': 'RE1'}]},
+            {'method': '/release/', 'params': {'uuid': 'RE1'}, 'body': {'name': 'One'}},
+            {'method': '/release/', 'params': {'uuid': 'RE2'}, 'body': {'name': 'Two'}}
+        ])
+        self.client = BlitzrClient(API_KEY, transport=self.transport)
+
+    def test_n_plus_one_loop_is_batched_unchanged(self):
+        self.transport.wait_for_overlap = True
+        with self.client.batch(window=None) as batch:
+            releases = [self.client.get_release(release['uuid'])
+                        for release in self.client.iter_artist_releases(slug='eminem')]
+            self.assertIsInstance(releases[0], LazyResult)
+        self.assertEqual([release['name'] for release in releases], ['One', 'Two', 'One'])
+        self.assertEqual(releases[1], {'name': 'Two'})
+        self.assertEqual(self.transport.calls, 3)
+        self.assertFalse(self.transport.serialized)
+        self.assertEqual(batch.deduplicated, 1)
+        self.assertNotIn(threading.current_thread().name, self.transport.threads)
+
+    def test_using_a_result_dispatches_the_queue(self):
+        with self.client.batch(window=None):
+            release = self.client.get_release(uuid='RE1')
+            self.assertEqual(self.transport.calls, 0)
+            self.assertEqual(release.get('name'), 'One')
+            self.assertEqual(self.transport.calls, 1)
+        self.assertEqual(self.client.get_artist_releases(slug='eminem')[0], {'uuid': 'RE1'})
+
+    def test_calls_outside_the_block_thread_are_not_batched(self):
+        with self.client.batch(window=None):
+            outcome = []
+            thread = threading.Thread(
+                target=lambda: outcome.append(self.client.get_release(uuid='RE1')))
+            thread.start()
+            thread.join()
+        self.assertEqual(outcome, [{'name': 'One'}])
+        self.assertNotIsInstance(outcome[0], LazyResult)
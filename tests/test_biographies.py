@@ -0,0 +1,44 @@
+import unittest
+
+from mock import MagicMock
+
+from blitzr import BiographyStore
+from blitzr.biographies import html_to_text
+
+
+class TestBiographyStore(unittest.TestCase):
+
+    def setUp(self):
+        texts = {'en': '<p>Rapper from <b>Detroit</b>.</p><p>Born&nbsp;1972</p>',
+                 'fr': '<p>Rapper  from <b>Detroit</b>.</p><p>Born&nbsp;1972</p>\n',
+                 'de': None}
+        self.client = MagicMock(max_workers=4)
+
+        def biography(uuid, slug, lang, license, source, html_format, url_scheme):
+            if texts[lang] is None:
+                raise IOError('No biography')
+            return {'biography': texts[lang], 'lang': lang, 'html': html_format}
+        self.client.get_artist_biography.side_effect = biography
+
+    def test_html_to_text(self):
+        self.assertEqual(html_to_text('<p>One &amp; two</p><p>three<br>four</p>'),
+                         u'One & two\nthree\nfour')
+
+    def test_fetch_deduplicates_and_serves_plain_text(self):
+        biographies = BiographyStore(self.client)
+        fetched = biographies.fetch(slug='eminem', langs=['en', 'fr', 'de'])
+        self.assertEqual(sorted(fetched), ['en', 'fr'])
+        self.assertTrue(all(call[0][5] for call in self.client.get_artist_biography.call_args_list))
+        self.assertEqual(biographies.langs('slug:eminem'), ['en', 'fr'])
+        self.assertEqual(biographies.stats()['contents'], 1)
+
+        self.assertEqual(biographies.get('slug:eminem', 'en'), fetched['en'])
+        self.assertEqual(biographies.get('slug:eminem', 'fr')['lang'], 'fr')
+        self.assertEqual(biographies.get('slug:eminem', 'fr', html_format=False)['biography'],
+                         u'Rapper from Detroit.\nBorn\xa01972')
+        self.assertIsNone(biographies.get('slug:eminem', 'de'))
+
+        biographies.put('slug:eminem', 'fr', {'biography': 'Rappeur de Detroit.'})
+        self.assertEqual(biographies.stats()['contents'], 2)
+        biographies.put('slug:eminem', 'en', {'biography': 'Rapper.'})
+        self.assertEqual(biographies.stats()['contents'], 2)
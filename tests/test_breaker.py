@@ -0,0 +1,84 @@
+import unittest
+
+from blitzr import BlitzrClient, CircuitBreakers, FixtureTransport, TTLCache
+from blitzr.breaker import CircuitBreaker
+from blitzr.exceptions import CircuitOpenException, ClientException, ServerException
+
+
+API_KEY = 'testing'
+
+
+class TestCircuitBreakers(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = FixtureTransport()
+        self.transport.add('/artist/', {'slug': 'eminem'}, {'name': 'Eminem'})
+        self.transport.add('/radio/artist/', body={'message': 'Unavailable'}, status=503)
+        self.breakers = CircuitBreakers(failure_threshold=2, reset_timeout=60)
+        self.client = BlitzrClient(API_KEY, cache=TTLCache(ttl=0), transport=self.transport,
+                                   breakers=self.breakers)
+
+    def test_open_family_fails_fast_and_others_keep_working(self):
+        for _ in range(2):
+            self.assertRaises(ServerException, self.client.get_radio_artist, slug='eminem')
+        self.assertRaises(CircuitOpenException, self.client.get_radio_artist, slug='eminem')
+        self.assertEqual(self.transport.calls, 2)
+
+        self.assertEqual(self.client.get_artist(slug='eminem'), {'name': 'Eminem'})
+        self.assertRaises(ClientException, self.client.get_artist, slug='unknown')
+        self.assertEqual(self.breakers.states(), {'radio': 'open', 'artist': 'closed'})
+
+    def test_open_breaker_serves_stale_responses(self):
+        self.assertEqual(self.client.get_artist(slug='eminem'), {'name': 'Eminem'})
+        self.transport.add('/artist/', {'slug': 'eminem'}, {'message': 'Unavailable'}, 500)
+        for _ in range(2):
+            self.assertRaises(ServerException, self.client.get_artist, slug='eminem')
+        self.assertEqual(self.client.get_artist(slug='eminem'), {'name': 'Eminem'})
+        self.assertRaises(CircuitOpenException, self.client.get_artist, slug='unknown')
+
+
+class Interrupted(BaseException):
+    pass
+
+
+class InterruptingTransport(FixtureTransport):
+
+    interrupt = False
+
+    def get(self, url, params, headers, timeout=None):
+        if self.interrupt:
+            raise Interrupted()
+        return super(InterruptingTransport, self).get(url, params, headers, timeout)
+
+
+class TestInterruptedTrial(unittest.TestCase):
+
+    def test_interrupted_trial_lets_the_next_call_through(self):
+        transport = InterruptingTransport()
+        transport.add('/artist/', {'slug': 'eminem'}, {'message': 'Unavailable'}, 503)
+        breakers = CircuitBreakers(failure_threshold=1, reset_timeout=0)
+        client = BlitzrClient(API_KEY, transport=transport, breakers=breakers)
+        self.assertRaises(ServerException, client.get_artist, slug='eminem')
+
+        transport.interrupt = True
+        self.assertRaises(Interrupted, client.get_artist, slug='eminem')
+        transport.interrupt = False
+        transport.add('/artist/', {'slug': 'eminem'}, {'name': 'Eminem'})
+        self.assertEqual(client.get_artist(slug='eminem'), {'name': 'Eminem'})
+        self.assertEqual(breakers.states(), {'artist': 'closed'})
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_half_open_lets_one_trial_through(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.failure()
+        self.assertEqual(breaker.state, 'half-open')
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.failure()
+        self.assertTrue(breaker.allow())
+        breaker.success()
+        self.assertEqual(breaker.state, 'closed')
+        self.assertTrue(breaker.allow())
+        self.assertTrue(breaker.allow())
@@ -0,0 +1,75 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from blitzr import BlitzrClient, FixtureTransport, RecordingTransport, ReplayTransport
+from blitzr.cassette import read_cassette
+from blitzr.exceptions import ClientException, ServerException
+
+
+API_KEY = 'testing'
+
+
+class TestCassette(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'traffic.jsonl.gz')
+        recorder = RecordingTransport(FixtureTransport([
+            {'method': '/artist/', 'params': {'slug': 'eminem'}, 'body': {'name': 'Eminem'}},
+            {'method': '/label/', 'params': {'slug': 'warp'}, 'status': 503,
+             'body': {'message': 'Maintenance'}}
+        ]), self.path)
+        client = BlitzrClient(API_KEY, transport=recorder)
+        client.get_artist(slug='eminem')
+        self.assertRaises(ClientException, client.get_artist, slug='unknown')
+        self.assertRaises(ServerException, client.get_label, slug='warp')
+        recorder.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_exchanges_are_recorded_without_key(self):
+        exchanges = list(read_cassette(self.path))
+        self.assertEqual([exchange['params'] for exchange in exchanges],
+                         [{'slug': 'eminem'}, {'slug': 'unknown'}, {'slug': 'warp'}])
+        self.assertEqual([exchange['status'] for exchange in exchanges], [200, 404, 503])
+        self.assertEqual(exchanges[2]['body'], {'message': 'Maintenance'})
+
+    def test_replay(self):
+        replay = ReplayTransport(self.path)
+        client = BlitzrClient('another key', transport=replay)
+        self.assertEqual(client.get_artist(slug='eminem'), {'name': 'Eminem'})
+        self.assertRaises(ClientException, client.get_artist, slug='unknown')
+        self.assertRaises(ClientException, client.get_artist, slug='never recorded')
+        self.assertEqual(replay.misses, 1)
+        try:
+            client.get_label(slug='warp')
+        except ServerException as exception:
+            self.assertEqual((exception.status_code, exception.body),
+                             (503, {'message': 'Maintenance'}))
+        else:
+            self.fail('ServerException not raised')
+
+    def test_replay_scaled_latency(self):
+        replay = ReplayTransport(self.path, latency_scale=0)
+        started = time.time()
+        BlitzrClient(API_KEY, transport=replay).get_artist(slug='eminem')
+        self.assertLess(time.time() - started, 0.05)
+
+        class SlowTransport(FixtureTransport):
+            def get(self, url, params, headers, timeout=None):
+                time.sleep(0.02)
+                return super(SlowTransport, self).get(url, params, headers, timeout)
+
+        recorder = RecordingTransport(SlowTransport(), self.path)
+        recorder.transport.add('/artist/', body={'name': 'Eminem'})
+        BlitzrClient(API_KEY, transport=recorder).get_artist(slug='eminem')
+        recorder.close()
+
+        started = time.time()
+        BlitzrClient(API_KEY, transport=ReplayTransport(self.path, latency_scale=2)).get_artist(
+            slug='eminem')
+        self.assertGreaterEqual(time.time() - started, 0.04)
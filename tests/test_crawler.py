@@ -0,0 +1,61 @@
+import time
+import unittest
+
+from mock import patch
+
+from blitzr import BlitzrClient, FixtureTransport, ProcessCrawler
+
+
+API_KEY = 'testing'
+
+
+def release_name(release):
+    return release['name'].upper()
+
+
+class TestProcessCrawler(unittest.TestCase):
+
+    def setUp(self):
+        self.releases = releases = [{'name': 'release %d' % position} for position in range(25)]
+        transport = FixtureTransport()
+        for start in range(0, 40, 10):
+            transport.add('/tag/releases/', {'slug': 'rock', 'start': start, 'limit': 10},
+                          releases[start:start + 10])
+            transport.add('/search/release/', {
+                'query': 'e', 'autocomplete': 'false', 'extras': 'true', 'start': start,
+                'limit': 10, 'filters[year]': 2000
+            }, {'results': releases[start:start + 10], 'total': 25})
+        self.transport = transport
+        self.client = BlitzrClient(API_KEY, transport=transport)
+
+    def test_crawl_tag_releases_in_order(self):
+        with ProcessCrawler(self.client, release_name, processes=2, max_pending=2) as crawler:
+            names = list(crawler.crawl_tag_releases('rock', limit=10))
+        self.assertEqual(names, ['RELEASE %d' % position for position in range(25)])
+
+    def test_crawl_search_release(self):
+        with ProcessCrawler(self.client, processes=1) as crawler:
+            releases = list(crawler.crawl_search_release('e', {'year': 2000}, limit=10))
+        self.assertEqual(len(releases), 25)
+
+    def test_no_page_scheduled_past_a_short_page(self):
+        requested = []
+
+        class SlowFirstPage(FixtureTransport):
+            def get(self, url, params, headers, timeout=None):
+                requested.append(params['start'])
+                if params['start'] == 0:
+                    time.sleep(0.2)
+                return super(SlowFirstPage, self).get(url, params, headers, timeout)
+
+        transport = SlowFirstPage()
+        for start in range(0, 40, 10):
+            transport.add('/tag/releases/', {'slug': 'rock', 'start': start, 'limit': 10},
+                          self.releases[start:start + 10])
+        client = BlitzrClient(API_KEY, transport=transport)
+        with ProcessCrawler(client, max_pending=3) as crawler:
+            with patch.object(crawler._processes, 'submit') as submit:
+                releases = list(crawler.crawl_tag_releases('rock', limit=10))
+        self.assertEqual(len(releases), 25)
+        self.assertEqual(sorted(requested), [0, 10, 20])
+        self.assertFalse(submit.called)
@@ -0,0 +1,82 @@
+import time
+import unittest
+
+import requests
+from mock import patch
+
+from blitzr import BlitzrClient, CircuitBreakers, FixtureTransport
+from blitzr.deadline import Deadline
+from blitzr.exceptions import CancelledException, ServerException, TimeoutException
+
+
+API_KEY = 'testing'
+
+
+class SlowTransport(FixtureTransport):
+
+    def __init__(self, delay):
+        super(SlowTransport, self).__init__()
+        self.delay = delay
+        self.timeouts = []
+
+    def get(self, url, params, headers, timeout=None):
+        self.timeouts.append(timeout)
+        time.sleep(self.delay)
+        return super(SlowTransport, self).get(url, params, headers, timeout)
+
+
+class TestDeadlines(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = SlowTransport(0.02)
+        self.transport.add('/tag/artists/', body=[{'uuid': 'AR1'}, {'uuid': 'AR2'}])
+        self.client = BlitzrClient(API_KEY, transport=self.transport, timeout=5)
+
+    def test_timeout_is_bounded_by_deadline(self):
+        self.client.get_tag_artists(slug='rock')
+        self.client.within(1).get_tag_artists(slug='rock')
+        self.assertEqual(self.transport.timeouts[0], 5)
+        self.assertLessEqual(self.transport.timeouts[1], 1)
+
+    def test_deadline_covers_every_page_of_a_generator(self):
+        started = time.time()
+        artists = self.client.within(0.1).iter_tag_artists(slug='rock', limit=2)
+        self.assertRaises(TimeoutException, list, artists)
+        self.assertLess(time.time() - started, 0.5)
+        self.assertIsNone(self.client.deadline)
+
+    def test_cancel(self):
+        deadline = Deadline()
+        bound = self.client.within(deadline=deadline)
+        artists = bound.iter_tag_artists(slug='rock', limit=2)
+        self.assertEqual(next(artists), {'uuid': 'AR1'})
+        deadline.cancel()
+        self.assertRaises(CancelledException, list, artists)
+        self.assertEqual(len(self.client.get_tag_artists(slug='rock')), 2)
+
+    def test_deadline_expiring_after_check(self):
+        deadline = Deadline(1)
+        with patch.object(deadline, 'remaining', return_value=0.0):
+            bound = self.client.within(deadline=deadline)
+            self.assertRaises(TimeoutException, bound.get_tag_artists, slug='rock')
+        self.assertEqual(self.transport.timeouts, [])
+
+    def test_expired_deadline_does_not_take_the_breaker_trial(self):
+        transport = FixtureTransport()
+        transport.add('/artist/', {'slug': 'eminem'}, {'message': 'Unavailable'}, 503)
+        client = BlitzrClient(API_KEY, transport=transport,
+                              breakers=CircuitBreakers(failure_threshold=1, reset_timeout=0.05))
+        self.assertRaises(ServerException, client.get_artist, slug='eminem')
+        time.sleep(0.06)
+        deadline = Deadline()
+        deadline.cancel()
+        self.assertRaises(CancelledException, client.within(deadline=deadline).get_artist,
+                          slug='eminem')
+        transport.add('/artist/', {'slug': 'eminem'}, {'name': 'Eminem'})
+        self.assertEqual(client.get_artist(slug='eminem'), {'name': 'Eminem'})
+
+    @patch('requests.get', side_effect=requests.exceptions.ReadTimeout('Read timed out'))
+    def test_requests_timeout(self, mock_get):
+        client = BlitzrClient(API_KEY, timeout=2)
+        self.assertRaises(TimeoutException, client.get_artist, slug='eminem')
+        self.assertEqual(mock_get.call_args[1]['timeout'], 2)
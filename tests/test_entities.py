@@ -0,0 +1,51 @@
+import unittest
+
+from mock import MagicMock
+
+from blitzr import BlitzrClient
+
+
+API_KEY = 'testing'
+
+
+class TestEntities(unittest.TestCase):
+
+    def setUp(self):
+        self.client = BlitzrClient(API_KEY)
+        self.client._request = MagicMock(side_effect=self.fake_request)
+
+    def fake_request(self, method, params={}, fields=None):
+        if method == '/artist/':
+            return {'uuid': 'AR1', 'name': 'Eminem'}
+        if method == '/artist/releases/':
+            if params['start']:
+                return []
+            return [{'uuid': 'RE1', 'name': 'E'}, {'uuid': 'RE2', 'name': 'Recovery'}]
+        if method == '/release/':
+            return {'uuid': params['uuid'], 'name': 'x', 'tracks': [{'uuid': 'TR' + params['uuid']}]}
+        raise AssertionError(method)
+
+    def calls(self, method):
+        return [call for call in self.client._request.call_args_list if call[0][0] == method]
+
+    def test_fields_and_relations_are_lazy_and_memoized(self):
+        artist = self.client.artist(slug='eminem')
+        self.assertFalse(self.client._request.called)
+        self.assertEqual(artist.name, 'Eminem')
+        self.assertEqual(artist['name'], 'Eminem')
+        self.assertEqual([release.name for release in artist.releases], ['E', 'Recovery'])
+        artist.releases
+        self.assertEqual(len(self.calls('/artist/')), 1)
+        self.assertEqual(len(self.calls('/artist/releases/')), 1)
+
+    def test_sibling_relations_are_batched(self):
+        releases = self.client.artist(uuid='AR1').releases
+        self.assertEqual(releases[0].tracks[0].uuid, 'TRRE1')
+        self.assertEqual(len(self.calls('/release/')), 2)
+        self.assertEqual(releases[1].tracks[0].uuid, 'TRRE2')
+        self.assertEqual(len(self.calls('/release/')), 2)
+
+    def test_missing_field(self):
+        artist = self.client.artist(uuid='AR1')
+        self.assertRaises(AttributeError, getattr, artist, 'real_name')
+        self.assertEqual(artist.get('real_name', 'unknown'), 'unknown')
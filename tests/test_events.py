@@ -0,0 +1,70 @@
+import time
+import unittest
+
+from mock import MagicMock
+
+from blitzr import EventStore, EventSync
+
+
+def event(uuid, date, city, latitude=None, longitude=None):
+    return {'uuid': uuid, 'start_date': date + 'T20:00:00',
+            'venue': {'name': 'Venue ' + uuid, 'city': city, 'country_code': 'FR',
+                      'latitude': latitude, 'longitude': longitude}}
+
+
+class TestEventStore(unittest.TestCase):
+
+    def setUp(self):
+        self.store = EventStore()
+        self.store.replace_artist_events('AR1', [
+            event('e1', '2016-06-10', 'Paris', 48.85, 2.35),
+            event('e2', '2016-07-01', 'Lyon', 45.76, 4.83),
+            event('e3', '2016-06-20', 'Versailles', 48.80, 2.13)
+        ])
+
+    def test_date_range_and_city(self):
+        june = self.store.search({'date_start': '2016-06-01', 'date_end': '2016-06-30'})
+        self.assertEqual([e['uuid'] for e in june['results']], ['e1', 'e3'])
+        self.assertEqual(self.store.search({'city': 'lyon'})['total'], 1)
+
+    def test_radius(self):
+        near_paris = self.store.search({'latitude': 48.85, 'longitude': 2.35, 'radius': 30})
+        self.assertEqual([e['uuid'] for e in near_paris['results']], ['e1', 'e3'])
+
+    def test_replace_removes_cancelled_events(self):
+        self.store.replace_artist_events('AR1', [event('e2', '2016-07-01', 'Lyon')])
+        self.assertEqual(len(self.store), 1)
+        self.assertIsNone(self.store.get('e1'))
+
+    def test_shared_event_is_kept_for_every_artist(self):
+        festival = event('e4', '2016-08-15', 'Paris')
+        self.store.replace_artist_events('AR2', [festival])
+        self.store.replace_artist_events('AR1', [festival])
+        self.assertEqual(self.store.search({'artist': 'AR2'})['total'], 1)
+        self.assertEqual(self.store.next_date('AR2', '2016-01-01'), '2016-08-15')
+
+        self.store.replace_artist_events('AR1', [])
+        self.assertEqual(self.store.search({'artist': 'AR2'})['results'], [festival])
+        self.store.replace_artist_events('AR2', [])
+        self.assertEqual(len(self.store), 0)
+
+
+class TestEventSync(unittest.TestCase):
+
+    def test_refresh_schedule_follows_upcoming_events(self):
+        now = time.time()
+        soon = time.strftime('%Y-%m-%d', time.gmtime(now + 2 * 24 * 3600))
+        events = {'AR1': [event('e1', soon, 'Paris')], 'AR2': []}
+        client = MagicMock(max_workers=2, MAX_PAGE_SIZE=100)
+        client.iter_artist_events.side_effect = lambda uuid, limit: iter(events[uuid])
+
+        sync = EventSync(client)
+        sync.add_artists(['AR1', 'AR2'])
+        refreshed, failed = sync.run_once()
+        self.assertEqual(sorted(refreshed), ['AR1', 'AR2'])
+        self.assertEqual(failed, {})
+        self.assertLess(sync.interval('AR1'), sync.interval('AR2'))
+        self.assertEqual(sync.interval('AR2'), sync.max_interval)
+
+        self.assertEqual(sync.run_once(), ([], {}))
+        self.assertEqual(sync.run_once(now + sync.interval('AR1') + 10)[0], ['AR1'])
@@ -0,0 +1,42 @@
+import unittest
+
+from mock import patch
+
+from blitzr import BlitzrClient, TTLCache
+from blitzr.fields import project
+
+
+API_KEY = 'testing'
+
+ARTIST = {'uuid': 'AR1', 'name': 'Eminem', 'location': {'city': 'Detroit', 'country': 'USA'},
+          'aliases': [{'name': 'Slim Shady', 'uuid': 'AR2'}]}
+
+
+class TestFieldSelection(unittest.TestCase):
+
+    def test_project_nested_fields(self):
+        self.assertEqual(project(ARTIST, ['name', 'location.city', 'aliases.name']), {
+            'name': 'Eminem', 'location': {'city': 'Detroit'}, 'aliases': [{'name': 'Slim Shady'}]
+        })
+        self.assertEqual(project({'results': [ARTIST], 'total': 1}, ['name', 'total'], search=True),
+                         {'results': [{'name': 'Eminem'}], 'total': 1})
+
+    @patch('requests.get')
+    def test_get_artist_requests_needed_extras_and_caches_projection(self, mock_method):
+        mock_method.return_value.json.return_value = ARTIST
+        cache = TTLCache()
+        client = BlitzrClient(API_KEY, cache=cache)
+        self.assertEqual(client.get_artist(uuid='AR1', fields=['name', 'aliases.name']),
+                         {'name': 'Eminem', 'aliases': [{'name': 'Slim Shady'}]})
+        self.assertEqual(mock_method.call_args[1]['params']['extras'], 'aliases')
+        client.get_artist(uuid='AR1', fields=['name', 'aliases.name'])
+        self.assertEqual(mock_method.call_count, 1)
+        self.assertEqual(client.get_artist(uuid='AR1')['uuid'], 'AR1')
+        self.assertEqual(mock_method.call_count, 2)
+
+    @patch('requests.get')
+    def test_search_without_total_skips_extras(self, mock_method):
+        mock_method.return_value.json.return_value = [ARTIST]
+        results = BlitzrClient(API_KEY).search_artist('eminem', fields=['name'])
+        self.assertEqual(results, [{'name': 'Eminem'}])
+        self.assertEqual(mock_method.call_args[1]['params']['extras'], 'false')
@@ -0,0 +1,45 @@
+import unittest
+
+from mock import patch
+
+from blitzr import BlitzrClient, LocalIndex
+
+
+API_KEY = 'testing'
+
+ARTISTS = [
+    {'uuid': 'AR1', 'name': 'Arctic Monkeys', 'type': 'band',
+     'location': {'city': 'Sheffield', 'country_code': 'GB'}, 'tags': [{'name': 'Indie Rock'}]},
+    {'uuid': 'AR2', 'name': 'Arcade Fire', 'type': 'band',
+     'location': {'city': 'Montreal', 'country_code': 'CA'}, 'tags': [{'name': 'Indie'}]},
+    {'uuid': 'AR3', 'name': 'The Kills', 'aliases': [{'name': 'Arc Duo'}], 'type': 'band'}
+]
+
+
+class TestLocalIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = LocalIndex()
+        self.index.add_response('/search/artist/', {'results': ARTISTS, 'total': 3})
+
+    def test_search_ranks_names_first(self):
+        answer = self.index.search('artist', 'arc')
+        self.assertEqual([artist['uuid'] for artist in answer['results']], ['AR1', 'AR2', 'AR3'])
+        self.assertEqual(answer['total'], 3)
+
+    def test_search_filters(self):
+        answer = self.index.search('artist', 'indie', filters={'location': 'gb'})
+        self.assertEqual([artist['uuid'] for artist in answer['results']], ['AR1'])
+        self.assertEqual(self.index.search('artist', 'arctic fire')['total'], 0)
+
+    @patch('requests.get')
+    def test_client_feeds_index_and_falls_back(self, mock_method):
+        mock_method.return_value.json.return_value = ARTISTS[:1]
+        client = BlitzrClient(API_KEY, index=LocalIndex())
+        client.get_tag_artists(slug='rock')
+        self.assertEqual(client.search_local('artist', 'monkeys')['results'], ARTISTS[:1])
+        self.assertEqual(mock_method.call_count, 1)
+
+        client.search_local('artist', 'nirvana')
+        self.assertEqual(mock_method.call_count, 2)
+        self.assertEqual(mock_method.call_args[1]['url'], BlitzrClient.BASE_URL % '/search/artist/')
@@ -0,0 +1,53 @@
+import unittest
+
+from mock import MagicMock
+
+from blitzr import LabelMirror
+
+
+class TestLabelMirror(unittest.TestCase):
+
+    def setUp(self):
+        self.releases = [{'uuid': 'r%d' % i} for i in range(5, 0, -1)]
+        self.client = MagicMock(max_workers=2)
+        self.client.get_label.return_value = {'uuid': 'LB1', 'name': 'Warp'}
+        self.client.get_label_artists.return_value = [{'uuid': 'AR1'}]
+        self.client.get_label_releases.side_effect = (
+            lambda uuid, slug, release_format, start, limit: self.releases[start:start + limit])
+        self.client.get_label_biography.return_value = {'text': 'Sheffield'}
+        self.client.get_label_websites.return_value = []
+
+    def test_mirror_and_incremental_refresh(self):
+        mirror = LabelMirror(self.client, page_size=2, release_format='album')
+        self.assertEqual(list(mirror.mirror_many(['LB1'])),
+                         [('LB1', ['label', 'artists', 'releases', 'biography', 'websites'])])
+        self.assertEqual(len(mirror.get('LB1')['releases']), 5)
+        self.assertEqual(self.client.get_label_releases.call_count, 3)
+        self.client.get_label_releases.assert_any_call('LB1', None, 'album', 0, 2)
+
+        self.client.get_label_releases.reset_mock()
+        self.assertEqual(mirror.mirror('LB1'), [])
+        self.assertEqual(self.client.get_label_releases.call_count, 2)
+
+        self.releases.insert(0, {'uuid': 'r6'})
+        self.client.get_label_biography.return_value = {'text': 'Sheffield, London'}
+        self.assertEqual(mirror.mirror('LB1'), ['releases', 'biography'])
+        self.assertEqual(mirror.get('LB1')['releases'][0], {'uuid': 'r6'})
+
+    def test_failed_label_does_not_stop_the_others(self):
+        error = IOError('timeout')
+
+        def get_label(uuid, slug):
+            if uuid == 'LB2':
+                raise error
+            return {'uuid': uuid}
+
+        self.client.get_label.side_effect = get_label
+        mirror = LabelMirror(self.client, page_size=2)
+        changed = dict(mirror.mirror_many(['LB1', 'LB2', {'slug': 'warp'}]))
+        self.assertEqual(sorted(changed), ['LB1', 'slug:warp'])
+        self.assertEqual(mirror.failures, {'LB2': error})
+
+        self.client.get_label.side_effect = lambda uuid, slug: {'uuid': uuid}
+        self.assertEqual(dict(mirror.mirror_many(['LB2'])), {'LB2': list(LabelMirror.PARTS)})
+        self.assertEqual(mirror.failures, {})
@@ -9,6 +9,8 @@ from blitzr import BlitzrClient
 
 API_KEY = 'testing'
 
+HEADERS = {'Accept-Encoding': BlitzrClient.ACCEPT_ENCODING}
+
 class TestBlitzrClient(unittest.TestCase):
 
     @patch('requests.get')
@@ -16,6 +18,7 @@ class TestBlitzrClient(unittest.TestCase):
         BlitzrClient(API_KEY)._request(method='/blitzr_method')
         mock_method.assert_called_once_with(
             url=BlitzrClient.BASE_URL % '/blitzr_method',
+            headers=HEADERS, timeout=None,
             params={
                 'key'   : API_KEY
             }
@@ -26,6 +29,7 @@ class TestBlitzrClient(unittest.TestCase):
         BlitzrClient(API_KEY)._request(method='/blitzr_method', params={'toto': 'toto'})
         mock_method.assert_called_once_with(
             url=BlitzrClient.BASE_URL % '/blitzr_method',
+            headers=HEADERS, timeout=None,
             params={
                 'key'   : API_KEY,
                 'toto'  : 'toto'
@@ -38,6 +42,7 @@ class TestBlitzrClient(unittest.TestCase):
         BlitzrClient(API_KEY).get_artist(slug='toto')
         mock_method.assert_called_once_with(
             url=BlitzrClient.BASE_URL % '/artist/',
+            headers=HEADERS, timeout=None,
             params={
                 'key'           : API_KEY,
                 'slug'          : 'toto',
@@ -52,6 +57,7 @@ class TestBlitzrClient(unittest.TestCase):
         BlitzrClient(API_KEY).get_artist(uuid='AR89798789798787')
         mock_method.assert_called_once_with(
             url=BlitzrClient.BASE_URL % '/artist/',
+            headers=HEADERS, timeout=None,
             params={
                 'key'           : API_KEY,
                 'slug'          : None,
@@ -63,9 +69,24 @@ class TestBlitzrClient(unittest.TestCase):
     @patch('requests.get')
     def test_get_artist_aliases_by_slug(self, mock_method):
         BlitzrClient(API_KEY).get_artist_aliases(slug='toto')
-        mock_method.assert_called_once_with(url=BlitzrClient.BASE_URL % '/artist/aliases/', params={'key': API_KEY, 'slug':'toto', 'uuid':None})
+        mock_method.assert_called_once_with(url=BlitzrClient.BASE_URL % '/artist/aliases/', headers=HEADERS, timeout=None, params={'key': API_KEY, 'slug':'toto', 'uuid':None})
 
     @patch('requests.get')
     def test_get_artist_aliases_by_uuid(self, mock_method):
         BlitzrClient(API_KEY).get_artist_aliases(uuid='AR89798789798787')
-        mock_method.assert_called_once_with(url=BlitzrClient.BASE_URL % '/artist/aliases/', params={'key': API_KEY, 'slug':None, 'uuid':'AR89798789798787'})
+        mock_method.assert_called_once_with(url=BlitzrClient.BASE_URL % '/artist/aliases/', headers=HEADERS, timeout=None, params={'key': API_KEY, 'slug':None, 'uuid':'AR89798789798787'})
+
+    @patch('requests.get')
+    def test_request_records_transfer_sizes(self, mock_method):
+        mock_method.return_value.headers = {'Content-Encoding': 'gzip', 'Content-Length': '40'}
+        mock_method.return_value.content = b'x' * 100
+        mock_method.return_value.raw = object()
+        client = BlitzrClient(API_KEY)
+        client._request(method='/search/artist/')
+        client._request(method='search/artist/')
+        report = client.transfer_stats.report()['/search/artist/']
+        self.assertEqual(report['responses'], 2)
+        self.assertEqual(report['wire_bytes'], 80)
+        self.assertEqual(report['body_bytes'], 200)
+        self.assertEqual(report['ratio'], 0.4)
+        self.assertEqual(report['encodings'], {'gzip': 2})
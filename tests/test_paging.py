@@ -0,0 +1,48 @@
+import unittest
+
+from blitzr import BlitzrClient, FixtureTransport
+from blitzr.paging import AdaptivePager
+
+
+API_KEY = 'testing'
+
+
+class TestAdaptivePaging(unittest.TestCase):
+
+    def setUp(self):
+        self.tags = [{'uuid': 'AR%d' % position} for position in range(150)]
+        self.requests = []
+        test = self
+
+        class TagTransport(FixtureTransport):
+            def get(self, url, params, headers, timeout=None):
+                test.requests.append((params['start'], params['limit']))
+                start, limit = params['start'], params['limit']
+                if 'search' in url:
+                    self.add('/search/artist/', body={'results': test.tags[start:start + limit],
+                                                      'total': len(test.tags)})
+                else:
+                    self.add('/tag/artists/', body=test.tags[start:start + limit])
+                return super(TagTransport, self).get(url, params, headers, timeout)
+
+        self.client = BlitzrClient(API_KEY, transport=TagTransport(), adaptive_paging=True)
+
+    def test_pager_grows_and_shrinks(self):
+        pager = AdaptivePager(50, max_limit=40, target_latency=0.1)
+        self.assertEqual(pager.limit, 10)
+        self.assertEqual(pager.next_limit(0.01, 0.001), 20)
+        self.assertEqual(pager.next_limit(0.01, 0.001), 40)
+        self.assertEqual(pager.next_limit(0.01, 0.001), 40)
+        self.assertEqual(pager.next_limit(0.01, 0.5), 40)
+        self.assertEqual(pager.next_limit(0.5, 0.001), 20)
+
+    def test_iter_keeps_order_with_growing_pages(self):
+        artists = list(self.client.iter_tag_artists(slug='rock', start=5, limit=10))
+        self.assertEqual(artists, self.tags[5:])
+        self.assertEqual(self.requests, [(5, 10), (15, 20), (35, 40), (75, 80)])
+
+    def test_search_generator_keeps_order_with_growing_pages(self):
+        artists = list(self.client.iter_search_artist('rock', limit=10))
+        self.assertEqual(artists, self.tags)
+        self.assertEqual([limit for _, limit in self.requests], [10, 20, 40, 80, 100])
+        self.assertEqual([start for start, _ in self.requests], [0, 10, 30, 70, 150])
@@ -0,0 +1,51 @@
+import threading
+import time
+import unittest
+
+from blitzr import Pipeline
+
+
+class TestPipeline(unittest.TestCase):
+
+    def test_stages(self):
+        output = []
+        count = (Pipeline(range(10))
+                 .filter(lambda number: number % 2)
+                 .map(lambda number: number * 10, workers=3)
+                 .batch(2)
+                 .sink(output.append))
+        self.assertEqual(count, 3)
+        self.assertEqual(output, [[10, 30], [50, 70], [90]])
+
+    def test_enrich_runs_concurrently_in_order(self):
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def slow(item):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+            return item['id'] * 2
+
+        items = Pipeline({'id': number} for number in range(8)).enrich(
+            workers=4, double=slow, name=lambda item: 'item %d' % item['id'])
+        results = list(items)
+        self.assertEqual([item['double'] for item in results], [number * 2 for number in range(8)])
+        self.assertEqual(results[1]['name'], 'item 1')
+        self.assertGreater(peak[0], 1)
+        self.assertLessEqual(peak[0], 4)
+
+    def test_source_is_pulled_lazily(self):
+        pulled = []
+
+        def source():
+            for number in range(100):
+                pulled.append(number)
+                yield number
+
+        iterator = iter(Pipeline(source()).map(lambda number: number, workers=2))
+        next(iterator)
+        self.assertLess(len(pulled), 5)
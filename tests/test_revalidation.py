@@ -0,0 +1,53 @@
+import threading
+import unittest
+
+from blitzr import BlitzrClient, FixtureTransport, StaleWhileRevalidate, TTLCache
+
+
+API_KEY = 'testing'
+
+
+class GatedTransport(FixtureTransport):
+
+    def __init__(self):
+        super(GatedTransport, self).__init__()
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def get(self, url, params, headers, timeout=None):
+        self.gate.wait()
+        return super(GatedTransport, self).get(url, params, headers, timeout)
+
+
+class TestStaleWhileRevalidate(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = GatedTransport()
+        self.transport.add('/label/', {'slug': 'warp'}, {'name': 'Warp'})
+        self.transport.add('/artist/', {'slug': 'eminem'}, {'name': 'Eminem'})
+        self.revalidation = StaleWhileRevalidate({'label': 300})
+        # Every cached response is expired at once.
+        self.client = BlitzrClient(API_KEY, cache=TTLCache(ttl=0), transport=self.transport,
+                                   revalidation=self.revalidation)
+
+    def test_stale_response_is_served_then_refreshed_once(self):
+        self.assertEqual(self.client.get_label(slug='warp'), {'name': 'Warp'})
+        self.transport.add('/label/', {'slug': 'warp'}, {'name': 'Warp Records'})
+        self.transport.gate.clear()
+        for _ in range(4):
+            self.assertEqual(self.client.get_label(slug='warp'), {'name': 'Warp'})
+        self.transport.gate.set()
+        self.revalidation.close()
+
+        self.assertEqual(self.transport.calls, 2)
+        # Served stale, but not refreshed once the revalidation is closed.
+        self.assertEqual(self.client.get_label(slug='warp'), {'name': 'Warp Records'})
+        self.assertEqual(self.transport.calls, 2)
+        self.assertEqual(self.revalidation.stats.report(), {'/label/': {
+            'served': 5, 'refreshed': 1, 'failed': 0, 'coalesced': 3}})
+
+    def test_endpoints_without_max_staleness_are_fetched(self):
+        self.client.get_artist(slug='eminem')
+        self.client.get_artist(slug='eminem')
+        self.assertEqual(self.transport.calls, 2)
+        self.assertEqual(self.revalidation.stats.report(), {})
@@ -0,0 +1,42 @@
+import unittest
+
+from mock import patch, MagicMock
+
+from blitzr import BlitzrClient
+from blitzr.exceptions import ConfigurationException
+
+
+API_KEY = 'testing'
+
+ANSWERS = {
+    'artist'  : {'results': [{'name': 'a1', 'score': 3}, {'name': 'a2', 'score': 1}], 'total': 40},
+    'release' : {'results': [{'name': 'r1', 'score': 2}], 'total': 1}
+}
+
+
+def fake_get(url, params, **kwargs):
+    response = MagicMock()
+    response.json.return_value = ANSWERS[url.rstrip('/').split('/')[-1]]
+    return response
+
+
+class TestFederatedSearch(unittest.TestCase):
+
+    @patch('requests.get', side_effect=fake_get)
+    def test_search_federated_ranks_by_score(self, mock_method):
+        search = BlitzrClient(API_KEY).search_federated('toto', {'artist': {}, 'release': {'year': 2013}})
+        self.assertEqual([result['name'] for _, result in search.ranked()], ['a1', 'r1', 'a2'])
+        self.assertEqual(search.totals, {'artist': 40, 'release': 1})
+        self.assertEqual(len(search), 41)
+        release_params = [call[1]['params'] for call in mock_method.call_args_list
+                          if 'release' in call[1]['url']][0]
+        self.assertEqual(release_params['filters[year]'], 2013)
+
+    @patch('requests.get', side_effect=fake_get)
+    def test_search_federated_streams_every_type(self, mock_method):
+        search = BlitzrClient(API_KEY).search_federated('toto', ['artist', 'release'])
+        self.assertEqual(sorted(name for name, _ in search), ['artist', 'artist', 'release'])
+
+    def test_search_federated_unknown_type(self):
+        self.assertRaises(ConfigurationException, BlitzrClient(API_KEY).search_federated,
+                          'toto', ['venue'])
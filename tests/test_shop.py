@@ -0,0 +1,94 @@
+import time
+import unittest
+
+from mock import patch, MagicMock
+
+from blitzr import BlitzrClient, ShopPoller
+
+
+API_KEY = 'testing'
+
+OFFERS = {
+    'cd'    : [{'url': 'http://shop/a', 'price': 10}],
+    'lp'    : [{'url': 'http://shop/a', 'price': 10}, {'url': 'http://shop/b', 'price': 20}],
+    'mp3'   : [],
+    'merch' : [{'url': 'http://shop/c', 'price': 15}]
+}
+
+
+def fake_get(url, params, **kwargs):
+    response = MagicMock()
+    response.json.return_value = OFFERS[url.rstrip('/').split('/')[-1]]
+    return response
+
+
+class TestShopProducts(unittest.TestCase):
+
+    @patch('requests.get', side_effect=fake_get)
+    def test_get_shop_products_merges_types(self, mock_method):
+        products = BlitzrClient(API_KEY).get_shop_products('artist', slug='toto')
+        self.assertEqual(mock_method.call_count, 4)
+        self.assertEqual([offer['url'] for offer in products['offers']],
+                         ['http://shop/a', 'http://shop/b', 'http://shop/c'])
+        self.assertEqual(products['offers'][0]['product_types'], ['cd', 'lp'])
+        self.assertEqual(products['product_types']['mp3'], [])
+        self.assertEqual(products['errors'], {})
+
+    @patch('requests.get', side_effect=fake_get)
+    def test_get_shop_products_is_cached(self, mock_method):
+        client = BlitzrClient(API_KEY)
+        client.get_shop_products('release', slug='toto', product_types=['cd', 'lp'])
+        client.get_shop_products('release', slug='toto', product_types=['lp', 'cd'])
+        self.assertEqual(mock_method.call_count, 2)
+
+    @patch('requests.get', side_effect=fake_get)
+    @patch.object(BlitzrClient, 'SHOP_CACHE_SIZE', 1)
+    def test_get_shop_products_cache_is_bounded(self, mock_method):
+        client = BlitzrClient(API_KEY)
+        for slug in ('toto', 'tata', 'titi'):
+            client.get_shop_products('release', slug=slug, product_types=['cd'])
+        self.assertEqual(len(client._shop_cache), 1)
+
+
+class TestShopPoller(unittest.TestCase):
+
+    def test_poll_reports_changes_only(self):
+        client = MagicMock(max_workers=2)
+        client.get_shop_release.return_value = [{'url': 'a', 'price': 10}, {'url': 'b', 'price': 5}]
+        poller = ShopPoller(client, min_interval=10, max_interval=40)
+        key = poller.watch('release', 'cd', slug='toto')
+
+        diff = poller.poll(key)
+        self.assertEqual(len(diff.added), 2)
+        self.assertEqual(poller.interval(key), 10)
+
+        self.assertFalse(poller.poll(key))
+        self.assertEqual(poller.interval(key), 20)
+
+        client.get_shop_release.return_value = [{'url': 'a', 'price': 8}, {'url': 'c', 'price': 1}]
+        diff = poller.poll(key)
+        self.assertEqual(diff.changed, [{'url': 'a', 'price': 8}])
+        self.assertEqual(diff.added, [{'url': 'c', 'price': 1}])
+        self.assertEqual(diff.removed, ['url:b'])
+        self.assertEqual(poller.interval(key), 10)
+
+    def test_run_once_keeps_diffs_when_a_poll_fails(self):
+        client = MagicMock(max_workers=2)
+        client.get_shop_release.return_value = [{'url': 'a', 'price': 10}]
+        client.get_shop_label.side_effect = IOError('Unavailable')
+        poller = ShopPoller(client, min_interval=10, max_interval=40)
+        release = poller.watch('release', 'cd', slug='toto')
+        label = poller.watch('label', 'cd', slug='warp')
+
+        diffs, failed = poller.run_once()
+        self.assertEqual([diff.key for diff in diffs], [release])
+        self.assertEqual(list(failed), [label])
+        self.assertIs(poller.failures[label], failed[label])
+        self.assertEqual(poller.interval(label), 20)
+        self.assertEqual(poller.due(), [])
+
+        client.get_shop_label.side_effect = None
+        client.get_shop_label.return_value = []
+        diffs, failed = poller.run_once(time.time() + 20)
+        self.assertEqual((diffs, failed), ([], {}))
+        self.assertEqual(poller.failures, {})
@@ -0,0 +1,38 @@
+import threading
+import unittest
+
+from mock import MagicMock
+
+from blitzr import SourceResolver
+
+
+class TestSourceResolver(unittest.TestCase):
+
+    def setUp(self):
+        self.client = MagicMock(max_workers=2)
+        self.client.get_track_sources.side_effect = lambda uuid: [
+            {'source_name': 'spotify', 'source_id': 's-' + uuid},
+            {'source_name': 'youtube', 'source_id': 'y-' + uuid}
+        ]
+        self.client.get_release_sources.return_value = []
+
+    def test_best_known_does_not_block(self):
+        release = threading.Event()
+        self.client.get_track_sources.side_effect = lambda uuid: release.wait() and [
+            {'source_name': 'youtube', 'source_id': 'y-' + uuid}]
+        with SourceResolver(self.client) as resolver:
+            self.assertIsNone(resolver.best_known('TR1'))
+            release.set()
+            self.assertEqual(resolver.best('TR1'), {'source_name': 'youtube', 'source_id': 'y-TR1'})
+            self.assertEqual(resolver.best_known('TR1')['source_id'], 'y-TR1')
+        self.assertEqual(self.client.get_track_sources.call_count, 1)
+
+    def test_follow_prefetches_ahead_and_caches(self):
+        with SourceResolver(self.client, preference=['youtube']) as resolver:
+            tracks = resolver.follow(({'uuid': 'TR%d' % i} for i in range(4)), ahead=2)
+            self.assertEqual(next(tracks), {'uuid': 'TR0'})
+            self.assertEqual(resolver.best('TR2')['source_id'], 'y-TR2')
+            self.assertEqual(len(list(tracks)), 3)
+            self.assertEqual(resolver.resolve_many(['TR0', 'TR3'])['TR3'][0]['source_id'], 's-TR3')
+            self.assertEqual(resolver.resolve('RL1', kind='release'), [])
+        self.assertEqual(self.client.get_track_sources.call_count, 4)
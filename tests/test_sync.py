@@ -0,0 +1,58 @@
+import unittest
+
+from mock import MagicMock
+
+from blitzr import DiscographySync
+
+
+def releases(*uuids):
+    return [{'uuid': uuid} for uuid in uuids]
+
+
+class TestDiscographySync(unittest.TestCase):
+
+    def setUp(self):
+        self.catalog = releases('r5', 'r4', 'r3', 'r2', 'r1')
+        self.client = MagicMock(max_workers=2)
+        self.client.get_artist_releases.side_effect = (
+            lambda uuid, slug, start, limit, *args: self.catalog[start:start + limit])
+
+    def test_unchanged_first_page_skips_walk(self):
+        sync = DiscographySync(self.client, page_size=2)
+        delta = sync.sync('AR1')
+        self.assertEqual([release['uuid'] for release in delta.added], ['r5', 'r4', 'r3', 'r2', 'r1'])
+        self.assertEqual(sync.fingerprint('AR1')['count'], 5)
+        self.client.get_artist_releases.reset_mock()
+
+        self.assertFalse(sync.sync('AR1'))
+        # The first page, and the last release of the previous walk.
+        self.assertEqual(self.client.get_artist_releases.call_count, 2)
+
+    def test_release_added_beyond_first_page_is_detected(self):
+        sync = DiscographySync(self.client, page_size=2)
+        sync.sync('AR1')
+        self.catalog.insert(3, {'uuid': 'r2b'})
+        delta = sync.sync('AR1')
+        self.assertEqual(delta.added, [{'uuid': 'r2b'}])
+        self.assertEqual(sync.fingerprint('AR1')['last'], 'r1')
+
+    def test_iter_deltas_reports_added_and_removed(self):
+        sync = DiscographySync(self.client, page_size=2)
+        list(sync.iter_deltas(['AR1']))
+        self.catalog = releases('r6', 'r5', 'r4', 'r3', 'r2')
+        deltas = list(sync.iter_deltas(['AR1']))
+        self.assertEqual(len(deltas), 1)
+        self.assertEqual(deltas[0].added, [{'uuid': 'r6'}])
+        self.assertEqual(deltas[0].removed, ['r1'])
+
+    def test_failed_artist_does_not_stop_the_others(self):
+        def releases_or_fail(uuid, slug, start, limit, *args):
+            if uuid == 'AR2':
+                raise IOError('An error occured on the Blitzr side.')
+            return self.catalog[start:start + limit]
+        self.client.get_artist_releases.side_effect = releases_or_fail
+        sync = DiscographySync(self.client, page_size=2)
+        deltas = list(sync.iter_deltas(['AR1', 'AR2', {'uuid': 'AR3'}]))
+        self.assertEqual(sorted(delta.artist for delta in deltas), ['AR1', 'AR3'])
+        self.assertEqual(list(sync.failures), ['AR2'])
+        self.assertIsNone(sync.fingerprint('AR2'))
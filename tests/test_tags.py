@@ -0,0 +1,68 @@
+import time
+import unittest
+
+from mock import MagicMock
+
+from blitzr import TagIndex
+from blitzr.parallel import RateLimiter, run_parallel
+from blitzr.store import JSONStore
+from blitzr.tags import find_tags
+
+
+class TestTagIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.artists = {
+            'rock': [{'uuid': 'AR1', 'tags': [{'slug': 'grunge'}]}, {'uuid': 'AR2'}, {'uuid': 'AR3'}],
+            'grunge': [{'uuid': 'AR1'}]
+        }
+        self.client = MagicMock(max_workers=4)
+        self.client.get_tag_artists.side_effect = (
+            lambda slug, start, limit: self.artists.get(slug, [])[start:start + limit])
+        self.client.get_tag_releases.side_effect = lambda slug, start, limit: []
+
+    def test_find_tags(self):
+        response = {'results': [{'uuid': 'AR1', 'tags': [{'slug': 'rock'}, 'pop']}]}
+        self.assertEqual(find_tags(response), set(['rock', 'pop']))
+
+    def test_materialize_and_incremental_refresh(self):
+        tags = TagIndex(self.client, page_size=2, rate=1000)
+        tags.add_tags(['rock'])
+        changes, failed = tags.materialize()
+        self.assertEqual(changes, {'rock': 3})
+        self.assertEqual(failed, {})
+        self.assertEqual(tags.entities('rock'), ['AR1', 'AR2', 'AR3'])
+        self.assertEqual(tags.tags(), ['grunge', 'rock'])
+
+        tags.materialize()
+        self.assertEqual(tags.tags_of('AR1'), ['grunge', 'rock'])
+
+        self.artists['rock'] = [{'uuid': 'AR4'}, {'uuid': 'AR1'}, {'uuid': 'AR2'}]
+        self.assertEqual(tags.materialize()[0], {'rock': 2})
+        self.assertEqual(tags.tags_of('AR3'), [])
+        self.assertEqual(tags.tags_of('AR4'), ['rock'])
+        self.assertEqual(tags.refresh('rock', 'artists'), 0)
+
+
+class TestJSONStore(unittest.TestCase):
+
+    def test_concurrent_updates_are_not_lost(self):
+        store = JSONStore()
+
+        def add(tag):
+            store.update_many('entity_tags', ['AR1', 'AR2'],
+                              lambda entity, tags: sorted(set(tags) | set([tag])), [])
+
+        run_parallel([lambda tag=tag: add(tag) for tag in range(20)], max_workers=8)
+        self.assertEqual(store.get('entity_tags', 'AR1'), list(range(20)))
+        self.assertEqual(store.update('entity_tags', 'AR2', len), 20)
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_limits_rate_after_burst(self):
+        limiter = RateLimiter(rate=50, burst=2)
+        started = time.time()
+        for _ in range(7):
+            limiter.acquire()
+        self.assertGreaterEqual(time.time() - started, 0.09)
@@ -0,0 +1,52 @@
+import unittest
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+from blitzr import BlitzrClient, FixtureTransport, HTTP2Transport
+from blitzr.exceptions import ClientException
+
+
+API_KEY = 'testing'
+
+
+@unittest.skipIf(httpx is None, 'httpx is not installed')
+class TestHTTP2Transport(unittest.TestCase):
+
+    def setUp(self):
+        self.requests = []
+
+        def handler(request):
+            self.requests.append(request)
+            if request.url.params.get('slug') == 'missing':
+                return httpx.Response(404, json={'message': 'Not found'})
+            return httpx.Response(200, json={'uuid': 'AR1'})
+
+        self.transport = HTTP2Transport()
+        self.transport.client = httpx.Client(transport=httpx.MockTransport(handler))
+        self.client = BlitzrClient(API_KEY, transport=self.transport)
+
+    def test_get_drops_unset_params(self):
+        self.assertEqual(self.client.get_artist(slug='eminem'), {'uuid': 'AR1'})
+        self.assertEqual(dict(self.requests[0].url.params), {'slug': 'eminem', 'key': API_KEY})
+
+    def test_client_errors(self):
+        self.assertRaises(ClientException, self.client.get_artist, slug='missing')
+
+
+class TestFixtureTransport(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = FixtureTransport([
+            {'method': '/artist/', 'params': {'slug': 'eminem'}, 'body': {'name': 'Eminem'}},
+            {'method': '/tag/artists/', 'body': [{'name': 'Any'}]}
+        ])
+        self.client = BlitzrClient(API_KEY, transport=self.transport)
+
+    def test_responses_are_matched_on_params(self):
+        self.assertEqual(self.client.get_artist(slug='eminem'), {'name': 'Eminem'})
+        self.assertEqual(self.client.get_tag_artists(slug='rock', limit=50), [{'name': 'Any'}])
+        self.assertRaises(ClientException, self.client.get_artist, slug='unknown')
+        self.assertEqual(self.transport.calls, 3)
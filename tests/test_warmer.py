@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from blitzr import BlitzrClient, CacheWarmer, FixtureTransport, RecordingTransport, TTLCache
+from blitzr.exceptions import ConfigurationException
+
+
+API_KEY = 'testing'
+
+
+class TestCacheWarmer(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = FixtureTransport()
+        for uuid in ('AR1', 'AR2', 'AR3'):
+            self.transport.add('/artist/', {'uuid': uuid}, {'uuid': uuid})
+        self.transport.add('/tag/', {'slug': 'rock'}, {'slug': 'rock'})
+        self.client = BlitzrClient(API_KEY, cache=TTLCache(), transport=self.transport)
+
+    def test_warms_most_accessed_calls_first(self):
+        warmer = CacheWarmer(self.client, rate=1000)
+        warmer.add_entities('artist', ['AR1', 'AR2'])
+        warmer.add_entities('artist', [{'uuid': 'AR2'}, {'uuid': 'AR3'}], count=2)
+        warmer.add_accesses([('/tag/', {'slug': 'rock', 'key': 'secret'})])
+        self.assertEqual(warmer.plan(limit=2), [('/artist/', {'uuid': 'AR2'}, 3),
+                                                ('/artist/', {'uuid': 'AR3'}, 2)])
+        progress = []
+        report = warmer.warm(limit=3, progress=lambda done, total: progress.append((done, total)))
+        self.assertEqual((report['planned'], report['warmed'], report['failed']), (3, 3, 0))
+        self.assertEqual(progress, [(1, 3), (2, 3), (3, 3)])
+        self.assertEqual(self.transport.calls, 3)
+
+        self.assertIsNone(warmer.hit_rate())
+        self.client.get_artist('AR2')
+        self.client.get_artist('AR3')
+        self.client.get_tag('rock')
+        self.client.get_artist('AR1')
+        self.assertEqual(warmer.hit_rate(), 0.75)
+        self.assertEqual(warmer.plan(), [])
+
+    def test_replays_recorded_accesses(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'traffic.jsonl.gz')
+        recorder = RecordingTransport(self.transport, path)
+        client = BlitzrClient(API_KEY, transport=recorder)
+        client.get_artist('AR1')
+        client.get_artist('AR1')
+        client.get_tag('rock')
+        self.assertRaises(IOError, client.get_tag, 'missing')
+        recorder.close()
+
+        warmer = CacheWarmer(self.client, rate=1000)
+        warmer.add_cassette(path)
+        self.assertEqual(warmer.plan(), [('/artist/', {'uuid': 'AR1'}, 2),
+                                         ('/tag/', {'slug': 'rock'}, 1)])
+
+    def test_requires_a_cache(self):
+        self.assertRaises(ConfigurationException, CacheWarmer, BlitzrClient(API_KEY))